@@ -273,6 +273,9 @@ def register():
         bpy.app.handlers.load_pre.append(link.disconnect)
     if link.reconnect not in bpy.app.handlers.load_post:
         bpy.app.handlers.load_post.append(link.reconnect)
+    for handler in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if properties.invalidate_cache_index_handler not in handler:
+            handler.append(properties.invalidate_cache_index_handler)
 
     bpy.app.timers.register(link.reconnect, first_interval=0.5, persistent=False)
 
@@ -300,4 +303,7 @@ def unregister():
         bpy.app.handlers.load_pre.remove(link.disconnect)
     if link.reconnect in bpy.app.handlers.load_post:
         bpy.app.handlers.load_post.remove(link.reconnect)
+    for handler in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if properties.invalidate_cache_index_handler in handler:
+            handler.remove(properties.invalidate_cache_index_handler)
 
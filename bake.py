@@ -16,6 +16,9 @@
 
 import bpy
 import os
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from mathutils import Vector
 from . import normal, colorspace, imageutils, wrinkle, nodeutils, materials, utils, params, vars
 from .exporter import get_export_objects
@@ -25,6 +28,8 @@ BAKE_SAMPLES = 4
 BAKE_INDEX = 1001
 BUMP_BAKE_MULTIPLIER = 2.0
 NODE_CURSOR = Vector((0, 0))
+BAKE_JOBS = None
+MAX_PACK_WORKERS = 4
 
 def init_bake(id = 1001):
     global BAKE_INDEX
@@ -527,17 +532,9 @@ def pack_value_image(value, mat, channel_id, bake_dir,
     image, image_name, exists = get_bake_image(mat, channel_id, width, height, None, "", bake_dir,
                                                name_prefix=name_prefix, image_format=image_format)
 
-    image_pixels = list(image.pixels)
-
-    l = len(image_pixels)
-    for i in range(0, l, 4):
-        image_pixels[i + 0] = value
-        image_pixels[i + 1] = value
-        image_pixels[i + 2] = value
-        image_pixels[i + 3] = 1
-
-    # replace-in-place all the pixels from the list:
-    image.pixels[:] = image_pixels
+    pixels = new_pixel_array(image)
+    pack_channels(pixels, value, value, value, 1)
+    set_pixel_array(image, pixels)
     image.update()
     image.save()
     return image
@@ -605,59 +602,28 @@ def pack_RGBA(mat, channel_id, pack_mode, bake_dir,
         image_a.scale(width, height)
         remove_after.append(image_a)
 
-    r_data = None
-    g_data = None
-    b_data = None
-    a_data = None
-
-    if image_r:
-        r_data = image_r.pixels[:]
-    if image_g:
-        g_data = image_g.pixels[:]
-    if image_b:
-        b_data = image_b.pixels[:]
-    if image_a:
-        a_data = image_a.pixels[:]
-
-    image_pixels = list(image.pixels)
+    r_data = get_pixel_array(image_r) if image_r else None
+    g_data = get_pixel_array(image_g) if image_g else None
+    b_data = get_pixel_array(image_b) if image_b else None
+    a_data = get_pixel_array(image_a) if image_a else None
 
-    l = len(image_pixels)
+    pixels = new_pixel_array(image)
 
     if pack_mode == "RGB_A":
-        for i in range(0, l, 4):
-            if r_data:
-                image_pixels[i] = r_data[i]
-                image_pixels[i + 1] = r_data[i + 1]
-                image_pixels[i + 2] = r_data[i + 2]
-            else:
-                image_pixels[i] = value_r
-                image_pixels[i + 1] = value_g
-                image_pixels[i + 2] = value_b
-            if a_data:
-                image_pixels[i + 3] = a_data[i]
-            else:
-                image_pixels[i + 2] = value_a
+        if r_data is not None:
+            pixels[:, 0:3] = r_data[:, 0:3]
+        else:
+            pack_channels(pixels, value_r, value_g, value_b)
+        pixels[:, 3] = a_data[:, 0] if a_data is not None else value_a
 
     elif pack_mode == "R_G_B_A":
-        for i in range(0, l, 4):
-            if r_data:
-                image_pixels[i] = r_data[i]
-            else:
-                image_pixels[i] = value_r
-            if g_data:
-                image_pixels[i + 1] = g_data[i]
-            else:
-                image_pixels[i + 1] = value_g
-            if b_data:
-                image_pixels[i + 2] = b_data[i]
-            else:
-                image_pixels[i + 2] = value_b
-            if a_data:
-                image_pixels[i + 3] = a_data[i]
-            else:
-                image_pixels[i + 3] = value_a
+        pack_channels(pixels,
+                      r_data[:, 0] if r_data is not None else value_r,
+                      g_data[:, 0] if g_data is not None else value_g,
+                      b_data[:, 0] if b_data is not None else value_b,
+                      a_data[:, 0] if a_data is not None else value_a)
 
-    image.pixels[:] = image_pixels
+    set_pixel_array(image, pixels)
     image.update()
     image.save()
 
@@ -1206,9 +1172,33 @@ def combine_normal(context, chr_cache, mat_cache):
 
 def bake_flow_to_normal(context, chr_cache, mat_cache):
     """Convert's a hair shader's flow map into an approximate normal map."""
+    bake_flows_to_normals(context, chr_cache, [mat_cache])
+
+
+def bake_flows_to_normals(context, chr_cache, mat_caches):
+    """Convert's the flow maps of all the given hair materials into normal maps in one batch."""
 
     init_bake(4001)
 
+    mode_selection = utils.store_mode_selection_state()
+
+    jobs = []
+    for mat_cache in mat_caches:
+        job = prep_flow_to_normal(chr_cache, mat_cache)
+        if job:
+            jobs.append(job)
+
+    if jobs:
+        utils.log_info(f"Converting {len(jobs)} Flow Map(s) to Normal Map(s)...")
+        convert_flows_to_normals(jobs)
+
+    utils.restore_mode_selection_state(mode_selection)
+
+
+def prep_flow_to_normal(chr_cache, mat_cache):
+    """Finds or creates the normal image for a hair material's flow map.
+       Returns the (flow_image, normal_image, tangent, flip_y) conversion job."""
+
     mat = mat_cache.material
     nodes = mat.node_tree.nodes
     links = mat.node_tree.links
@@ -1221,10 +1211,10 @@ def bake_flow_to_normal(context, chr_cache, mat_cache):
 
         nodeutils.clear_cursor()
 
-        mode_selection = utils.store_mode_selection_state()
-
         # get the flow map
         flow_node = nodeutils.get_node_connected_to_input(shader_node, "Flow Map")
+        if not flow_node or not flow_node.image:
+            return None
         flow_image: bpy.types.Image = flow_node.image
 
         width = flow_image.size[0]
@@ -1261,56 +1251,57 @@ def bake_flow_to_normal(context, chr_cache, mat_cache):
             normal_node = nodeutils.make_image_node(nodes, normal_image, "Generated Normal Map")
             nodeutils.link_nodes(links, normal_node, "Color", shader_node, "Normal Map")
 
-        # convert the flow map to a normal map
         tangent = mat_cache.parameters.hair_tangent_vector
         flip_y = mat_cache.parameters.hair_tangent_flip_green > 0
-        utils.log_info("Converting Flow Map to Normal Map...")
-        convert_flow_to_normal(flow_image, normal_image, tangent, flip_y)
-
-        utils.restore_mode_selection_state(mode_selection)
-
+        return (flow_image, normal_image, tangent, flip_y)
 
-def convert_flow_to_normal(flow_image: bpy.types.Image, normal_image: bpy.types.Image, tangent, flip_y):
-
-    # fetching a copy of the normal pixels as a list gives us the fastest write speed:
-    normal_pixels = list(normal_image.pixels)
-    # fetching the flow pixels as a tuple with slice notation gives the fastest read speed:
-    flow_pixels = flow_image.pixels[:]
+    return None
 
-    #tangent_vector = Vector(tangent)
 
-    if flip_y:
-        flip = -1
-    else:
-        flip = 1
+def flow_to_normal_pixels(flow_pixels, flip):
+    """Converts (pixels, 4) flow map pixels into normal map pixels.
+       flip is -1 to flip the green channel, 1 otherwise, or an array of either per pixel."""
+    fx = flow_pixels[:, 0] * 2 - 1
+    fy = (flow_pixels[:, 1] * 2 - 1) * flip
+    fz = flow_pixels[:, 2] * 2 - 1
+    # normal = flow x tangent, where tangent = (-fy, fx, 0)
+    normals = np.empty((len(flow_pixels), 3), dtype=np.float32)
+    normals[:, 0] = -fz * fx * 0.35
+    normals[:, 1] = -fz * fy * 0.35
+    normals[:, 2] = fx * fx + fy * fy
+    length = np.sqrt(np.einsum("ij,ij->i", normals, normals))
+    np.divide(normals, length[:, np.newaxis], out=normals, where=length[:, np.newaxis] > 1.0e-35)
+    normal_pixels = np.empty((len(flow_pixels), 4), dtype=np.float32)
+    normal_pixels[:, 0:3] = (normals + 1) / 2
+    normal_pixels[:, 3] = 1
+    return normal_pixels
 
-    l = len(flow_pixels)
-    for i in range(0, l, 4):
 
-        # rgb -> flow_vector
-        flow_vector = Vector((flow_pixels[i + 0] * 2 - 1,
-                             (flow_pixels[i + 1] * 2 - 1) * flip,
-                              flow_pixels[i + 2] * 2 - 1))
-        tangent_vector = Vector((-flow_vector.y, flow_vector.x, 0))
+def convert_flow_to_normal(flow_image: bpy.types.Image, normal_image: bpy.types.Image, tangent, flip_y):
+    convert_flows_to_normals([(flow_image, normal_image, tangent, flip_y)])
 
-        # calculate normal vector
-        normal_vector = flow_vector.cross(tangent_vector)
-        normal_vector.x *= 0.35
-        normal_vector.y *= 0.35
-        normal_vector.normalize()
 
-        # normal_vector -> rgb
-        normal_pixels[i + 0] = (normal_vector[0] + 1) / 2
-        normal_pixels[i + 1] = (normal_vector[1] + 1) / 2
-        normal_pixels[i + 2] = (normal_vector[2] + 1) / 2
-        normal_pixels[i + 3] = 1
+def convert_flows_to_normals(jobs):
+    """Converts a batch of (flow_image, normal_image, tangent, flip_y) jobs,
+       with all the flow pixels processed together in one array."""
 
-    # replace-in-place all the pixels from the list:
-    normal_image.pixels[:] = normal_pixels
-    normal_image.update()
-    normal_image.save()
+    flow_arrays = []
+    flips = []
+    for flow_image, normal_image, tangent, flip_y in jobs:
+        flow_pixels = get_pixel_array(flow_image)
+        flow_arrays.append(flow_pixels)
+        flips.append(np.full(len(flow_pixels), -1 if flip_y else 1, dtype=np.float32))
 
+    normal_pixels = flow_to_normal_pixels(np.concatenate(flow_arrays), np.concatenate(flips))
+    del flow_arrays, flips
 
+    start = 0
+    for flow_image, normal_image, tangent, flip_y in jobs:
+        end = start + len(normal_image.pixels) // 4
+        set_pixel_array(normal_image, normal_pixels[start:end])
+        normal_image.update()
+        normal_image.save()
+        start = end
 
 
 def pack_rgb_a(mat, bake_dir, channel_id, shader_node, pack_node_id,
@@ -1721,6 +1712,13 @@ class CC3BakeOperator(bpy.types.Operator):
             mat_cache = chr_cache.get_material_cache(mat)
             bake_flow_to_normal(context, chr_cache, mat_cache)
 
+        if self.param == "BAKE_FLOW_NORMAL_ALL":
+            chr_cache = props.get_context_character_cache(context)
+            if chr_cache:
+                hair_caches = [ mat_cache for mat_cache in chr_cache.get_all_materials_cache()
+                                if mat_cache.material_type == "HAIR" ]
+                bake_flows_to_normals(context, chr_cache, hair_caches)
+
         if self.param == "BAKE_BUMP_NORMAL":
             mat = utils.get_context_material(context)
             chr_cache = props.get_context_character_cache(context)
@@ -1740,6 +1738,8 @@ class CC3BakeOperator(bpy.types.Operator):
 
         if properties.param == "BAKE_FLOW_NORMAL":
             return "Generates a normal map from the flow map and connects it"
+        if properties.param == "BAKE_FLOW_NORMAL_ALL":
+            return "Generates normal maps from the flow maps of all the character's hair materials and connects them"
         if properties.param == "BAKE_BUMP_NORMAL":
             return "Combines the Bump and Normal maps into a single normal map"
         return ""
@@ -2554,6 +2554,48 @@ def bake_export_material(context, mat, source_mat, source_mat_cache):
                        emission_strength, thickness)
 
 
+def get_pixel_array(image: bpy.types.Image):
+    """Reads all the image pixels into a float32 array of shape (pixels, 4)."""
+    pixels = np.empty(len(image.pixels), dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels.reshape(-1, 4)
+
+
+def new_pixel_array(image: bpy.types.Image):
+    """Returns an uninitialized float32 pixel array the size of the image."""
+    return np.empty((len(image.pixels) // 4, 4), dtype=np.float32)
+
+
+def set_pixel_array(image: bpy.types.Image, pixels):
+    """Writes a (pixels, 4) array back into the image in one go."""
+    image.pixels.foreach_set(np.ascontiguousarray(pixels, dtype=np.float32).ravel())
+
+
+def pack_channels(pixels, r=None, g=None, b=None, a=None):
+    """Fills the channels of a (pixels, 4) array from per pixel arrays or constant values.
+       Channels given as None are left unchanged."""
+    for i, channel in enumerate((r, g, b, a)):
+        if channel is not None:
+            pixels[:, i] = channel
+    return pixels
+
+
+def roughness_to_smoothness(roughness, smoothness_mapping):
+    """Maps roughness values (array or scalar) to smoothness with the bake smoothness mapping."""
+    if smoothness_mapping == "SIR":
+        return np.power(1 - roughness, 2)
+    elif smoothness_mapping == "IRS":
+        return 1 - np.power(roughness, 2)
+    elif smoothness_mapping == "IRSR":
+        return 1 - np.power(roughness, 0.5)
+    elif smoothness_mapping == "SRIR":
+        return np.power(1 - roughness, 0.5)
+    elif smoothness_mapping == "SRIRS":
+        return np.power(1 - np.power(roughness, 2), 0.5)
+    else: # IR
+        return 1 - roughness
+
+
 def fetch_pack_image_data(width, height, *nodes, no_rescale = False):
 
     utils.log_info(f"Using packed map size: {width} x {height}")
@@ -2569,14 +2611,173 @@ def fetch_pack_image_data(width, height, *nodes, no_rescale = False):
                 utils.log_info(f" - Scaling tex image: {width} x {height}")
                 scaled_image = image.copy()
                 scaled_image.scale(width, height)
-                pixels = list(scaled_image.pixels)
+                pixels = get_pixel_array(scaled_image)
+                bpy.data.images.remove(scaled_image)
             else:
-                pixels = list(image.pixels)
+                pixels = get_pixel_array(image)
         data.append(pixels)
 
     return data
 
 
+def invert_rgb_pixels(pixels):
+    pixels[:, 0:3] = 1.0 - pixels[:, 0:3]
+    return pixels
+
+
+class BakeJobs():
+    """Runs the pixel packing of finished bake maps on a thread pool, overlapping with the
+       next material's Cycles bake. Blender data is only touched on the main thread: source
+       pixels are fetched before a job is submitted, and the packed pixels are written back
+       and saved when the job is collected, between bakes."""
+    pool: ThreadPoolExecutor = None
+    jobs: list = None
+    timings: dict = None
+    material_name: str = None
+    material_start: float = 0.0
+
+    def __init__(self, max_workers=MAX_PACK_WORKERS):
+        max_workers = max(1, min(max_workers, os.cpu_count() or 1))
+        self.pool = ThreadPoolExecutor(max_workers=max_workers,
+                                       thread_name_prefix="CCICBakePack")
+        # each pending job holds full resolution source and packed float arrays,
+        # so only allow as many as there are workers
+        self.max_pending = max_workers
+        self.jobs = []
+        self.timings = {}
+
+    def material_timing(self, mat_name):
+        if mat_name not in self.timings:
+            self.timings[mat_name] = { "bake": 0.0, "pack": 0.0, "save": 0.0, "maps": 0 }
+        return self.timings[mat_name]
+
+    def begin_material(self, mat_name):
+        # write back anything that finished during the last bake
+        self.collect()
+        self.material_name = mat_name
+        self.material_start = time.perf_counter()
+
+    def end_material(self):
+        if self.material_name:
+            timing = self.material_timing(self.material_name)
+            timing["bake"] += time.perf_counter() - self.material_start
+        self.material_name = None
+
+    def submit(self, mat_name, image, pack_func, *args):
+        # limit the number of pixel buffers held in memory
+        while len(self.jobs) >= self.max_pending:
+            self.collect(wait_one=True)
+
+        job_args = list(args)
+
+        def run():
+            t = time.perf_counter()
+            pixels = pack_func(*job_args)
+            # release the source arrays as soon as they are packed
+            job_args.clear()
+            return pixels, time.perf_counter() - t
+
+        self.jobs.append((mat_name, image, self.pool.submit(run)))
+
+    def collect(self, wait=False, wait_one=False):
+        remaining = []
+        for mat_name, image, future in self.jobs:
+            if wait or wait_one or future.done():
+                wait_one = False
+                try:
+                    pixels, pack_time = future.result()
+                    t = time.perf_counter()
+                    set_pixel_array(image, pixels)
+                    image.update()
+                    image.save()
+                    timing = self.material_timing(mat_name)
+                    timing["pack"] += pack_time
+                    timing["save"] += time.perf_counter() - t
+                    timing["maps"] += 1
+                except Exception as e:
+                    utils.log_error(f"Unable to pack bake image: {image.name}", e)
+            else:
+                remaining.append((mat_name, image, future))
+        self.jobs = remaining
+
+    def finish(self):
+        self.end_material()
+        self.collect(wait=True)
+        self.pool.shutdown(wait=True)
+        self.report()
+
+    def report(self):
+        if not self.timings:
+            return
+        utils.log_always("")
+        utils.log_always("Bake Timings:")
+        total = 0.0
+        for mat_name, timing in self.timings.items():
+            utils.log_always(f"  {mat_name}: bake {timing['bake']:.2f}s, "
+                             f"pack {timing['pack']:.2f}s ({timing['maps']} maps, threaded), "
+                             f"save {timing['save']:.2f}s")
+            total += timing["bake"] + timing["save"]
+        utils.log_always(f"  Total (main thread): {total:.2f}s")
+
+
+def submit_pack_job(mat_name, image, pack_func, *args):
+    """Packs the pixels with pack_func(*args) and writes them to the image:
+       on the bake job pool when baking a character, otherwise immediately."""
+    if BAKE_JOBS:
+        BAKE_JOBS.submit(mat_name, image, pack_func, *args)
+    else:
+        pixels = pack_func(*args)
+        set_pixel_array(image, pixels)
+        image.update()
+        image.save()
+
+
+def pack_diffuse_pixels(pixels, diffuse_data, alpha_data, diffuse_value):
+    if diffuse_data is not None:
+        pixels[:, 0:3] = diffuse_data[:, 0:3]
+    else:
+        pack_channels(pixels, diffuse_value[0], diffuse_value[1], diffuse_value[2])
+    pixels[:, 3] = alpha_data[:, 0] if alpha_data is not None else 1
+    return pixels
+
+
+def pack_hdrp_mask_pixels(pixels, metallic_data, ao_data, mask_data, roughness_data,
+                          metallic_value, ao_value, mask_value, roughness_value, smoothness_mapping):
+    # Mask: R: Metallic, G: AO, B: Micro-Normal Mask, A: Smoothness
+    roughness = roughness_data[:, 0] if roughness_data is not None else roughness_value
+    return pack_channels(pixels,
+                         metallic_data[:, 0] if metallic_data is not None else metallic_value,
+                         ao_data[:, 0] if ao_data is not None else ao_value,
+                         mask_data[:, 0] if mask_data is not None else mask_value,
+                         roughness_to_smoothness(roughness, smoothness_mapping))
+
+
+def pack_hdrp_detail_pixels(pixels, detail_data):
+    # Detail: R: 0.5, G: Micro-Normal.R, B: 0.5, A: Micro-Normal.G
+    if detail_data is not None:
+        return pack_channels(pixels, 0.5, detail_data[:, 0], 0.5, detail_data[:, 1])
+    else:
+        return pack_channels(pixels, 0.5, 0.5, 0.5, 0.5)
+
+
+def pack_metallic_smoothness_pixels(pixels, metallic_data, roughness_data,
+                                    metallic_value, roughness_value, smoothness_mapping):
+    # MetallicAlpha: RGB: Metallic, A: Smoothness
+    metallic = metallic_data[:, 0] if metallic_data is not None else metallic_value
+    roughness = roughness_data[:, 0] if roughness_data is not None else roughness_value
+    return pack_channels(pixels, metallic, metallic, metallic,
+                         roughness_to_smoothness(roughness, smoothness_mapping))
+
+
+def pack_gltf_pixels(pixels, ao_data, roughness_data, metallic_data,
+                     ao_value, roughness_value, metallic_value):
+    # GLTF: R: AO, G: Roughness, B: Metallic
+    return pack_channels(pixels,
+                         ao_data[:, 0] if ao_data is not None else ao_value,
+                         roughness_data[:, 0] if roughness_data is not None else roughness_value,
+                         metallic_data[:, 0] if metallic_data is not None else metallic_value)
+
+
 def combine_diffuse_tex(nodes, source_mat, source_mat_cache, mat,
                         diffuse_node, alpha_node, image_format="PNG"):
 
@@ -2604,29 +2805,8 @@ def combine_diffuse_tex(nodes, source_mat, source_mat_cache, mat,
     image_node = nodeutils.make_image_node(nodes, image, image_node_name)
     image_node.select = True
     nodes.active = image_node
-    # writeable list copy for fastest write speed
-    image_data = list(image.pixels)
-    l = len(image_data)
-
-    for i in range(0, l, 4):
-        if diffuse_data:
-            image_data[i+0] = diffuse_data[i+0]
-            image_data[i+1] = diffuse_data[i+1]
-            image_data[i+2] = diffuse_data[i+2]
-        else:
-            image_data[i+0] = diffuse_value[0]
-            image_data[i+1] = diffuse_value[1]
-            image_data[i+2] = diffuse_value[2]
-
-        if alpha_data:
-            image_data[i+3] = alpha_data[i]
-        else:
-            image_data[i+3] = 1
-
-    # replace in-place in one go.
-    image.pixels[:] = image_data
-    image.update()
-    image.save()
+    submit_pack_job(mat.name, image, pack_diffuse_pixels,
+                    new_pixel_array(image), diffuse_data, alpha_data, tuple(diffuse_value))
 
 
 def combine_hdrp_mask_tex(nodes, source_mat, source_mat_cache, mat,
@@ -2666,54 +2846,10 @@ def combine_hdrp_mask_tex(nodes, source_mat, source_mat_cache, mat,
     image_node = nodeutils.make_image_node(nodes, image, image_node_name)
     image_node.select = True
     nodes.active = image_node
-    image_data = list(image.pixels)
-    l = len(image_data)
-
-    # Mask: R: Metallic, G: AO, B: Micro-Normal Mask, A: Smoothness = 0.5 + 0.5*(1-Roughess)^2
-    for i in range(0, l, 4):
-
-        # Red
-        if metallic_data:
-            image_data[i] = metallic_data[i]
-        else:
-            image_data[i] = metallic_value
-
-        # Green
-        if ao_data:
-            image_data[i+1] = ao_data[i]
-        else:
-            image_data[i+1] = ao_value
-
-        # Blue
-        if mask_data:
-            image_data[i+2] = mask_data[i]
-        else:
-            image_data[i+2] = mask_value
-
-        # Alpha
-        if roughness_data:
-            roughness = roughness_data[i]
-        else:
-            roughness = roughness_value
-
-        if props.smoothness_mapping == "SIR":
-            smoothness = pow(1 - roughness, 2)
-        elif props.smoothness_mapping == "IRS":
-            smoothness = 1 - pow(roughness, 2)
-        elif props.smoothness_mapping == "IRSR":
-            smoothness = 1 - pow(roughness, 0.5)
-        elif props.smoothness_mapping == "SRIR":
-            smoothness = pow(1 - roughness, 0.5)
-        elif props.smoothness_mapping == "SRIRS":
-            smoothness = pow(1 - pow(roughness, 2), 0.5)
-        else: # IR
-            smoothness = 1 - roughness
-
-        image_data[i+3] = smoothness
-
-    image.pixels[:] = image_data
-    image.update()
-    image.save()
+    submit_pack_job(mat.name, image, pack_hdrp_mask_pixels,
+                    new_pixel_array(image), metallic_data, ao_data, mask_data, roughness_data,
+                    metallic_value, ao_value, mask_value, roughness_value,
+                    props.smoothness_mapping)
 
 
 def combine_hdrp_detail_tex(nodes, source_mat, source_mat_cache, mat,
@@ -2725,9 +2861,9 @@ def combine_hdrp_detail_tex(nodes, source_mat, source_mat_cache, mat,
     path = get_bake_path()
     width, height = nodeutils.get_largest_image_size(detail_normal_node)
     width, height = apply_override_size(mat, map_suffix, width, height)
-    detail_data = fetch_pack_image_data(width, height, detail_normal_node)
+    detail_data, = fetch_pack_image_data(width, height, detail_normal_node)
 
-    if not detail_data:
+    if detail_data is None:
         return
 
     utils.log_info("Combining Unity HDRP Detail Texture...")
@@ -2740,41 +2876,15 @@ def combine_hdrp_detail_tex(nodes, source_mat, source_mat_cache, mat,
     image_node = nodeutils.make_image_node(nodes, image, image_node_name)
     image_node.select = True
     nodes.active = image_node
-    image_data = list(image.pixels)
-    l = len(image_data)
-
-    # Detail: R: 0.5, G: Micro-Normal.R, B: 0.5, A: Micro-Normal.G
-    for i in range(0, l, 4):
-
-        image_data[i+0] = 0.5
-        image_data[i+2] = 0.5
-
-        if detail_data:
-            image_data[i+1] = detail_data[i+0]
-            image_data[i+3] = detail_data[i+1]
-        else:
-            image_data[i+1] = 0.5
-            image_data[i+3] = 0.5
-
-    image.pixels[:] = image_data
-    image.update()
-    image.save()
+    submit_pack_job(mat.name, image, pack_hdrp_detail_pixels,
+                    new_pixel_array(image), detail_data)
 
 
 def process_hdrp_subsurfaces_tex(sss_node, trans_node):
 
     if trans_node and trans_node.image:
         image = trans_node.image
-        trans_data = list(image.pixels)
-        l = len(trans_data)
-        for i in range(0, l, 4):
-            trans_data[i+0] = 1.0 - trans_data[i+0]
-            trans_data[i+1] = 1.0 - trans_data[i+1]
-            trans_data[i+2] = 1.0 - trans_data[i+2]
-
-        image.pixels[:] = trans_data
-        image.update()
-        image.save()
+        submit_pack_job(image.name, image, invert_rgb_pixels, get_pixel_array(image))
 
 
 def make_metallic_smoothness_tex(nodes, source_mat, source_mat_cache, mat,
@@ -2810,43 +2920,10 @@ def make_metallic_smoothness_tex(nodes, source_mat, source_mat_cache, mat,
     image_node = nodeutils.make_image_node(nodes, image, image_node_name)
     image_node.select = True
     nodes.active = image_node
-    image_data = list(image.pixels)
-    l = len(image_data)
-
-    # Mask: R: Metallic, G: AO, B: Micro-Normal Mask, A: Smoothness = 0.5 + 0.5*(1-Roughess)^2
-    for i in range(0, l, 4):
-
-        if roughness_data:
-            roughness = roughness_data[i]
-        else:
-            roughness = roughness_value
-
-        if metallic_data:
-            metallic = metallic_data[i]
-        else:
-            metallic = metallic_value
-
-        if props.smoothness_mapping == "SIR":
-            smoothness = pow(1 - roughness, 2)
-        elif props.smoothness_mapping == "IRS":
-            smoothness = 1 - pow(roughness, 2)
-        elif props.smoothness_mapping == "IRSR":
-            smoothness = 1 - pow(roughness, 0.5)
-        elif props.smoothness_mapping == "SRIR":
-            smoothness = pow(1 - roughness, 0.5)
-        elif props.smoothness_mapping == "SRIRS":
-            smoothness = pow(1 - pow(roughness, 2), 0.5)
-        else: # IR
-            smoothness = 1 - roughness
-
-        image_data[i+0] = metallic
-        image_data[i+1] = metallic
-        image_data[i+2] = metallic
-        image_data[i+3] = smoothness
-
-    image.pixels[:] = image_data
-    image.update()
-    image.save()
+    submit_pack_job(mat.name, image, pack_metallic_smoothness_pixels,
+                    new_pixel_array(image), metallic_data, roughness_data,
+                    metallic_value, roughness_value,
+                    props.smoothness_mapping)
 
 
 def combine_gltf(nodes, source_mat, source_mat_cache, mat,
@@ -2885,33 +2962,61 @@ def combine_gltf(nodes, source_mat, source_mat_cache, mat,
     image_node = nodeutils.make_image_node(nodes, image, image_node_name)
     image_node.select = True
     nodes.active = image_node
-    image_data = list(image.pixels)
-    l = len(image_data)
+    # alpha is left as is
+    submit_pack_job(mat.name, image, pack_gltf_pixels,
+                    get_pixel_array(image), ao_data, roughness_data, metallic_data,
+                    ao_value, roughness_value, metallic_value)
+
+
+def benchmark_texture_packing(size=2048, smoothness_mapping="IR"):
+    """Times the array pixel packing for each export target on synthetic size x size maps,
+       including the foreach_get / foreach_set transfer through a temporary image."""
+    utils.log_always("")
+    utils.log_always("BENCHMARK: Texture Packing")
+    utils.log_always("==========================")
+
+    rng = np.random.default_rng(0)
+    num_pixels = size * size
+    maps = [ rng.random((num_pixels, 4), dtype=np.float32) for i in range(4) ]
+    image = bpy.data.images.new("CC3_Benchmark_Pack", size, size, alpha=True, float_buffer=False, is_data=True)
+
+    def pack_targets(pixels):
+        return {
+            "Unity HDRP": [
+                lambda: pack_diffuse_pixels(pixels, maps[0], maps[1], (1,1,1,1)),
+                lambda: pack_hdrp_mask_pixels(pixels, maps[0], maps[1], maps[2], maps[3],
+                                              0, 1, 1, 0.5, smoothness_mapping),
+                lambda: pack_hdrp_detail_pixels(pixels, maps[0]),
+            ],
+            "Unity URP/3D": [
+                lambda: pack_diffuse_pixels(pixels, maps[0], maps[1], (1,1,1,1)),
+                lambda: pack_metallic_smoothness_pixels(pixels, maps[0], maps[1],
+                                                        0, 0.5, smoothness_mapping),
+            ],
+            "GLTF": [
+                lambda: pack_diffuse_pixels(pixels, maps[0], maps[1], (1,1,1,1)),
+                lambda: pack_gltf_pixels(pixels, maps[0], maps[1], maps[2], 1, 0.5, 0),
+            ],
+        }
 
-    # GLTF: R: AO, G: Roughness, B: Metallic
-    for i in range(0, l, 4):
-
-        # Red
-        if ao_data:
-            image_data[i+0] = ao_data[i]
-        else:
-            image_data[i+0] = ao_value
-
-        # Green
-        if roughness_data:
-            image_data[i+1] = roughness_data[i]
-        else:
-            image_data[i+1] = roughness_value
-
-        # Blue
-        if metallic_data:
-            image_data[i+2] = metallic_data[i]
-        else:
-            image_data[i+2] = metallic_value
-
-    image.pixels[:] = image_data
-    image.update()
-    image.save()
+    try:
+        utils.log_always(f"{size} x {size} maps")
+        for target, packers in pack_targets(new_pixel_array(image)).items():
+            t_pack = 0.0
+            t_io = 0.0
+            for pack in packers:
+                t = time.perf_counter()
+                get_pixel_array(image)
+                t_io += time.perf_counter() - t
+                t = time.perf_counter()
+                pixels = pack()
+                t_pack += time.perf_counter() - t
+                t = time.perf_counter()
+                set_pixel_array(image, pixels)
+                t_io += time.perf_counter() - t
+            utils.log_always(f"{target}: {len(packers)} maps, pack {t_pack * 1000:.1f} ms, pixel transfer {t_io * 1000:.1f} ms")
+    finally:
+        bpy.data.images.remove(image)
 
 
 def find_baked_image_nodes(nodes, tex_nodes, global_suffix):
@@ -3160,11 +3265,17 @@ def bake_character(context, chr_cache):
 
     chr_cache.baked_target_mode = "NONE"
 
+    global BAKE_JOBS
+    BAKE_JOBS = BakeJobs()
     materials_done = []
     obj : bpy.types.Object
-    for obj in objects:
-        if utils.object_exists_is_mesh(obj):
-            bake_character_object(context, chr_cache, obj, bake_state, materials_done)
+    try:
+        for obj in objects:
+            if utils.object_exists_is_mesh(obj):
+                bake_character_object(context, chr_cache, obj, bake_state, materials_done)
+    finally:
+        BAKE_JOBS.finish()
+        BAKE_JOBS = None
     materials_done.clear()
 
     chr_cache.baked_target_mode = props.target_mode
@@ -3385,11 +3496,15 @@ def bake_character_object(context, chr_cache, obj, bake_state, materials_done):
             # attach the bake material to the bake surface plane
             set_bake_material(bake_state, bake_mat)
 
+            if BAKE_JOBS:
+                BAKE_JOBS.begin_material(bake_mat.name)
             try:
                 bake_export_material(context, bake_mat, source_mat, source_mat_cache)
                 slot.material = bake_mat
             except Exception as e:
                utils.log_error("Bake Character Object: Something went horribly wrong!", e)
+            if BAKE_JOBS:
+                BAKE_JOBS.end_material()
 
         else:
             # if the material has already been baked elsewhere, replace the material here
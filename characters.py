@@ -17,9 +17,11 @@
 import bpy
 import re
 import os
+import time
+import numpy as np
 
 from . import (springbones, rigidbody, materials, modifiers, meshutils, geom, bones, physics, rigutils,
-               shaders, basic, imageutils, nodeutils, jsonutils, lib, utils, vars)
+               shaders, basic, imageutils, nodeutils, jsonutils, lib, properties, utils, vars)
 
 from mathutils import Vector, Matrix, Quaternion
 
@@ -343,6 +345,7 @@ def convert_generic_to_non_standard(objects, file_path=None, type_override=None,
     chr_rig.name = chr_name
     chr_rig.data.name = chr_name
     chr_cache = props.import_cache.add()
+    properties.invalidate_cache_index()
     chr_cache.import_file = ""
     chr_cache.set_name(chr_name)
     chr_cache.import_embedded = False
@@ -1659,29 +1662,37 @@ def blend_skin_weights(chr_cache, objects):
 
     objects = remove_list_body_objects(chr_cache, objects)
 
-    for obj in objects:
-        pose_mode = arm.data.pose_position
-        arm.data.pose_position = "REST"
-        bpy.context.view_layer.update()
-        bm_obj = geom.get_bmesh(obj.data)
-        layer_map = prep_deformation_layers(arm, body, obj, bm_obj)
-        transfer_skin_weights(chr_cache, objects, body_override=body)
-        bm_obj.free()
-        bm_obj = geom.get_bmesh(obj.data)
-        post_deformation_layers(obj, bm_obj, layer_map)
-        vert_map = geom.map_body_weight_blends(body, obj, bm_obj)
-        apply_weight_blend(obj, bm_obj, vert_map, layer_map,
-                           prefs.weight_blend_distance_min,
-                           prefs.weight_blend_distance_max,
-                           prefs.weight_blend_distance_range,
-                           prefs.weight_blend_use_range,
-                           prefs.weight_blend_selected_only)
+    # the body bvh must be built (and queried) in the rest pose
+    pose_mode = arm.data.pose_position
+    arm.data.pose_position = "REST"
+    bpy.context.view_layer.update()
+    try:
+        body_bvh = geom.build_body_bvh(body)
+
+        for obj in objects:
+            t = time.perf_counter()
+            bm_obj = geom.get_bmesh(obj.data)
+            layer_map = prep_deformation_layers(arm, body, obj, bm_obj)
+            transfer_skin_weights(chr_cache, objects, body_override=body)
+            bm_obj.free()
+            bm_obj = geom.get_bmesh(obj.data)
+            post_deformation_layers(obj, bm_obj, layer_map)
+            vert_map = geom.map_body_weight_blends(body, obj, bm_obj, body_bvh)
+            apply_weight_blend(obj, bm_obj, vert_map, layer_map,
+                               prefs.weight_blend_distance_min,
+                               prefs.weight_blend_distance_max,
+                               prefs.weight_blend_distance_range,
+                               prefs.weight_blend_use_range,
+                               prefs.weight_blend_selected_only)
+            utils.log_info(f"Weight blend {obj.name}: {time.perf_counter() - t:.3f}s")
+    finally:
         arm.data.pose_position = pose_mode
         bpy.context.view_layer.update()
 
 
 def prep_deformation_layers(arm, body: bpy.types.Object, obj: bpy.types.Object, bm_obj):
-    layer_map = {}
+    """Adds the body deform bone vertex groups to the object and fetches
+       the object's current (blend) weights for them as a (bones, verts) matrix."""
     bones = []
     for vg in body.vertex_groups:
         if vg.name in obj.vertex_groups:
@@ -1690,22 +1701,24 @@ def prep_deformation_layers(arm, body: bpy.types.Object, obj: bpy.types.Object,
                 # TODO don't include face bones or twist parent bones
                 utils.log_info(f"Adding vertex group {vg.name} to {obj.name}")
                 meshutils.add_vertex_group(obj, vg.name)
-    id = utils.generate_random_id(4)
+    bone_names = []
+    layers = []
     for i, vg in enumerate(obj.vertex_groups):
         if vg.name in bones:
-            bone_name = vg.name
-            blend_weights = geom.fetch_vertex_layer_weights(bm_obj, i)
-            layer_map[bone_name] = { "blend": blend_weights }
+            bone_names.append(vg.name)
+            layers.append(i)
+    blend_weights, blend_present = geom.fetch_vertex_layer_weights(bm_obj, layers)
+    layer_map = { "bones": bone_names, "layers": layers, "blend": blend_weights }
     return layer_map
 
 
 def post_deformation_layers(obj: bpy.types.Object, bm_obj, layer_map):
-    """Move the body transfered weights into new groups,
-       and create empty vertex groups for those bones"""
-    for bone_name in layer_map:
-        i = obj.vertex_groups.keys().index(bone_name)
-        skin_weights = geom.fetch_vertex_layer_weights(bm_obj, i)
-        layer_map[bone_name]["skin"] = skin_weights
+    """Fetch the body transfered (skin) weights of the bone vertex groups"""
+    layers = [ obj.vertex_groups.keys().index(bone_name) for bone_name in layer_map["bones"] ]
+    skin_weights, skin_present = geom.fetch_vertex_layer_weights(bm_obj, layers)
+    layer_map["layers"] = layers
+    layer_map["skin"] = skin_weights
+    layer_map["present"] = skin_present
 
 
 def clean_up_blend_vertex_groups(obj, bm_obj, layer_map):
@@ -1721,72 +1734,88 @@ def apply_weight_blend(obj, bm_obj, vert_map, layer_map,
                        weight_blend_selected_only):
     d0 = weight_blend_distance_min
     d1 = weight_blend_distance_max
+    distances = np.array(vert_map, dtype=np.float64)
     if weight_blend_use_range:
-        max_d1 = 0
-        for v_idx in vert_map:
-            distance = vert_map[v_idx]
-            if distance > max_d1:
-                max_d1 = distance
+        max_d1 = max(0.0, float(distances.max())) if len(distances) else 0.0
         d1 = max(d0, utils.lerp(d0, max_d1, weight_blend_distance_range / 100.0))
     utils.log_info(f"Using weight blend range: {d0} to {d1}")
+    if weight_blend_selected_only:
+        selected = np.array([ v.select for v in bm_obj.verts ], dtype=bool)
+        distances[~selected] = -1
+    blend_weights = layer_map["blend"]
+    skin_weights = layer_map["skin"]
+    # (bones, verts) blend of the skin weights to the blend weights over the distance range
+    if d1 == d0:
+        blended = blend_weights.copy()
+    else:
+        x = np.clip((distances - d0) / (d1 - d0), 0.0, 1.0)
+        t = x * x * (3 - 2 * x)
+        blended = skin_weights + (blend_weights - skin_weights) * t[np.newaxis, :]
+    unmapped = distances == -1
+    blended[:, unmapped] = blend_weights[:, unmapped]
+
     bm_obj.verts.layers.deform.verify()
     obj_dl = bm_obj.verts.layers.deform.active
-    for bone_name in layer_map:
-        blend_weights = layer_map[bone_name]["blend"]
-        skin_weights = layer_map[bone_name]["skin"]
-        bone_layer = obj.vertex_groups.keys().index(bone_name)
-        for v_idx in vert_map:
-            distance = vert_map[v_idx]
-            if weight_blend_selected_only and not bm_obj.verts[v_idx].select:
-                distance = -1
-            if distance == -1:
-                try:
-                    blended_weight = blend_weights[v_idx]
-                except:
-                    blended_weight = 0
-            else:
-                try:
-                    w0 = skin_weights[v_idx]
-                except:
-                    w0 = 0
-                try:
-                    w1 = blend_weights[v_idx]
-                except:
-                    w1 = 0
-                blended_weight = utils.map_smoothstep(d0, d1, w0, w1, distance)
-            if blended_weight >= 0.0001:
-                bm_obj.verts[v_idx][obj_dl][bone_layer] = blended_weight
-            else:
-                if bone_layer in bm_obj.verts[v_idx][obj_dl]:
-                    del bm_obj.verts[v_idx][obj_dl][bone_layer]
+    bm_obj.verts.ensure_lookup_table()
+    layers = layer_map["layers"]
+    keep = blended >= 0.0001
+    # set the kept weights
+    rows, cols = np.nonzero(keep)
+    for row, v_idx, weight in zip(rows.tolist(), cols.tolist(), blended[rows, cols].tolist()):
+        bm_obj.verts[v_idx][obj_dl][layers[row]] = weight
+    # remove the rest from any vertex that may be in the group
+    candidates = ~keep & (layer_map["present"] | (skin_weights > 0) | (blend_weights > 0))
+    rows, cols = np.nonzero(candidates)
+    for row, v_idx in zip(rows.tolist(), cols.tolist()):
+        dvert = bm_obj.verts[v_idx][obj_dl]
+        if layers[row] in dvert:
+            del dvert[layers[row]]
     bm_obj.to_mesh(obj.data)
     return
 
 
-def calc_key_delta(arm, obj, key: bpy.types.ShapeKey, basis: bpy.types.ShapeKey):
+KEY_DELTA_BATCH = 32
+
+
+def get_shape_key_coords(key: bpy.types.ShapeKey):
     """B410"""
-    delta = 0
+    co = np.empty(len(key.points) * 3, dtype=np.float32)
+    key.points.foreach_get("co", co)
+    return co.reshape(-1, 3)
+
+
+def calc_key_deltas(arm, obj, keys, basis: bpy.types.ShapeKey):
+    """B410: Returns the total scaled vertex displacement of each key from the basis,
+       reading the keys in batches into a (keys, verts, 3) array."""
+    deltas = np.zeros(len(keys), dtype=np.float64)
     scale = obj.scale * arm.scale if arm else obj.scale
-    if len(key.points) == len(basis.points):
-        for i in range(0, len(key.points)):
-            key_co: Vector = key.points[i].co
-            basis_co: Vector = basis.points[i].co
-            delta += abs(((key_co - basis_co) * scale).length)
-    return delta
+    scale = np.array(scale, dtype=np.float32)
+    num_points = len(basis.points)
+    basis_co = get_shape_key_coords(basis)
+    for start in range(0, len(keys), KEY_DELTA_BATCH):
+        batch = [ (i, key) for i, key in enumerate(keys[start:start + KEY_DELTA_BATCH], start)
+                  if len(key.points) == num_points ]
+        if not batch:
+            continue
+        block = np.empty((len(batch), num_points * 3), dtype=np.float32)
+        for row, (i, key) in enumerate(batch):
+            key.points.foreach_get("co", block[row])
+        block = block.reshape(len(batch), num_points, 3)
+        block -= basis_co
+        block *= scale
+        lengths = np.sqrt(np.einsum("kvi,kvi->kv", block, block))
+        deltas[[ i for i, key in batch ]] = lengths.sum(axis=1, dtype=np.float64)
+    return deltas
+
+
+def calc_key_delta(arm, obj, key: bpy.types.ShapeKey, basis: bpy.types.ShapeKey):
+    """B410"""
+    return float(calc_key_deltas(arm, obj, [key], basis)[0])
 
 
 def is_empty_key_delta(arm, obj, key: bpy.types.ShapeKey, basis: bpy.types.ShapeKey, threshold=0.001):
     """B410"""
-    delta = 0
-    scale = obj.scale * arm.scale if arm else obj.scale
-    if len(key.points) == len(basis.points):
-        for i in range(0, len(key.points)):
-            key_co: Vector = key.points[i].co
-            basis_co: Vector = basis.points[i].co
-            delta += abs(((key_co - basis_co) * scale).length)
-            if delta > threshold:
-                return False
-    return True
+    return calc_key_delta(arm, obj, key, basis) <= threshold
 
 
 def remove_empty_shapekeys_vertex_groups(arm, obj):
@@ -1799,10 +1828,9 @@ def remove_empty_shapekeys_vertex_groups(arm, obj):
         key_blocks = obj.data.shape_keys.key_blocks
         if key_blocks and len(key_blocks) >= 2 and "Basis" in key_blocks:
             basis = key_blocks["Basis"]
-            for key in key_blocks:
-                if key != basis:
-                    if is_empty_key_delta(arm, obj, key, basis, threshold=0.001):
-                        empty_keys.append(key.name)
+            keys = [ key for key in key_blocks if key != basis ]
+            deltas = calc_key_deltas(arm, obj, keys, basis)
+            empty_keys = [ key.name for key, delta in zip(keys, deltas) if delta <= 0.001 ]
         for key_name in empty_keys:
             key = key_blocks[key_name]
             utils.log_info(f" - Removing empty shape key: {obj.name} - {key.name}")
@@ -1810,10 +1838,7 @@ def remove_empty_shapekeys_vertex_groups(arm, obj):
             obj.shape_key_remove(key)
             key_count += 1
     if utils.object_exists_is_mesh(obj):
-        empty_groups = []
-        for vg in obj.vertex_groups:
-            if meshutils.is_empty_vertex_group(obj, vg, threshold=0.001):
-                empty_groups.append(vg)
+        empty_groups = meshutils.find_empty_vertex_groups(obj, threshold=0.001)
         for vg in empty_groups:
             utils.log_info(f" - Removing empty vertex group: {obj.name} - {vg.name}")
             obj.vertex_groups.remove(vg)
@@ -1825,6 +1850,7 @@ def remove_all_empty_shapekeys_vertex_groups(chr_cache):
     key_count = 0
     group_count = 0
     if chr_cache:
+        t = time.perf_counter()
         utils.log_info(f"Cleaning empty shape keys and vertex groups in character: {chr_cache.get_name()}")
         objects = chr_cache.get_cache_objects()
         body_objects = chr_cache.get_objects_of_type("BODY")
@@ -1835,6 +1861,7 @@ def remove_all_empty_shapekeys_vertex_groups(chr_cache):
                 kc, gc = remove_empty_shapekeys_vertex_groups(arm, obj)
                 key_count += kc
                 group_count += gc
+        utils.log_info(f"Cleaned {key_count} shape keys and {group_count} vertex groups in {time.perf_counter() - t:.3f}s")
     return key_count, group_count
 
 
@@ -2487,6 +2514,7 @@ class CCICWeightTransferBlend(bpy.types.Operator):
 
     chr_cache = None
     objects = {}
+    timings = {}
 
     @classmethod
     def poll(cls, context):
@@ -2512,21 +2540,30 @@ class CCICWeightTransferBlend(bpy.types.Operator):
         if not body: return
 
         self.objects = remove_list_body_objects(self.chr_cache, self.objects)
+        self.timings = {}
 
-        for obj_name in self.objects:
-            obj = bpy.data.objects[obj_name]
-            pose_mode = arm.data.pose_position
-            arm.data.pose_position = "REST"
-            #bpy.context.view_layer.update()
-            bm_obj = geom.get_bmesh(obj.data)
-            layer_map = prep_deformation_layers(arm, body, obj, bm_obj)
-            transfer_skin_weights(self.chr_cache, [obj], body_override=body)
-            bm_obj.free()
-            bm_obj = geom.get_bmesh(obj.data)
-            post_deformation_layers(obj, bm_obj, layer_map)
-            vert_map = geom.map_body_weight_blends(body, obj, bm_obj)
-            self.objects[obj_name] = (bm_obj, layer_map, vert_map)
+        # the body bvh must be built (and queried) in the rest pose
+        pose_mode = arm.data.pose_position
+        arm.data.pose_position = "REST"
+        bpy.context.view_layer.update()
+        try:
+            body_bvh = geom.build_body_bvh(body)
+
+            for obj_name in self.objects:
+                t = time.perf_counter()
+                obj = bpy.data.objects[obj_name]
+                bm_obj = geom.get_bmesh(obj.data)
+                layer_map = prep_deformation_layers(arm, body, obj, bm_obj)
+                transfer_skin_weights(self.chr_cache, [obj], body_override=body)
+                bm_obj.free()
+                bm_obj = geom.get_bmesh(obj.data)
+                post_deformation_layers(obj, bm_obj, layer_map)
+                vert_map = geom.map_body_weight_blends(body, obj, bm_obj, body_bvh)
+                self.objects[obj_name] = (bm_obj, layer_map, vert_map)
+                self.timings[obj_name] = [time.perf_counter() - t, 0.0]
+        finally:
             arm.data.pose_position = pose_mode
+            bpy.context.view_layer.update()
 
         finish_combined_body(body)
 
@@ -2535,6 +2572,7 @@ class CCICWeightTransferBlend(bpy.types.Operator):
         if not arm or not self.objects: return
 
         for obj_name in self.objects:
+            t = time.perf_counter()
             obj = bpy.data.objects[obj_name]
             bm_obj, layer_map, vert_map = self.objects[obj_name]
             pose_mode = arm.data.pose_position
@@ -2546,6 +2584,13 @@ class CCICWeightTransferBlend(bpy.types.Operator):
                                self.weight_blend_use_range,
                                self.weight_blend_selected_only)
             arm.data.pose_position = pose_mode
+            if obj_name in self.timings:
+                self.timings[obj_name][1] = time.perf_counter() - t
+        self.report_timings()
+
+    def report_timings(self):
+        for obj_name, (prep_time, blend_time) in self.timings.items():
+            utils.log_info(f"Weight blend {obj_name}: transfer {prep_time:.3f}s, blend {blend_time:.3f}s")
 
     def collect_objects(self, context):
         props = vars.props()
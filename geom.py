@@ -18,7 +18,10 @@ import bpy
 import math
 import mathutils
 from mathutils import Vector
+from mathutils.kdtree import KDTree
+from mathutils.bvhtree import BVHTree
 import bmesh
+import numpy as np
 from . import utils
 
 # Code derived from: https://blenderartists.org/t/get-3d-location-of-mesh-surface-point-from-uv-parameter/649486/2
@@ -211,108 +214,137 @@ def copy_vertex_positions_and_weights(src_obj : bpy.types.Object, dst_obj : bpy.
     dst_bm.to_mesh(dst_mesh)
 
 
-def copy_vert_positions_by_uv_id(src_obj, dst_obj, accuracy=5, vertex_group=None,
-                                 threshold=0.004, shape_key_name=None, flatten_udim=False):
-
-    mesh : bpy.types.Mesh = dst_obj.data
-    if shape_key_name:
-        if not mesh.shape_keys:
-            dst_obj.shape_key_add(name = "Basis")
-        if shape_key_name not in mesh.shape_keys.key_blocks:
-            shape_key = dst_obj.shape_key_add(name = shape_key_name)
-            shape_key_name = shape_key.name
-
-    src_mesh = src_obj.data
-    dst_mesh = dst_obj.data
+def get_vertex_positions(obj, shape_key_name=None):
+    """Returns the mesh vertex (or shape key) positions as an (n, 3) float32 array."""
+    mesh: bpy.types.Mesh = obj.data
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    if shape_key_name and mesh.shape_keys and shape_key_name in mesh.shape_keys.key_blocks:
+        mesh.shape_keys.key_blocks[shape_key_name].data.foreach_get("co", positions)
+    else:
+        mesh.vertices.foreach_get("co", positions)
+    return positions.reshape(-1, 3)
+
+
+def set_vertex_positions(obj, positions, shape_key_name=None):
+    """Writes an (n, 3) array of positions to the mesh vertices or to a shape key."""
+    mesh: bpy.types.Mesh = obj.data
+    positions = np.ascontiguousarray(positions, dtype=np.float32).ravel()
+    if shape_key_name and mesh.shape_keys and shape_key_name in mesh.shape_keys.key_blocks:
+        mesh.shape_keys.key_blocks[shape_key_name].data.foreach_set("co", positions)
+    elif mesh.shape_keys:
+        # go through bmesh so the changes to the basis propagate to the relative shape keys
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        co = positions.reshape(-1, 3).tolist()
+        for vert in bm.verts:
+            vert.co = co[vert.index]
+        bm.to_mesh(mesh)
+        bm.free()
+    else:
+        mesh.vertices.foreach_set("co", positions)
+    mesh.update()
 
-    src_bm = bmesh.new()
-    dst_bm = bmesh.new()
 
-    src_bm.from_mesh(src_mesh)
-    src_bm.faces.ensure_lookup_table()
-    src_bm.verts.ensure_lookup_table()
+def get_vertex_group_weights(obj, vertex_group):
+    """Returns the weights of the named vertex group for every vertex (0 where unassigned)."""
+    mesh: bpy.types.Mesh = obj.data
+    weights = np.zeros(len(mesh.vertices), dtype=np.float32)
+    if vertex_group in obj.vertex_groups:
+        vg_index = obj.vertex_groups[vertex_group].index
+        for vert in mesh.vertices:
+            for g in vert.groups:
+                if g.group == vg_index:
+                    weights[vert.index] = g.weight
+                    break
+    return weights
 
-    dst_bm.from_mesh(dst_mesh)
-    dst_bm.faces.ensure_lookup_table()
-    dst_bm.verts.ensure_lookup_table()
 
-    src_map = {}
+def get_loop_uv_data(obj, flatten_udim=False):
+    """Returns the per loop uv coordinates (L, 2), vertex indices (L,) and
+       material indices (L,) of the mesh's first uv layer, read in bulk."""
+    mesh: bpy.types.Mesh = obj.data
+    num_loops = len(mesh.loops)
+    uvs = np.zeros(num_loops * 2, dtype=np.float32)
+    if mesh.uv_layers:
+        mesh.uv_layers[0].data.foreach_get("uv", uvs)
+    uvs = uvs.reshape(-1, 2)
+    if flatten_udim:
+        uvs[:, 0] -= np.trunc(uvs[:, 0])
+    loop_verts = np.empty(num_loops, dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+    num_polys = len(mesh.polygons)
+    poly_materials = np.empty(num_polys, dtype=np.int32)
+    poly_totals = np.empty(num_polys, dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", poly_materials)
+    mesh.polygons.foreach_get("loop_total", poly_totals)
+    poly_starts = np.empty(num_polys, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", poly_starts)
+    # scatter the polygon material indices to each polygon's loops
+    poly_of_loop = np.repeat(np.arange(num_polys), poly_totals)
+    offsets = np.arange(len(poly_of_loop)) - np.repeat(np.cumsum(poly_totals) - poly_totals, poly_totals)
+    loop_materials = np.zeros(num_loops, dtype=np.int32)
+    loop_materials[poly_starts[poly_of_loop] + offsets] = poly_materials[poly_of_loop]
+    return uvs, loop_verts, loop_materials
+
+
+class UVIndex():
+    """UV space spatial index of mesh vertices, one KD-tree per material,
+       for matching vertices across meshes by UV position within a tolerance."""
+    trees: dict = None
+    tree_verts: dict = None
+
+    def __init__(self, uvs, loop_verts, loop_materials):
+        self.trees = {}
+        self.tree_verts = {}
+        for material_index in np.unique(loop_materials).tolist():
+            selected = np.flatnonzero(loop_materials == material_index)
+            tree = KDTree(len(selected))
+            for i, (u, v) in enumerate(uvs[selected].tolist()):
+                tree.insert((u, v, 0.0), i)
+            tree.balance()
+            self.trees[material_index] = tree
+            self.tree_verts[material_index] = loop_verts[selected].tolist()
+
+    def find(self, uv, material_index, tolerance):
+        """Returns the nearest vertex index within the tolerance of the uv, or -1,
+           and whether more than one vertex lies within the tolerance (overlapping UV's)."""
+        tree = self.trees.get(material_index)
+        if tree is None:
+            return -1, False
+        hits = tree.find_range((uv[0], uv[1], 0.0), tolerance)
+        if not hits:
+            return -1, False
+        verts = self.tree_verts[material_index]
+        nearest = min(hits, key=lambda hit: hit[2])
+        vert_index = verts[nearest[1]]
+        overlapping = any(verts[hit[1]] != vert_index for hit in hits)
+        return vert_index, overlapping
+
+    def find_all(self, uvs, materials, tolerance):
+        """Bulk find for arrays of uvs and material indices.
+           Returns arrays of the matched vertex indices (-1 for none) and overlap flags."""
+        matches = np.full(len(uvs), -1, dtype=np.int32)
+        overlaps = np.zeros(len(uvs), dtype=bool)
+        for i, (uv, material_index) in enumerate(zip(uvs.tolist(), materials.tolist())):
+            matches[i], overlaps[i] = self.find(uv, material_index, tolerance)
+        return matches, overlaps
+
+
+def get_material_index_map(src_mesh, dst_mesh):
+    """Maps the source mesh material indices to the matching destination mesh material indices."""
     mat_map = {}
-    overlapping = {}
-
-    matching_vert_count = len(src_bm.verts) == len(dst_bm.verts)
-
     for i, src_mat in enumerate(src_mesh.materials):
         for j, dst_mat in enumerate(dst_mesh.materials):
             if src_mat == dst_mat:
                 mat_map[i] = j
             elif utils.strip_name(src_mat.name) == utils.strip_name(dst_mat.name):
                 mat_map[i] = j
-
     if len(src_mesh.materials) == 0:
         mat_map[0] = 0
-
-    vg_index = -1
-    if vertex_group and vertex_group in src_obj.vertex_groups:
-        vg_index = src_obj.vertex_groups[vertex_group].index
-
-    ul = src_bm.loops.layers.uv[0]
-    src_bm.verts.layers.deform.verify()
-    dl = src_bm.verts.layers.deform.active
-    face : bmesh.types.BMFace
-    loop : bmesh.types.BMLoop
-
-    for face in src_bm.faces:
-        if face.material_index in mat_map:
-            dst_material_idx = mat_map[face.material_index]
-            for loop in face.loops:
-                if vg_index >= 0:
-                    vert = src_bm.verts[loop.vert.index]
-                    weight = vert[dl][vg_index]
-                    if weight < threshold:
-                        continue
-                uv = loop[ul].uv.copy()
-                # why flatten the udims?
-                # because the in the sculpting tools, the separate sculpting meshes
-                # must flatten the udims to bake the textures correctly
-                if flatten_udim:
-                    uv.x -= int(uv.x)
-                uv_id = uv.to_tuple(accuracy), dst_material_idx
-                if uv_id in src_map and src_map[uv_id] != loop.vert.index:
-                    overlapping[uv_id] = True
-                src_map[uv_id] = loop.vert.index
-
-    ul = dst_bm.loops.layers.uv[0]
-    sl = None
-    if shape_key_name:
-        sl = dst_bm.verts.layers.shape.get(shape_key_name)
-    for face in dst_bm.faces:
-        for loop in face.loops:
-            uv = loop[ul].uv.copy()
-            if flatten_udim:
-                uv.x -= int(uv.x)
-            uv_id = uv.to_tuple(accuracy), face.material_index
-            # overlapping UV's can't be detected correctly so try to copy from just the index position
-            if matching_vert_count and uv_id in overlapping:
-                vert_index = loop.vert.index
-                src_pos = src_bm.verts[vert_index].co
-                if sl:
-                    loop.vert[sl] = src_pos
-                else:
-                    loop.vert.co = src_pos
-            elif uv_id in src_map:
-                src_vert = src_map[uv_id]
-                src_pos = src_bm.verts[src_vert].co
-                if sl:
-                    loop.vert[sl] = src_pos
-                else:
-                    loop.vert.co = src_pos
-
-    dst_bm.to_mesh(dst_mesh)
+    return mat_map
 
 
-def copy_vert_positions_by_index(src_obj, dst_obj, vertex_group = None, threshold = 0.004, shape_key_name = None):
-
+def prep_shape_key_target(dst_obj, shape_key_name):
     mesh : bpy.types.Mesh = dst_obj.data
     if shape_key_name:
         if not mesh.shape_keys:
@@ -320,69 +352,122 @@ def copy_vert_positions_by_index(src_obj, dst_obj, vertex_group = None, threshol
         if shape_key_name not in mesh.shape_keys.key_blocks:
             shape_key = dst_obj.shape_key_add(name = shape_key_name)
             shape_key_name = shape_key.name
+    return shape_key_name
 
-    src_mesh = src_obj.data
-    dst_mesh = dst_obj.data
 
-    src_bm = bmesh.new()
-    dst_bm = bmesh.new()
+def copy_vert_positions_by_uv_id(src_obj, dst_obj, accuracy=5, vertex_group=None,
+                                 threshold=0.004, shape_key_name=None, flatten_udim=False,
+                                 tolerance=None):
+    """Copies the source vertex positions onto the destination vertices with matching UV's
+       (within tolerance, default 10^-accuracy) in matching materials."""
 
-    src_bm.from_mesh(src_mesh)
-    src_bm.faces.ensure_lookup_table()
-    src_bm.verts.ensure_lookup_table()
+    shape_key_name = prep_shape_key_target(dst_obj, shape_key_name)
 
-    dst_bm.from_mesh(dst_mesh)
-    dst_bm.faces.ensure_lookup_table()
-    dst_bm.verts.ensure_lookup_table()
+    src_mesh = src_obj.data
+    dst_mesh = dst_obj.data
+    if not src_mesh.uv_layers or not dst_mesh.uv_layers:
+        return
 
-    src_verts = []
+    if tolerance is None:
+        tolerance = pow(10, -accuracy)
 
-    matching_vert_count = len(src_bm.verts) == len(dst_bm.verts)
-    if not matching_vert_count:
-        return
+    matching_vert_count = len(src_mesh.vertices) == len(dst_mesh.vertices)
+    mat_map = get_material_index_map(src_mesh, dst_mesh)
 
-    vg_index = -1
+    # source loops in mapped materials (and above the vertex group weight threshold)
+    src_uvs, src_loop_verts, src_loop_materials = get_loop_uv_data(src_obj, flatten_udim)
+    mapped = np.full(max(len(src_mesh.materials), 1) + 1, -1, dtype=np.int32)
+    for i, j in mat_map.items():
+        mapped[i] = j
+    # material indices without a slot map to the trailing -1
+    src_loop_materials = mapped[np.clip(src_loop_materials, 0, len(mapped) - 1)]
+    valid = src_loop_materials >= 0
     if vertex_group and vertex_group in src_obj.vertex_groups:
-        vg_index = src_obj.vertex_groups[vertex_group].index
+        weights = get_vertex_group_weights(src_obj, vertex_group)
+        valid &= weights[src_loop_verts] >= threshold
+    uv_index = UVIndex(src_uvs[valid], src_loop_verts[valid], src_loop_materials[valid])
+
+    # match the destination loops
+    dst_uvs, dst_loop_verts, dst_loop_materials = get_loop_uv_data(dst_obj, flatten_udim)
+    matches, overlaps = uv_index.find_all(dst_uvs, dst_loop_materials, tolerance)
+    # overlapping UV's can't be matched correctly so try to copy from just the index position
+    if matching_vert_count:
+        matches[overlaps] = dst_loop_verts[overlaps]
+    found = matches >= 0
 
-    src_bm.verts.layers.deform.verify()
-    dl = src_bm.verts.layers.deform.active
-    loop : bmesh.types.BMLoop
+    src_positions = get_vertex_positions(src_obj)
+    dst_positions = get_vertex_positions(dst_obj, shape_key_name)
+    dst_positions[dst_loop_verts[found]] = src_positions[matches[found]]
+    set_vertex_positions(dst_obj, dst_positions, shape_key_name)
 
-    for vert in src_bm.verts:
-        if vg_index >= 0:
-            weight = vert[dl][vg_index]
-            if weight < threshold:
-                continue
-        src_verts.append(vert.index)
 
-    sl = None
-    if shape_key_name:
-        sl = dst_bm.verts.layers.shape.get(shape_key_name)
-    for vert in dst_bm.verts:
-        if vert.index in src_verts:
-            src_pos = src_bm.verts[vert.index].co
-            if sl:
-                vert[sl] = src_pos
-            else:
-                vert.co = src_pos
+def copy_vert_positions_by_index(src_obj, dst_obj, vertex_group = None, threshold = 0.004, shape_key_name = None):
 
-    dst_bm.to_mesh(dst_mesh)
+    shape_key_name = prep_shape_key_target(dst_obj, shape_key_name)
+
+    matching_vert_count = len(src_obj.data.vertices) == len(dst_obj.data.vertices)
+    if not matching_vert_count:
+        return
 
+    src_positions = get_vertex_positions(src_obj)
+    dst_positions = get_vertex_positions(dst_obj, shape_key_name)
 
-def map_image_to_vertex_weights(obj, mat, image, vertex_group, func):
-    width = image.size[0]
-    height = image.size[1]
-    wmo = width - 1
-    hmo = height - 1
-    uhw = 1 / (wmo * 2)
-    vhw = 1 / (hmo * 2)
-    pixels = image.pixels[:]
+    if vertex_group and vertex_group in src_obj.vertex_groups:
+        weights = get_vertex_group_weights(src_obj, vertex_group)
+        copy = weights >= threshold
+        dst_positions[copy] = src_positions[copy]
+    else:
+        dst_positions[:] = src_positions
+
+    set_vertex_positions(dst_obj, dst_positions, shape_key_name)
+
+
+def sample_image_bilinear(image_values, uvs):
+    """Bilinear samples an (h, w) array of image values at (L, 2) uv coordinates,
+       uv 0 and 1 mapping to the first and last pixel centres."""
+    height, width = image_values.shape
+    x = np.clip(uvs[:, 0], 0, 1) * (width - 1)
+    y = np.clip(uvs[:, 1], 0, 1) * (height - 1)
+    x0 = np.floor(x).astype(np.int32)
+    y0 = np.floor(y).astype(np.int32)
+    x1 = np.minimum(x0 + 1, width - 1)
+    y1 = np.minimum(y0 + 1, height - 1)
+    fx = x - x0
+    fy = y - y0
+    top = image_values[y0, x0] * (1 - fx) + image_values[y0, x1] * fx
+    bottom = image_values[y1, x0] * (1 - fx) + image_values[y1, x1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def set_vertex_group_weights(obj, vertex_group, vert_indices, weights, steps=1024):
+    """Writes the weights of the given vertices to the vertex group in bulk,
+       one vertex_group.add() call per distinct weight value.
+       Weights are quantized to 1/steps so continuous weights group into at most steps + 1 calls."""
     if vertex_group in obj.vertex_groups:
         vg = obj.vertex_groups[vertex_group]
     else:
         vg = obj.vertex_groups.new(name=vertex_group)
-    vg_index = vg.index
+    weights = np.asarray(weights, dtype=np.float64)
+    if steps:
+        weights = np.round(weights * steps) / steps
+    values, inverse = np.unique(weights, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    order = np.argsort(inverse, kind="stable")
+    splits = np.cumsum(np.bincount(inverse, minlength=len(values)))[:-1]
+    for value, indices in zip(values.tolist(), np.split(np.asarray(vert_indices)[order], splits)):
+        vg.add(indices.tolist(), value, "REPLACE")
+    return vg
+
+
+def map_image_to_vertex_weights(obj, mat, image, vertex_group, func=None, reduce="MAX"):
+    """Samples the red channel of the image at the uv's of every loop in the material
+       (bilinear), reduces the samples of each vertex (MAX or AVERAGE), optionally remaps
+       them with the vectorized function func(values) and writes them to the vertex group."""
+    width = image.size[0]
+    height = image.size[1]
+    pixels = np.empty(width * height * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    image_values = pixels.reshape(height, width, 4)[:, :, 0]
 
     mat_index = -1
     for i, slot in enumerate(obj.material_slots):
@@ -390,29 +475,32 @@ def map_image_to_vertex_weights(obj, mat, image, vertex_group, func):
             mat_index = i
             break
 
-    mesh = obj.data
-    bm = bmesh.new()
-    bm.from_mesh(mesh)
-    bm.faces.ensure_lookup_table()
-    bm.verts.ensure_lookup_table()
+    uvs, loop_verts, loop_materials = get_loop_uv_data(obj)
+    selected = loop_materials == mat_index
+    uvs = uvs[selected]
+    loop_verts = loop_verts[selected]
+    if len(loop_verts) == 0:
+        return
 
-    ul = bm.loops.layers.uv[0]
-    bm.verts.layers.deform.verify()
-    dl = bm.verts.layers.deform.active
-    for face in bm.faces:
-        if face.material_index == mat_index:
-            for loop in face.loops:
-                uv = loop[ul].uv
-                uv.x -= int(uv.x)
-                uv.y -= int(uv.y)
-                vert = bm.verts[loop.vert.index]
-                x = int((uv.x + uhw) * wmo)
-                y = int((uv.y + vhw) * hmo)
-                pixel_value = pixels[x * 4 + y * width * 4]
-                weight = func(pixel_value)
-                vert[dl][vg_index] = weight
+    # sample within the tile
+    uvs -= np.trunc(uvs)
+    samples = sample_image_bilinear(image_values, uvs)
+    if func:
+        samples = func(samples)
 
-    bm.to_mesh(mesh)
+    num_verts = len(obj.data.vertices)
+    if reduce == "AVERAGE":
+        totals = np.bincount(loop_verts, weights=samples, minlength=num_verts)
+        counts = np.bincount(loop_verts, minlength=num_verts)
+        vert_indices = np.flatnonzero(counts)
+        weights = totals[vert_indices] / counts[vert_indices]
+    else: # MAX
+        weights = np.full(num_verts, -np.inf)
+        np.maximum.at(weights, loop_verts, samples)
+        vert_indices = np.flatnonzero(weights > -np.inf)
+        weights = weights[vert_indices]
+
+    set_vertex_group_weights(obj, vertex_group, vert_indices, weights.astype(np.float32))
 
 
 def add_vertex_groups_to_selected(obj: bpy.types.Object, vertex_groups, weight, remove_empty=True):
@@ -808,47 +896,73 @@ def barycentric_weight(b_co, w0, w1, w2):
     return bc_u * w0 + bc_v * w1 + bc_w * w2
 
 
-def map_body_weight_blends(body, obj, bm_obj: bmesh.types.BMesh):
-    weight_blends = {}
-    v: bmesh.types.BMVert
-    f: bmesh.types.BMFace
-    BMW = body.matrix_world
-    BMWI = BMW.inverted()
-    OMW = obj.matrix_world
+def build_body_bvh(body):
+    """Builds a BVH tree of the evaluated body mesh in body local space,
+       to be reused for the proximity queries of all the clothing objects."""
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    return BVHTree.FromObject(body, depsgraph)
+
+
+def map_body_weight_blends(body, obj, bm_obj: bmesh.types.BMesh, body_bvh: BVHTree = None):
+    """Returns an array of the distance of each object vertex above the body surface,
+       0 for vertices inside the body and -1 where no closest point is found."""
+    if body_bvh is None:
+        body_bvh = build_body_bvh(body)
+    BMW = np.array(body.matrix_world, dtype=np.float64)
+    BMWI = np.array(body.matrix_world.inverted(), dtype=np.float64)
+    OMW = np.array(obj.matrix_world, dtype=np.float64)
     # object local to body local matrix
     OLTBL = BMWI @ OMW
-    for v in bm_obj.verts:
-        #diag_mesh_create()
-        #diag_to_bmesh()
-        obj_world_co = OMW @ v.co
-        body_local_co = OLTBL @ v.co
-        success, closest_local_co, closest_local_no, closest_face_index = body.closest_point_on_mesh(body_local_co)
-        if success:
-            closest_world_co = BMW @ closest_local_co
-            delta = obj_world_co - closest_world_co
-            no = (BMW @ closest_local_no).normalized()
-            if delta.dot(no) < 0:
-                weight_blends[v.index] = 0
-            else:
-                weight_blends[v.index] = delta.length
-            #diag_mesh_add_edge(closest_world_co, obj_world_co)
-        else:
-            #diag_mesh_add_vert(body_local_co)
-            weight_blends[v.index] = -1
-        #diag_from_bmesh()
+
+    num_verts = len(bm_obj.verts)
+    obj_co = np.array([ v.co[:] for v in bm_obj.verts ], dtype=np.float64).reshape(-1, 3)
+    obj_world_co = obj_co @ OMW[:3, :3].T + OMW[:3, 3]
+    body_local_co = obj_co @ OLTBL[:3, :3].T + OLTBL[:3, 3]
+
+    # batch the nearest point queries
+    closest_co = np.zeros((num_verts, 3), dtype=np.float64)
+    closest_no = np.zeros((num_verts, 3), dtype=np.float64)
+    found = np.zeros(num_verts, dtype=bool)
+    find_nearest = body_bvh.find_nearest
+    for i, co in enumerate(body_local_co.tolist()):
+        location, normal, index, distance = find_nearest(co)
+        if location is not None:
+            closest_co[i] = location
+            closest_no[i] = normal
+            found[i] = True
+
+    closest_world_co = closest_co @ BMW[:3, :3].T + BMW[:3, 3]
+    delta = obj_world_co - closest_world_co
+    no = closest_no @ np.linalg.inv(BMW[:3, :3])
+    no /= np.maximum(np.linalg.norm(no, axis=1), 1e-12)[:, np.newaxis]
+    inside = np.einsum("ij,ij->i", delta, no) < 0
+    weight_blends = np.linalg.norm(delta, axis=1)
+    weight_blends[inside] = 0
+    weight_blends[~found] = -1
     return weight_blends
 
 
-def fetch_vertex_layer_weights(bm: bmesh.types.BMesh, layer_index):
+def fetch_vertex_layer_weights(bm: bmesh.types.BMesh, layer_indices):
+    """Fetches the deform weights of the given layers for all vertices in one pass.
+       Returns the (layers, verts) weight matrix and a matching matrix of group membership."""
     bm.verts.layers.deform.verify()
     dl = bm.verts.layers.deform.active
-    weights = {}
+    row_of_layer = { layer: row for row, layer in enumerate(layer_indices) }
+    rows = []
+    cols = []
+    values = []
     for vert in bm.verts:
-        try:
-            weights[vert.index] = vert[dl][layer_index]
-        except:
-            weights[vert.index] = 0.0
-    return weights
+        for layer, weight in vert[dl].items():
+            row = row_of_layer.get(layer)
+            if row is not None:
+                rows.append(row)
+                cols.append(vert.index)
+                values.append(weight)
+    weights = np.zeros((len(layer_indices), len(bm.verts)), dtype=np.float32)
+    present = np.zeros((len(layer_indices), len(bm.verts)), dtype=bool)
+    weights[rows, cols] = values
+    present[rows, cols] = True
+    return weights, present
 
 
 DIAG_NAME = "DiagnosticMesh"
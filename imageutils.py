@@ -15,10 +15,19 @@
 # along with CC/iC Blender Tools.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
+import json
+import zlib
+import tempfile
 import bpy
 
 from . import colorspace, nodeutils, params, lib, utils, vars
 
+# optional fast non-cryptographic hash for image de-duplication
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 
 IMAGE_FORMATS = {
     "PNG": ".png",
@@ -48,62 +57,225 @@ def check_max_size(image):
         image.scale(min(width, prefs.max_texture_size), min(height, prefs.max_texture_size))
 
 
+IMAGE_HASH_CACHE = None
+IMAGE_HASH_CACHE_DIRTY = False
+IMAGE_HASH_CACHE_MAX = 10000
+HASH_CHUNK_SIZE = 1048576
+
+
+def get_image_hash_cache_path():
+    try:
+        folder = bpy.utils.user_resource("CONFIG", path="cc_blender_tools", create=True)
+    except:
+        folder = os.path.join(tempfile.gettempdir(), "cc_blender_tools")
+        os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, "image_hashes.json")
+
+
+def get_image_hash_cache():
+    """Returns the persistent image file hash cache: { path: [size, mtime_ns, hash] },
+       loading it from disk on first use."""
+    global IMAGE_HASH_CACHE
+    if IMAGE_HASH_CACHE is None:
+        IMAGE_HASH_CACHE = {}
+        try:
+            cache_path = get_image_hash_cache_path()
+            if os.path.exists(cache_path):
+                with open(cache_path, "r") as file:
+                    IMAGE_HASH_CACHE = json.load(file)
+        except Exception as e:
+            utils.log_warn(f"Unable to read image hash cache: {e}")
+            IMAGE_HASH_CACHE = {}
+    return IMAGE_HASH_CACHE
+
+
+def save_image_hash_cache():
+    global IMAGE_HASH_CACHE_DIRTY
+    if IMAGE_HASH_CACHE is None or not IMAGE_HASH_CACHE_DIRTY:
+        return
+    # drop the oldest entries when the cache gets too big
+    excess = len(IMAGE_HASH_CACHE) - IMAGE_HASH_CACHE_MAX
+    if excess > 0:
+        for path in list(IMAGE_HASH_CACHE.keys())[:excess]:
+            del IMAGE_HASH_CACHE[path]
+    try:
+        with open(get_image_hash_cache_path(), "w") as file:
+            json.dump(IMAGE_HASH_CACHE, file)
+        IMAGE_HASH_CACHE_DIRTY = False
+    except Exception as e:
+        utils.log_warn(f"Unable to write image hash cache: {e}")
+
+
+def fast_file_hash(file_path):
+    """Non-cryptographic file content hash: xxh3 if available, otherwise crc32 + adler32."""
+    with open(file_path, "rb") as file:
+        if xxhash:
+            hash = xxhash.xxh3_128()
+            for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+                hash.update(chunk)
+            return "xxh3:" + hash.hexdigest()
+        crc = 0
+        adler = 1
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            crc = zlib.crc32(chunk, crc)
+            adler = zlib.adler32(chunk, adler)
+        return f"crc:{crc:08x}{adler:08x}"
+
+
+def file_content_hash(file_path, hash_method="FAST"):
+    """Returns the content hash of the file, using the persistent hash cache when the file
+       size and modified time haven't changed since it was last hashed."""
+    global IMAGE_HASH_CACHE_DIRTY
+    try:
+        stat = os.stat(file_path)
+    except:
+        return None
+    cache = get_image_hash_cache()
+    key = os.path.normpath(os.path.abspath(file_path))
+    prefix = "md5:" if hash_method == "MD5" else ("xxh3:" if xxhash else "crc:")
+    entry = cache.get(key)
+    if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns and entry[2].startswith(prefix):
+        return entry[2]
+    if hash_method == "MD5":
+        hash = "md5:" + utils.md5sum(file_path)
+    else:
+        hash = fast_file_hash(file_path)
+    cache[key] = [stat.st_size, stat.st_mtime_ns, hash]
+    IMAGE_HASH_CACHE_DIRTY = True
+    return hash
+
+
+# blend file images indexed by normalized file path: { path: image name }
+# shared by every image registry, so the images are only re-indexed when the blend file images change,
+# not once for every registry (or every load_image call without one).
+IMAGE_PATH_INDEX = {}
+IMAGE_PATH_INDEX_COUNT = -1
+
+
+def image_path_key(file_path):
+    return os.path.normpath(bpy.path.abspath(file_path))
+
+
+def index_images(force=False):
+    global IMAGE_PATH_INDEX_COUNT
+    if not force and IMAGE_PATH_INDEX_COUNT == len(bpy.data.images):
+        return
+    IMAGE_PATH_INDEX.clear()
+    for image in bpy.data.images:
+        if image.type == "IMAGE" and image.filepath != "":
+            IMAGE_PATH_INDEX.setdefault(image_path_key(image.filepath), image.name)
+    IMAGE_PATH_INDEX_COUNT = len(bpy.data.images)
+
+
+def find_indexed_image(key):
+    name = IMAGE_PATH_INDEX.get(key)
+    if name is not None:
+        image = bpy.data.images.get(name)
+        if image and image.filepath != "" and image_path_key(image.filepath) == key:
+            return image
+    return None
+
+
+class ImageRegistry:
+    """Looks up the blend file images by normalized file path (from the shared image path index)
+       and, when de-duplicating, by file content hash, so that image lookups while building materials
+       don't have to scan bpy.data.images or re-hash the image files for every texture slot."""
+
+    def __init__(self, deduplicate=True, hash_method=None):
+        self.deduplicate = deduplicate
+        if hash_method is None:
+            hash_method = vars.prefs().import_image_hash if deduplicate else "NONE"
+        self.hash_method = hash_method
+        self.hashes = {}
+
+    def add_image(self, image, image_hash=None):
+        global IMAGE_PATH_INDEX_COUNT
+        key = image_path_key(image.filepath)
+        if find_indexed_image(key) is None:
+            IMAGE_PATH_INDEX[key] = image.name
+        IMAGE_PATH_INDEX_COUNT = len(bpy.data.images)
+        if image_hash:
+            self.hashes.setdefault(image_hash, image)
+
+    def find_by_path(self, file_path):
+        index_images()
+        key = os.path.normpath(os.path.abspath(file_path))
+        image = find_indexed_image(key)
+        if image is None:
+            # missing or stale entry: image paths can change without the image count changing,
+            # so rebuild the index once before giving up
+            index_images(force=True)
+            image = find_indexed_image(key)
+        return image
+
+    def find_by_hash(self, image_hash):
+        image = self.hashes.get(image_hash)
+        if image is not None and not utils.image_exists(image):
+            del self.hashes[image_hash]
+            image = None
+        return image
+
+    def hash_file(self, file_path):
+        if self.deduplicate and os.path.exists(file_path):
+            return file_content_hash(file_path, self.hash_method)
+        return None
+
+
 # load an image from a file, but try to find it in the existing images first
-def load_image(filename, color_space, processed_images = None, reuse_existing = True):
+def load_image(filename, color_space, processed_images: ImageRegistry = None, reuse_existing = True):
 
     i: bpy.types.Image = None
     # TODO: should the de-duplication only consider images brough in from the import.
     #       (but then the rebuild won't work...)
     #       or only consider images with the characters folder as a common path...
 
+    registry = processed_images
+    if registry is None:
+        registry = ImageRegistry(deduplicate=False, hash_method="NONE")
+
     if reuse_existing:
 
-        for i in bpy.data.images:
-            if i.type == "IMAGE" and i.filepath != "":
-
-                if os.path.normpath(bpy.path.abspath(i.filepath)) == os.path.normpath(os.path.abspath(filename)):
-                    utils.log_info("Using existing image: " + i.filepath)
-                    found = False
-                    image_md5 = None
-                    image_path = bpy.path.abspath(i.filepath)
-                    if processed_images is not None and os.path.exists(image_path):
-                        image_md5 = utils.md5sum(image_path)
-                        for p in processed_images:
-                            if p[0] == image_md5:
-                                utils.log_info("Skipping duplicate existing image, reusing: " + p[1].filepath)
-                                i = p[1]
-                                found = True
-                    if (i.depth == 32 or i.depth == 128) and i.alpha_mode != "CHANNEL_PACKED":
-                        i.alpha_mode = "CHANNEL_PACKED"
-                    if processed_images is not None and i and image_md5 and not found:
-                        processed_images.append([image_md5, i])
-                        if not i.is_dirty:
-                            utils.log_detail(f"Reloading image: {i.name}")
-                            try:
-                                i.reload()
-                            except:
-                                utils.log_detail(f"Unable to reload image: {i.name}")
-                        else:
-                            utils.log_info(f"Image {i.name} has been modified, keeping in-memory image.")
-                    colorspace.set_image_color_space(i, color_space)
-                    return i
+        i = registry.find_by_path(filename)
+        if i:
+            utils.log_info("Using existing image: " + i.filepath)
+            found = False
+            image_hash = registry.hash_file(bpy.path.abspath(i.filepath))
+            if image_hash:
+                p = registry.find_by_hash(image_hash)
+                if p:
+                    utils.log_info("Skipping duplicate existing image, reusing: " + p.filepath)
+                    i = p
+                    found = True
+            if (i.depth == 32 or i.depth == 128) and i.alpha_mode != "CHANNEL_PACKED":
+                i.alpha_mode = "CHANNEL_PACKED"
+            if image_hash and not found:
+                registry.add_image(i, image_hash)
+                if not i.is_dirty:
+                    utils.log_detail(f"Reloading image: {i.name}")
+                    try:
+                        i.reload()
+                    except:
+                        utils.log_detail(f"Unable to reload image: {i.name}")
+                else:
+                    utils.log_info(f"Image {i.name} has been modified, keeping in-memory image.")
+            colorspace.set_image_color_space(i, color_space)
+            return i
 
     try:
-        image_md5 = None
-        if processed_images is not None and os.path.exists(filename):
-            image_md5 = utils.md5sum(filename)
-            for p in processed_images:
-                if p[0] == image_md5 and utils.image_exists(p[1]):
-                    utils.log_info("Skipping duplicate image, reusing existing: " + p[1].filepath)
-                    return p[1]
+        image_hash = registry.hash_file(filename)
+        if image_hash:
+            p = registry.find_by_hash(image_hash)
+            if p:
+                utils.log_info("Skipping duplicate image, reusing existing: " + p.filepath)
+                return p
         utils.log_info("Loading new image: " + filename)
         image = bpy.data.images.load(filename)
         colorspace.set_image_color_space(image, color_space)
         if (image.depth == 32 or image.depth == 128):
             image.alpha_mode = "CHANNEL_PACKED"
         #check_max_size(image)
-        if processed_images is not None and image and image_md5:
-            processed_images.append([image_md5, image])
+        if image:
+            registry.add_image(image, image_hash)
         return image
     except Exception as e:
         utils.log_error("Unable to load image: " + filename, e)
@@ -120,11 +292,11 @@ def find_image_file(base_dir, dirs, mat, texture_type):
         if dir:
             # if the texture folder does not exist, (e.g. files have been moved)
             # remap the relative path to the current blend file directory to try and find the images there
-            if not os.path.exists(dir):
+            if not dir_exists(dir):
                 dir = utils.local_repath(dir, base_dir)
 
             dir = os.path.normpath(dir)
-            if dir and os.path.exists(dir):
+            if dir and dir_exists(dir):
                 if last != dir:
                     last = dir
                     for suffix in suffix_list:
@@ -136,10 +308,62 @@ def find_image_file(base_dir, dirs, mat, texture_type):
     return None
 
 
+# texture folder listings indexed during an import or rebuild: { folder: (mtime_ns, { stem: path }) }
+# (None when no index scope is active, in which case folders are listed directly)
+TEXTURE_DIR_INDEX = None
+
+
+def begin_texture_dir_index():
+    """Start indexing texture folder listings, each folder is then only listed once
+       (or again when its modified time changes) until end_texture_dir_index()."""
+    global TEXTURE_DIR_INDEX
+    TEXTURE_DIR_INDEX = {}
+
+
+def end_texture_dir_index():
+    global TEXTURE_DIR_INDEX
+    TEXTURE_DIR_INDEX = None
+
+
+def get_dir_index(search_dir):
+    """Returns the case-folded file name stem -> file path index of the folder,
+       or None if the folder doesn't exist."""
+    try:
+        mtime = os.stat(search_dir).st_mtime_ns
+    except:
+        return None
+    key = os.path.normpath(search_dir)
+    if TEXTURE_DIR_INDEX is not None and key in TEXTURE_DIR_INDEX:
+        index_mtime, index = TEXTURE_DIR_INDEX[key]
+        if index_mtime == mtime:
+            return index
+    index = {}
+    try:
+        for f in os.listdir(search_dir):
+            name, ext = os.path.splitext(f)
+            index.setdefault(name.lower(), os.path.join(search_dir, f))
+    except:
+        return None
+    if TEXTURE_DIR_INDEX is not None:
+        TEXTURE_DIR_INDEX[key] = (mtime, index)
+    return index
+
+
+def dir_exists(search_dir):
+    if TEXTURE_DIR_INDEX is not None:
+        return get_dir_index(search_dir) is not None
+    return os.path.exists(search_dir)
+
+
 def find_file_by_name(search_dir, search):
     """Find the file by the name (without extension)."""
 
     search = search.lower()
+    if TEXTURE_DIR_INDEX is not None:
+        index = get_dir_index(search_dir)
+        if index:
+            return index.get(search)
+        return None
     if os.path.exists(search_dir):
         files = os.listdir(search_dir)
         for f in files:
@@ -364,9 +588,9 @@ def get_material_tex_dir(chr_cache, obj, mat):
         path_object = os.path.join(chr_cache.get_import_dir(), rel_object)
         rel_character = os.path.join("textures", chr_cache.get_character_id(), chr_cache.get_character_id(), mesh_name, material_name)
         path_character = os.path.join(chr_cache.get_import_dir(), rel_character)
-        if os.path.exists(path_object):
+        if dir_exists(path_object):
             return rel_object
-        elif os.path.exists(path_character):
+        elif dir_exists(path_character):
             return rel_character
         else:
             return os.path.join(chr_cache.get_character_id() + ".fbm")
@@ -22,7 +22,7 @@ from enum import IntEnum, IntFlag
 from . import (rlx, characters, hik, rigging, rigutils, bones, bake, imageutils, jsonutils, materials,
                facerig, modifiers, meshutils, wrinkle, drivers, nodeutils, physics,
                rigidbody, colorspace, scene, channel_mixer, shaders,
-               basic, lib, cc, utils, vars)
+               basic, lib, cc, properties, utils, vars)
 
 debug_counter = 0
 
@@ -33,6 +33,7 @@ def delete_import(chr_cache):
     chr_cache.delete()
     chr_cache.clean_up()
     utils.remove_from_collection(props.import_cache, chr_cache)
+    properties.invalidate_cache_index()
     utils.clean_up_unused()
 
 
@@ -578,6 +579,7 @@ def process_rl_import(file_path, import_flags, armatures, rl_armatures, empties,
             utils.log_indent()
 
             chr_cache = props.import_cache.add()
+            properties.invalidate_cache_index()
             chr_cache.import_file = file_path
             chr_cache.import_flags = import_flags
             # display name of character
@@ -705,6 +707,7 @@ def process_rl_import(file_path, import_flags, armatures, rl_armatures, empties,
             utils.log_indent()
 
             chr_cache = props.import_cache.add()
+            properties.invalidate_cache_index()
             chr_cache.import_file = file_path
             chr_cache.import_flags = import_flags
             # display name of character
@@ -828,6 +831,7 @@ def process_rl_import(file_path, import_flags, armatures, rl_armatures, empties,
         utils.log_indent()
 
         chr_cache = props.import_cache.add()
+        properties.invalidate_cache_index()
         chr_cache.import_file = file_path
         chr_cache.import_flags = import_flags
         # display name of character
@@ -1286,77 +1290,84 @@ class CC3Import(bpy.types.Operator):
         utils.log_info("-----------------------------")
 
         lib.check_node_groups()
+        imageutils.begin_texture_dir_index()
+        properties.invalidate_material_dependencies()
 
-        if self.imported_character_ids:
-            on_import = True
-            imported_characters = props.get_characters_by_link_id(self.imported_character_ids)
-        else:
-            on_import = False
-            chr_cache = props.get_context_character_cache(context)
-            imported_characters = [ chr_cache ]
-
-        for chr_cache in imported_characters:
-
-            if ImportFlags.RL not in ImportFlags(chr_cache.import_flags): continue
-
-            # for any objects with shape keys expand the slider range to -1.5 - 1.5
-            # Character Creator and iClone both use negative ranges extensively.
-            for obj in chr_cache.get_cache_objects():
-                obj_cache = chr_cache.get_object_cache(obj)
-                if obj_cache and obj_cache.is_mesh():
-                    init_shape_key_range(obj)
-
-            json_data = self.read_json_data(chr_cache.import_file, stage = 1)
-            if not on_import:
-                # when rebuilding, use the currently selected render target
-                chr_cache.render_target = render_target
+        try:
+            if self.imported_character_ids:
+                on_import = True
+                imported_characters = props.get_characters_by_link_id(self.imported_character_ids)
+            else:
+                on_import = False
+                chr_cache = props.get_context_character_cache(context)
+                imported_characters = [ chr_cache ]
 
-            chr_json = jsonutils.get_character_json(json_data, chr_cache.get_character_id())
+            for chr_cache in imported_characters:
 
-            if self.param == "BUILD" or self.param == "BUILD_REBUILD":
-                chr_cache.check_material_types(chr_json)
+                if ImportFlags.RL not in ImportFlags(chr_cache.import_flags): continue
 
-            # update character data props
-            chr_cache.check_ids()
+                # for any objects with shape keys expand the slider range to -1.5 - 1.5
+                # Character Creator and iClone both use negative ranges extensively.
+                for obj in chr_cache.get_cache_objects():
+                    obj_cache = chr_cache.get_object_cache(obj)
+                    if obj_cache and obj_cache.is_mesh():
+                        init_shape_key_range(obj)
 
-            if prefs.import_deduplicate:
-                processed_images = []
-                processed_materials = []
-            else:
-                processed_images = None
-                processed_materials = None
+                json_data = self.read_json_data(chr_cache.import_file, stage = 1)
+                if not on_import:
+                    # when rebuilding, use the currently selected render target
+                    chr_cache.render_target = render_target
 
-            if props.build_mode == "IMPORTED":
-                chr_objects = chr_cache.get_cache_objects()
-                for obj in chr_objects:
-                    obj_cache = chr_cache.get_object_cache(obj)
-                    if obj and obj_cache:
-                        process_object(chr_cache, obj, obj_cache, objects_processed,
-                                       chr_json, processed_materials, processed_images)
+                chr_json = jsonutils.get_character_json(json_data, chr_cache.get_character_id())
 
-                # setup default physics
-                if props.physics_mode:
-                    utils.log_info("")
-                    physics.apply_all_physics(chr_cache)
+                if self.param == "BUILD" or self.param == "BUILD_REBUILD":
+                    chr_cache.check_material_types(chr_json)
 
-                chr_cache.build_count += 1
+                # update character data props
+                chr_cache.check_ids()
 
-            # only processes the selected objects that are listed in the import_cache (character)
-            elif props.build_mode == "SELECTED":
-                for obj in bpy.context.selected_objects:
-                    obj_cache = chr_cache.get_object_cache(obj)
-                    if obj_cache:
-                        process_object(chr_cache, obj, obj_cache, objects_processed,
-                                       chr_json, processed_materials, processed_images)
+                if prefs.import_deduplicate:
+                    processed_images = imageutils.ImageRegistry()
+                    processed_materials = []
+                else:
+                    processed_images = None
+                    processed_materials = None
+
+                if props.build_mode == "IMPORTED":
+                    chr_objects = chr_cache.get_cache_objects()
+                    for obj in chr_objects:
+                        obj_cache = chr_cache.get_object_cache(obj)
+                        if obj and obj_cache:
+                            process_object(chr_cache, obj, obj_cache, objects_processed,
+                                           chr_json, processed_materials, processed_images)
+
+                    # setup default physics
+                    if props.physics_mode:
+                        utils.log_info("")
+                        physics.apply_all_physics(chr_cache)
 
                     chr_cache.build_count += 1
 
-            for obj in objects_processed:
-                obj.update_tag()
-            for mat in processed_materials:
-                mat.update_tag()
-
-            chr_cache.update_all_properties(context)
+                # only processes the selected objects that are listed in the import_cache (character)
+                elif props.build_mode == "SELECTED":
+                    for obj in bpy.context.selected_objects:
+                        obj_cache = chr_cache.get_object_cache(obj)
+                        if obj_cache:
+                            process_object(chr_cache, obj, obj_cache, objects_processed,
+                                           chr_json, processed_materials, processed_images)
+
+                        chr_cache.build_count += 1
+
+                for obj in objects_processed:
+                    obj.update_tag()
+                for mat in processed_materials:
+                    mat.update_tag()
+
+                chr_cache.update_all_properties(context)
+        finally:
+            # never leave the texture folder index active after the build
+            imageutils.save_image_hash_cache()
+            imageutils.end_texture_dir_index()
 
         bpy.context.view_layer.update()
 
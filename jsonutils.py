@@ -16,23 +16,182 @@
 
 import json
 import os
+import sys
+import time
+import codecs
 import bpy
 import copy
 
-from . import utils
+from . import utils, vars
+
+# optional faster json parser, falls back to the standard library parser if not available
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 JSON_CACHE = {}
+JSON_CACHE_STATS = { "hits": 0, "misses": 0, "containers_copied": 0, "shallow_bytes_copied": 0 }
 
 
-def get_json_cache_copy(fbx_path):
-    if fbx_path in JSON_CACHE:
-        json_data = JSON_CACHE[fbx_path]
-        if json_data is not None:
-            return copy.deepcopy(json_data)
+class JsonCOW(dict):
+    """Copy-on-write view of cached json data: a shallow copy of one level of the cached
+       dictionary. Nested dictionaries and lists are only copied when they are accessed,
+       so the cached source data is never modified and untouched sub-trees are never copied."""
+
+    __slots__ = ("_owned",)
+
+    def __init__(self, source=None):
+        if type(source) is JsonCOW:
+            # copy the raw (un-owned) items, values owned by the source are re-wrapped on access
+            source = dict.items(source)
+        dict.__init__(self, source or {})
+        self._owned = set()
+        count_copied(self)
+
+    def _own(self, key, value):
+        if key not in self._owned:
+            value = cow_value(value)
+            dict.__setitem__(self, key, value)
+            self._owned.add(key)
+        return value
+
+    def __getitem__(self, key):
+        return self._own(key, dict.__getitem__(self, key))
+
+    def __iter__(self):
+        # a custom __iter__ stops dict(), {**cow} and dict.update() from using the C level
+        # fast merge, which would hand out the shared cached sub-dictionaries
+        return iter(self.keys())
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._owned.add(key)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(dict(self.items()), memo)
+
+    def __copy__(self):
+        return JsonCOW(self)
+
+    def copy(self):
+        return JsonCOW(self)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *args):
+        if key in self:
+            value = self[key]
+            dict.pop(self, key)
+            self._owned.discard(key)
+            return value
+        return dict.pop(self, key, *args)
+
+    def popitem(self):
+        key = next(reversed(self.keys()))
+        return key, self.pop(key)
+
+    def values(self):
+        return [ self[key] for key in self.keys() ]
+
+    def items(self):
+        return [ (key, self[key]) for key in self.keys() ]
+
+
+def count_copied(container):
+    """Counts the containers copied and their shallow size (not including their contents)."""
+    JSON_CACHE_STATS["containers_copied"] += 1
+    JSON_CACHE_STATS["shallow_bytes_copied"] += sys.getsizeof(container)
+
+
+def cow_value(value):
+    """Returns a private version of a cached json value that is safe to modify:
+       dictionaries are wrapped in a lazy copy-on-write view and lists are copied,
+       (lists are kept as true lists as they are type checked all over the add-on)."""
+    if type(value) is dict or type(value) is JsonCOW:
+        # owned views are re-wrapped so copies never share them
+        return JsonCOW(value)
+    elif type(value) is list:
+        copied = [ cow_value(item) for item in value ]
+        count_copied(copied)
+        return copied
+    return value
+
+
+def get_json_cache_stats():
+    return JSON_CACHE_STATS.copy()
+
+
+def reset_json_cache_stats():
+    for key in JSON_CACHE_STATS:
+        JSON_CACHE_STATS[key] = 0
+
+
+def clear_json_cache():
+    JSON_CACHE.clear()
+
+
+def log_json_cache_stats():
+    utils.log_info(f"Json cache: {JSON_CACHE_STATS['hits']} hits, {JSON_CACHE_STATS['misses']} misses, "
+                   f"{JSON_CACHE_STATS['containers_copied']} containers copied "
+                   f"({JSON_CACHE_STATS['shallow_bytes_copied']} shallow bytes).")
+
+
+def get_file_signature(file_path):
+    """Returns the (mtime, size) of the file, used to detect when the cached json is stale."""
+    try:
+        stat = os.stat(file_path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except:
         return None
 
 
+def find_json_path(fbx_path):
+    fbx_file = os.path.basename(fbx_path)
+    fbx_folder = os.path.dirname(fbx_path)
+    fbx_name = os.path.splitext(fbx_file)[0]
+    json_path = os.path.join(fbx_folder, fbx_name + ".json")
+    # if the json doesn't exist in the expected path, look for it in the blend file path
+    if not os.path.exists(json_path):
+        json_path = utils.local_path(fbx_name + ".json")
+    if json_path and os.path.exists(json_path):
+        # json_local is a custom version of the json created by the update/replace operator
+        # to incorporate new & replaced objects and materials though the datalink
+        json_local_path = json_path + "_local"
+        if os.path.exists(json_local_path):
+            json_path = json_local_path
+        return json_path
+    return None
+
+
+def cache_json(fbx_path, json_path, json_data):
+    JSON_CACHE[fbx_path] = (json_path, get_file_signature(json_path), json_data)
+
+
+def get_json_cache_copy(fbx_path, json_path=None):
+    """Returns a copy-on-write view of the cached json data for the fbx_path,
+       or None if there is no cached data or the json file has changed on disk since it was cached."""
+    if fbx_path in JSON_CACHE:
+        cached_path, signature, json_data = JSON_CACHE[fbx_path]
+        if json_path is None:
+            json_path = cached_path
+        if json_data is not None and json_path == cached_path and signature is not None:
+            if get_file_signature(json_path) == signature:
+                JSON_CACHE_STATS["hits"] += 1
+                return JsonCOW(json_data)
+        del JSON_CACHE[fbx_path]
+    return None
+
+
 def get_json_path(fbx_path):
     json_path = None
     if fbx_path:
@@ -45,52 +204,29 @@ def get_json_path(fbx_path):
 
 def read_json(fbx_path, errors, no_local=False):
     json_file_exists = False
-    json_cache = get_json_cache_copy(fbx_path)
-    if json_cache:
-        return json_cache
+    json_path = None
     try:
-        fbx_file = os.path.basename(fbx_path)
-        fbx_folder = os.path.dirname(fbx_path)
-        fbx_name = os.path.splitext(fbx_file)[0]
-        json_path = os.path.join(fbx_folder, fbx_name + ".json")
-        # if the json doesn't exist in the expected path, look for it in the blend file path
-        if not os.path.exists(json_path):
-            json_path = utils.local_path(fbx_name + ".json")
+        json_path = find_json_path(fbx_path)
 
-        if json_path and os.path.exists(json_path):
+        if json_path:
             json_file_exists = True
-            # json_local is a custom version of the json created by the update/replace operator
-            # to incorporate new & replaced objects and materials though the datalink
-            json_local_path = json_path + "_local"
-            if os.path.exists(json_local_path):
-                json_path = json_local_path
-
-            # determine start of json text data
-            file_bytes = open(json_path, "rb")
-            bytes = file_bytes.read(3)
-            file_bytes.close()
-            start = 0
-            # json files outputted from Visual Studio projects start with a byte mark order block (3 bytes EF BB BF)
-            if bytes[0] == 0xEF and bytes[1] == 0xBB and bytes[2] == 0xBF:
-                start = 3
-
-            # read json text
-            file = open(json_path, "rt")
-            file.seek(start)
-            text_data = file.read()
-            json_data = json.loads(text_data)
-            file.close()
-            JSON_CACHE[fbx_path] = json_data
+            json_cache = get_json_cache_copy(fbx_path, json_path)
+            if json_cache:
+                return json_cache
+            JSON_CACHE_STATS["misses"] += 1
+
+            json_data = load_json_file(json_path)
+            cache_json(fbx_path, json_path, json_data)
             utils.log_info("Json data successfully parsed: " + json_path)
-            return json_data
+            return JsonCOW(json_data)
 
         utils.log_info("No Json data to parse, using defaults...")
-        JSON_CACHE[fbx_path] = None
+        JSON_CACHE.pop(fbx_path, None)
         if errors:
             errors.append("NO_JSON")
         return None
     except:
-        utils.log_warn("Failed to read Json data: " + json_path)
+        utils.log_warn("Failed to read Json data: " + str(json_path))
         if errors:
             if json_file_exists:
                 errors.append("CORRUPT")
@@ -99,10 +235,90 @@ def read_json(fbx_path, errors, no_local=False):
         return None
 
 
+def parse_json_bytes(data):
+    """Parses json from a bytes buffer, skipping any utf-8 byte order mark."""
+    start = 0
+    # json files outputted from Visual Studio projects start with a byte mark order block (3 bytes EF BB BF)
+    if data.startswith(codecs.BOM_UTF8):
+        start = len(codecs.BOM_UTF8)
+    view = memoryview(data)[start:]
+    if orjson:
+        try:
+            return orjson.loads(view)
+        except orjson.JSONDecodeError:
+            # orjson is strict (e.g. no NaN / Infinity), let the standard parser try it
+            pass
+    return json.loads(str(view, "utf-8"))
+
+
+def load_json_file(json_path):
+    with open(json_path, "rb") as file:
+        data = file.read()
+    return parse_json_bytes(data)
+
+
+def benchmark_read_json(fbx_paths=None, repeat=5):
+    """Compares the previous two-open text read with a full deep copy per call against
+       the single bytes read parse and a cached copy-on-write lookup of one object's materials.
+       Uses the import files of the characters in the scene if no fbx_paths are given."""
+    utils.log_always("")
+    utils.log_always("BENCHMARK: Read Json")
+    utils.log_always("====================")
+    utils.log_always(f"Parser: {'orjson' if orjson else 'json'}")
+
+    if fbx_paths is None:
+        props = vars.props()
+        fbx_paths = [ chr_cache.import_file for chr_cache in props.import_cache ] if props else []
+
+    def read_text(json_path):
+        file_bytes = open(json_path, "rb")
+        bytes = file_bytes.read(3)
+        file_bytes.close()
+        start = 3 if bytes == codecs.BOM_UTF8 else 0
+        file = open(json_path, "rt", encoding="utf-8")
+        file.seek(start)
+        json_data = json.loads(file.read())
+        file.close()
+        return json_data
+
+    def first_object_materials(chr_json):
+        for character_id in chr_json:
+            meshes_json = get_character_meshes_json(chr_json, character_id)[0]
+            if meshes_json:
+                for obj_name in meshes_json:
+                    return meshes_json[obj_name]["Materials"]
+        return None
+
+    for fbx_path in fbx_paths:
+        json_path = find_json_path(fbx_path)
+        if not json_path:
+            continue
+        size = os.path.getsize(json_path)
+        utils.log_always(f"{os.path.basename(json_path)}: {size / 1048576:.2f} MB")
+
+        t = time.perf_counter()
+        for i in range(repeat):
+            first_object_materials(copy.deepcopy(read_text(json_path)))
+        utils.log_always(f"  text read + deepcopy: {(time.perf_counter() - t) * 1000 / repeat:.1f} ms")
+
+        t = time.perf_counter()
+        for i in range(repeat):
+            first_object_materials(load_json_file(json_path))
+        utils.log_always(f"  bytes read: {(time.perf_counter() - t) * 1000 / repeat:.1f} ms")
+
+        JSON_CACHE.pop(fbx_path, None)
+        read_json(fbx_path, None)
+        t = time.perf_counter()
+        for i in range(repeat):
+            first_object_materials(read_json(fbx_path, None))
+        utils.log_always(f"  cached copy-on-write lookup: {(time.perf_counter() - t) * 1000 / repeat:.3f} ms")
+
+    log_json_cache_stats()
+
+
 def write_json(json_data, path, is_fbx_path=False, is_json_local=False, update_cache=False):
+    fbx_path = path
     if is_fbx_path:
-        if update_cache:
-            JSON_CACHE[path] = json_data
         file = os.path.basename(path)
         folder = os.path.dirname(path)
         name = os.path.splitext(file)[0]
@@ -112,6 +328,13 @@ def write_json(json_data, path, is_fbx_path=False, is_json_local=False, update_c
     json_object = json.dumps(json_data, indent = 4)
     with open(path, "w") as write_file:
         write_file.write(json_object)
+    if is_fbx_path:
+        if update_cache:
+            # cache a private copy of the written data, so later changes to json_data
+            # by the caller can't leak into the cache
+            cache_json(fbx_path, path, json.loads(json_object))
+        else:
+            JSON_CACHE.pop(fbx_path, None)
 
 
 def safe_name(o):
@@ -429,6 +652,23 @@ def get_material_json_var(mat_json, var_path: str):
         return get_material_var(mat_json, var_name)
 
 
+def get_material_json_var_accessor(var_path: str):
+    """Returns a function(mat_json) that fetches the material json var, with the var path resolved up front."""
+    paths = var_path.split('/')
+    var_type = paths[0]
+    var_name = paths[1]
+    if var_type == "Custom":
+        return lambda mat_json: get_shader_var(mat_json, var_name)
+    elif var_type == "Reflection":
+        return lambda mat_json: get_direct_shader_var(mat_json, var_name)
+    elif var_type == "SSS":
+        return lambda mat_json: get_sss_var(mat_json, var_name)
+    elif var_type == "Pbr":
+        return lambda mat_json: get_pbr_var(mat_json, var_name, paths)
+    else: # var_type == "Base":
+        return lambda mat_json: get_material_var(mat_json, var_name)
+
+
 def get_shader_var(mat_json, var_name):
     if not mat_json:
         return None
@@ -3,12 +3,15 @@ from bpy.app.handlers import persistent
 #import bpy_extras.view3d_utils as v3d
 from enum import IntEnum
 import atexit
-import os, socket, time, select, struct, json, copy, shutil, tempfile
+import os, socket, time, select, struct, json, copy, shutil, tempfile, threading, queue
+import zlib, lzma
+from hashlib import md5
+import numpy as np
 #import subprocess
 from mathutils import Vector, Quaternion, Matrix, Color, Euler
 from . import (rlx, importer, exporter, facerig, bones, geom, colorspace,
                world, rigging, rigutils, drivers, modifiers,
-               cc, jsonutils, utils, vars)
+               cc, jsonutils, properties, utils, vars)
 from typing import Tuple, List
 import textwrap
 
@@ -27,6 +30,11 @@ USE_PING = False
 USE_KEEPALIVE = False
 SOCKET_TIMEOUT = 5.0
 INCLUDE_POSE_MESHES = False
+MAX_QUEUED_MESSAGES = 60
+RECEIVER_POLL_S = 0.1
+ZLIB_LEVEL = 1
+LZMA_PRESET = 1
+FILE_CHUNK_SIZE = 1048576
 
 class OpCodes(IntEnum):
     NONE = 0
@@ -39,6 +47,10 @@ class OpCodes(IntEnum):
     INVALID = 55
     SAVE = 60
     FILE = 75
+    FILE_START = 76
+    FILE_CHUNK = 77
+    FILE_END = 78
+    FILE_ACK = 79
     FPS = 80
     MORPH = 90
     MORPH_UPDATE = 91
@@ -69,6 +81,26 @@ class OpCodes(IntEnum):
     CONFIRM = 251
 
 
+# compressed messages have this flag set in the op code
+COMPRESSED_FLAG = 0x80000000
+OP_CODE_MASK = 0x7FFFFFFF
+# compressed message data is prefixed with the codec id
+COMPRESSION_CODECS = {
+    "zlib": 1,
+    "lzma": 2,
+}
+# only compress these op codes when the data is at least this size (bytes)
+COMPRESSION_THRESHOLDS = {
+    OpCodes.TEMPLATE: 4096,
+    OpCodes.POSE_FRAME: 4096,
+    OpCodes.SEQUENCE_FRAME: 4096,
+    OpCodes.MATERIALS: 4096,
+    OpCodes.LIGHTING: 4096,
+    OpCodes.FILE: 65536,
+    OpCodes.FILE_CHUNK: 4096,
+}
+
+
 VISEME_NAME_MAP = {
     "None": "None",
     "Open": "V_Open",
@@ -480,6 +512,8 @@ class LinkData():
     #
     ack_rate: float = 0.0
     ack_time: float = 0.0
+    sequence_skipped_frames: int = 0
+    ack_skipped_frames: int = 0
     #
     motion_prefix: str = ""
     use_fake_user: bool = False
@@ -564,6 +598,166 @@ def unpack_string(buffer, offset=0):
     return offset, string.decode(encoding="utf-8")
 
 
+# pose frame transforms are packed as 10 big-endian floats per transform:
+#   tx, ty, tz, rx, ry, rz, rw, sx, sy, sz
+TRANSFORM_FLOATS = 10
+WIRE_FLOAT = np.dtype(">f4")
+
+
+def pack_float_block(block: np.ndarray) -> bytes:
+    """Packs an array of floats (of any shape) as one contiguous block of big-endian floats."""
+    return np.ascontiguousarray(block, dtype=WIRE_FLOAT).tobytes()
+
+
+def unpack_float_block(buffer, offset, count):
+    """Unpacks count big-endian floats from the buffer at offset as a native float32 array.
+       The wire block is read in place (no copy) and only converted once to native byte order."""
+    block = np.frombuffer(buffer, dtype=WIRE_FLOAT, count=count, offset=offset)
+    offset += count * 4
+    return offset, block.astype(np.float32)
+
+
+def pack_transform(T: Matrix, translation_scale=1.0):
+    """Returns the decomposed transform as a row of wire floats."""
+    t = T.to_translation() * translation_scale
+    r = T.to_quaternion()
+    s = T.to_scale()
+    return (t.x, t.y, t.z, r.x, r.y, r.z, r.w, s.x, s.y, s.z)
+
+
+def unpack_transform_block(buffer, offset, count):
+    """Unpacks count transforms from the buffer and returns the (translations, rotations, scale signs)
+       as lists of tuples, with rotations in (w, x, y, z) order."""
+    offset, block = unpack_float_block(buffer, offset, count * TRANSFORM_FLOATS)
+    block = block.reshape(count, TRANSFORM_FLOATS)
+    translations = block[:, 0:3].tolist()
+    rotations = block[:, (6, 3, 4, 5)].tolist()
+    signs = np.where(block[:, 7:10] >= 0, 1.0, -1.0).tolist()
+    return offset, translations, rotations, signs
+
+
+class LinkCompressionStats():
+    raw_sent: int = 0
+    compressed_sent: int = 0
+    raw_received: int = 0
+    compressed_received: int = 0
+    compress_time: float = 0.0
+    decompress_time: float = 0.0
+    bytes_sent: int = 0
+    send_time: float = 0.0
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.raw_sent = 0
+        self.compressed_sent = 0
+        self.raw_received = 0
+        self.compressed_received = 0
+        self.compress_time = 0.0
+        self.decompress_time = 0.0
+        self.bytes_sent = 0
+        self.send_time = 0.0
+
+    def add_compressed(self, raw_size, compressed_size, duration):
+        self.raw_sent += raw_size
+        self.compressed_sent += compressed_size
+        self.compress_time += duration
+
+    def add_decompressed(self, compressed_size, raw_size, duration):
+        self.raw_received += raw_size
+        self.compressed_received += compressed_size
+        self.decompress_time += duration
+
+    def add_sent(self, size, duration):
+        self.bytes_sent += size
+        self.send_time += duration
+
+    def ratio(self):
+        raw = self.raw_sent + self.raw_received
+        compressed = self.compressed_sent + self.compressed_received
+        return raw / compressed if compressed else 1.0
+
+    def time_saved(self):
+        """Estimated transfer time saved by compression, at the measured send rate,
+           less the time spent compressing and decompressing."""
+        if self.bytes_sent == 0 or self.send_time <= 0:
+            return 0.0
+        seconds_per_byte = self.send_time / self.bytes_sent
+        saved_bytes = (self.raw_sent - self.compressed_sent) + (self.raw_received - self.compressed_received)
+        return saved_bytes * seconds_per_byte - self.compress_time - self.decompress_time
+
+
+COMPRESSION_STATS = LinkCompressionStats()
+
+
+def make_compressor(codec_id):
+    if codec_id == COMPRESSION_CODECS["lzma"]:
+        return lzma.LZMACompressor(preset=LZMA_PRESET)
+    return zlib.compressobj(ZLIB_LEVEL)
+
+
+def make_decompressor(codec_id):
+    if codec_id == COMPRESSION_CODECS["lzma"]:
+        return lzma.LZMADecompressor()
+    return zlib.decompressobj()
+
+
+def compress_data(codec_id, data) -> bytearray:
+    t = time.perf_counter()
+    compressor = make_compressor(codec_id)
+    compressed = bytearray(struct.pack("!B", codec_id))
+    compressed += compressor.compress(data)
+    compressed += compressor.flush()
+    COMPRESSION_STATS.add_compressed(len(data), len(compressed), time.perf_counter() - t)
+    return compressed
+
+
+def decompress_data(data) -> bytearray:
+    t = time.perf_counter()
+    codec_id = data[0]
+    decompressor = make_decompressor(codec_id)
+    decompressed = bytearray(decompressor.decompress(memoryview(data)[1:]))
+    COMPRESSION_STATS.add_decompressed(len(data), len(decompressed), time.perf_counter() - t)
+    return decompressed
+
+
+def send_compressed_stream(sock: socket.socket, codec_id, file):
+    """Streams the file in compressed chunks: codec id, then length prefixed chunks, terminated by a zero length chunk.
+       The file is never fully read into memory."""
+    compressor = make_compressor(codec_id)
+    sock.sendall(struct.pack("!B", codec_id))
+    while True:
+        chunk = file.read(MAX_CHUNK_SIZE)
+        t = time.perf_counter()
+        compressed = compressor.compress(chunk) if chunk else compressor.flush()
+        COMPRESSION_STATS.add_compressed(len(chunk), len(compressed), time.perf_counter() - t)
+        if compressed:
+            sock.sendall(struct.pack("!I", len(compressed)))
+            sock.sendall(compressed)
+        if not chunk:
+            break
+    sock.sendall(struct.pack("!I", 0))
+
+
+def recv_compressed_stream(recv_bytes, file):
+    """Receives a compressed chunk stream (see send_compressed_stream) into the open file.
+       recv_bytes(size) must return exactly size bytes from the socket."""
+    codec_id = recv_bytes(1)[0]
+    decompressor = make_decompressor(codec_id)
+    while True:
+        chunk_size = struct.unpack("!I", recv_bytes(4))[0]
+        if chunk_size == 0:
+            break
+        chunk = recv_bytes(chunk_size)
+        t = time.perf_counter()
+        decompressed = decompressor.decompress(chunk)
+        COMPRESSION_STATS.add_decompressed(chunk_size, len(decompressed), time.perf_counter() - t)
+        file.write(decompressed)
+    if hasattr(decompressor, "flush"):
+        file.write(decompressor.flush())
+
+
 def get_datalink_temp_local_folder():
     prefs = vars.prefs()
     link_props = vars.link_props()
@@ -840,7 +1034,7 @@ def prev_frame(current_frame=None):
     return current_frame
 
 
-def create_rotation_fcurves_cache(obj, count):
+def get_rotation_cache_channels(obj):
     if obj.rotation_mode == "QUATERNION":
         indices = 4
         defaults = [1,0,0,0]
@@ -850,24 +1044,64 @@ def create_rotation_fcurves_cache(obj, count):
     else: # transform_object.rotation_mode in [ "XYZ", "XZY", "YXZ", "YZX", "ZXY", "ZYX" ]:
         indices = 3
         defaults = [0,0,0]
-    return create_fcurves_cache(count, indices, defaults, cache_type=obj.rotation_mode)
+    return indices, defaults
+
 
+def create_rotation_fcurves_cache(obj, count, start=0):
+    indices, defaults = get_rotation_cache_channels(obj)
+    return create_fcurves_cache(count, indices, defaults, cache_type=obj.rotation_mode, start=start)
 
-def create_fcurves_cache(count, indices, defaults, cache_type="VALUE"):
-    curves = []
+
+def create_fcurves_cache(count, indices, defaults, cache_type="VALUE", start=0, curves=None):
+    """Keyframe cache for a property with (indices) channels of (count) frames.
+       The curves are a float32 array of shape (indices, count, 2) of interleaved (frame, value) pairs,
+       each curve can be passed directly to keyframe_points.foreach_set('co', ...).
+       curves can be a view into a larger preallocated cache block."""
+    if curves is None:
+        curves = np.empty((indices, count, 2), dtype=np.float32)
+    curves[:, :, 0] = np.arange(start, start + count, dtype=np.float32)
+    curves[:, :, 1] = np.array(defaults[:indices], dtype=np.float32).reshape(indices, 1)
     cache = {
         "count": count,
         "indices": indices,
         "curves": curves,
         "type": cache_type,
     }
-    for i in range(0, indices):
-        d = defaults[i]
-        cache_data = [d]*(count*2)
-        curves.append(cache_data)
     return cache
 
 
+# bone cache block channels: loc (3), rot (up to 4), sca (3)
+BONE_CACHE_CHANNELS = 10
+
+
+def create_bone_fcurves_cache(rig, bone_names, count, start=0):
+    """Preallocates a single keyframe cache block of shape (bones, channels, frames, 2) for all the bones,
+       with per bone loc/rot/sca caches as views into the block."""
+    block = np.empty((len(bone_names), BONE_CACHE_CHANNELS, count, 2), dtype=np.float32)
+    bone_cache = {}
+    for b, bone_name in enumerate(bone_names):
+        pose_bone = rig.pose.bones[bone_name]
+        rot_indices, rot_defaults = get_rotation_cache_channels(pose_bone)
+        # unused rotation channel (euler) keeps a default
+        block[b, 6] = 0
+        bone_cache[bone_name] = {
+            "loc": create_fcurves_cache(count, 3, [0,0,0], start=start, curves=block[b, 0:3]),
+            "rot": create_fcurves_cache(count, rot_indices, rot_defaults, cache_type=pose_bone.rotation_mode,
+                                        start=start, curves=block[b, 3:3+rot_indices]),
+            "sca": create_fcurves_cache(count, 3, [1,1,1], start=start, curves=block[b, 7:10]),
+        }
+    return bone_cache, block
+
+
+def create_key_fcurves_cache(key_names, count, start=0):
+    """Preallocates a single keyframe cache block of shape (keys, 1, frames, 2) for all the shape keys."""
+    block = np.empty((len(key_names), 1, count, 2), dtype=np.float32)
+    key_cache = {}
+    for k, key_name in enumerate(key_names):
+        key_cache[key_name] = create_fcurves_cache(count, 1, [0], start=start, curves=block[k])
+    return key_cache, block
+
+
 def get_datalink_rig_action(rig, motion_id=None, slotted=False):
     if not motion_id:
         motion_id = "DataLink"
@@ -944,14 +1178,14 @@ def prep_pose_actor(actor: LinkActor, start_frame, end_frame):
                 "end": end_frame,
             }
 
-            transform_cache["loc"] = create_fcurves_cache(count, 3, [0,0,0])
-            transform_cache["rot"] = create_rotation_fcurves_cache(actor.object, count)
-            transform_cache["sca"] = create_fcurves_cache(count, 3, [1,1,1])
-            light_cache["color"] = create_fcurves_cache(count, 3, [1,1,1])
-            light_cache["energy"] = create_fcurves_cache(count, 1, [1])
-            light_cache["cutoff_distance"] = create_fcurves_cache(count, 1, [9])
-            light_cache["spot_blend"] = create_fcurves_cache(count, 1, [1])
-            light_cache["spot_size"] = create_fcurves_cache(count, 1, [1])
+            transform_cache["loc"] = create_fcurves_cache(count, 3, [0,0,0], start=start_frame)
+            transform_cache["rot"] = create_rotation_fcurves_cache(actor.object, count, start=start_frame)
+            transform_cache["sca"] = create_fcurves_cache(count, 3, [1,1,1], start=start_frame)
+            light_cache["color"] = create_fcurves_cache(count, 3, [1,1,1], start=start_frame)
+            light_cache["energy"] = create_fcurves_cache(count, 1, [1], start=start_frame)
+            light_cache["cutoff_distance"] = create_fcurves_cache(count, 1, [9], start=start_frame)
+            light_cache["spot_blend"] = create_fcurves_cache(count, 1, [1], start=start_frame)
+            light_cache["spot_size"] = create_fcurves_cache(count, 1, [1], start=start_frame)
             actor.set_cache(actor_cache)
 
         else:
@@ -983,13 +1217,13 @@ def prep_pose_actor(actor: LinkActor, start_frame, end_frame):
                 "end": end_frame,
             }
 
-            transform_cache["loc"] = create_fcurves_cache(count, 3, [0,0,0])
-            transform_cache["rot"] = create_rotation_fcurves_cache(actor.object, count)
-            transform_cache["sca"] = create_fcurves_cache(count, 3, [1,1,1])
-            camera_cache["lens"] = create_fcurves_cache(count, 1, [50])
-            camera_cache["dof"] = create_fcurves_cache(count, 1, [1])
-            camera_cache["focus_distance"] = create_fcurves_cache(count, 1, [1])
-            camera_cache["f_stop"] = create_fcurves_cache(count, 1, [2.8])
+            transform_cache["loc"] = create_fcurves_cache(count, 3, [0,0,0], start=start_frame)
+            transform_cache["rot"] = create_rotation_fcurves_cache(actor.object, count, start=start_frame)
+            transform_cache["sca"] = create_fcurves_cache(count, 3, [1,1,1], start=start_frame)
+            camera_cache["lens"] = create_fcurves_cache(count, 1, [50], start=start_frame)
+            camera_cache["dof"] = create_fcurves_cache(count, 1, [1], start=start_frame)
+            camera_cache["focus_distance"] = create_fcurves_cache(count, 1, [1], start=start_frame)
+            camera_cache["f_stop"] = create_fcurves_cache(count, 1, [2.8], start=start_frame)
             actor.set_cache(actor_cache)
 
         else:
@@ -1140,36 +1374,24 @@ def prep_pose_actor(actor: LinkActor, start_frame, end_frame):
             if LINK_DATA.set_keyframes:
 
                 count = end_frame - start_frame + 1
-                bone_cache = {}
-                expression_cache = {}
-                viseme_cache = {}
+                bone_names = [ pose_bone.name for pose_bone in rig.pose.bones
+                                    if bones.get_bone_selected(rig, pose_bone) ]
+                bone_cache, bone_block = create_bone_fcurves_cache(rig, bone_names, count, start_frame)
+                expression_cache, expression_block = create_key_fcurves_cache(actor.expressions, count, start_frame)
+                viseme_cache, viseme_block = create_key_fcurves_cache(actor.visemes, count, start_frame)
                 morph_cache = {}
                 actor_cache = {
                     "rig": rig,
                     "bones": bone_cache,
+                    "bone_block": bone_block,
                     "expressions": expression_cache,
+                    "expression_block": expression_block,
                     "visemes": viseme_cache,
+                    "viseme_block": viseme_block,
                     "morphs": morph_cache,
                     "start": start_frame,
                     "end": end_frame,
                 }
-                for pose_bone in rig.pose.bones:
-                    bone_name = pose_bone.name
-                    if bones.get_bone_selected(rig, pose_bone):
-                        loc_cache = create_fcurves_cache(count, 3, [0,0,0])
-                        sca_cache = create_fcurves_cache(count, 3, [1,1,1])
-                        rot_cache = create_rotation_fcurves_cache(pose_bone, count)
-                        bone_cache[bone_name] = {
-                            "loc": loc_cache,
-                            "sca": sca_cache,
-                            "rot": rot_cache,
-                        }
-
-                for expression_name in actor.expressions:
-                    expression_cache[expression_name] = create_fcurves_cache(count, 1, [0])
-
-                for viseme_name in actor.visemes:
-                    viseme_cache[viseme_name] = create_fcurves_cache(count, 1, [0])
 
                 for morph_name in actor.morphs:
                     pass
@@ -1198,45 +1420,31 @@ def key_frame_pose_visual():
         bpy.ops.anim.keyframe_insert_menu(type='BUILTIN_KSI_VisualLocRot')
 
 
-def store_cache_curves_frame(cache, prop, frame, start, value):
+def get_cache_channel_values(cache_type, value):
+    """Converts the value to the cache channel values for the cache type."""
     T = type(value)
-    index = (frame - start) * 2
     if T is Quaternion:
-        cache_type = cache[prop]["type"]
         if cache_type == "QUATERNION":
-            l = len(value)
-            for i in range(0, l):
-                curve = cache[prop]["curves"][i]
-                curve[index] = frame
-                curve[index + 1] = value[i]
+            return value
         elif cache_type == "AXIS_ANGLE":
             # convert quaternion to angle axis
             v,a = value.to_axis_angle()
-            l = len(v)
-            for i in range(0, l):
-                curve = cache[prop]["curves"][i]
-                curve[index] = frame
-                curve[index + 1] = v[i]
-            curve = cache[prop]["curves"][3]
-            curve[index] = frame
-            curve[index + 1] = a
+            return (v[0], v[1], v[2], a)
         else:
-            euler = value.to_euler(cache_type)
-            l = len(euler)
-            for i in range(0, l):
-                curve = cache[prop]["curves"][i]
-                curve[index] = frame
-                curve[index + 1] = euler[i]
+            return value.to_euler(cache_type)
     elif T is Vector or T is Color or T is tuple or T is list:
-        l = len(value)
-        for i in range(0, l):
-            curve = cache[prop]["curves"][i]
-            curve[index] = frame
-            curve[index + 1] = value[i]
+        return value
     else:
-        curve = cache[prop]["curves"][0]
-        curve[index] = frame
-        curve[index + 1] = value
+        return (value,)
+
+
+def store_cache_curves_frame(cache, prop, frame, start, value):
+    curves: np.ndarray = cache[prop]["curves"]
+    values = get_cache_channel_values(cache[prop]["type"], value)
+    index = frame - start
+    l = len(values)
+    curves[:l, index, 0] = frame
+    curves[:l, index, 1] = values
 
 
 def store_bone_cache_keyframes(actor: LinkActor, frame, start):
@@ -1248,7 +1456,10 @@ def store_bone_cache_keyframes(actor: LinkActor, frame, start):
 
     rig = actor.get_armature()
     bone_cache = actor.cache["bones"]
-    for bone_name in bone_cache:
+    bone_block: np.ndarray = actor.cache["bone_block"]
+    # gather all the bone channel values for this frame, then store them in the cache block in one go
+    frame_values = bone_block[:, :, frame - start, 1].copy()
+    for b, bone_name in enumerate(bone_cache):
         pose_bone: bpy.types.PoseBone = rig.pose.bones[bone_name]
         L: Matrix   # local space matrix we want
         NL: Matrix  # non-local space matrix we want (if not using local location or inherit rotation)
@@ -1272,9 +1483,12 @@ def store_bone_cache_keyframes(actor: LinkActor, frame, start):
             rot = NL.to_quaternion()
         else:
             rot = L.to_quaternion()
-        store_cache_curves_frame(bone_cache[bone_name], "loc", frame, start, loc)
-        store_cache_curves_frame(bone_cache[bone_name], "rot", frame, start, rot)
-        store_cache_curves_frame(bone_cache[bone_name], "sca", frame, start, sca)
+        rot_values = get_cache_channel_values(bone_cache[bone_name]["rot"]["type"], rot)
+        frame_values[b, 0:3] = loc
+        frame_values[b, 3:3+len(rot_values)] = rot_values
+        frame_values[b, 7:10] = sca
+    bone_block[:, :, frame - start, 0] = frame
+    bone_block[:, :, frame - start, 1] = frame_values
 
 
 def store_shape_key_cache_keyframes(actor: LinkActor, frame, start, expression_weights, viseme_weights, morph_weights):
@@ -1283,12 +1497,15 @@ def store_shape_key_cache_keyframes(actor: LinkActor, frame, start, expression_w
         utils.log_error(f"No actor cache: {actor.name}")
         return
 
-    expression_cache = actor.cache["expressions"]
-    for i, expression_name in enumerate(expression_cache):
-        store_cache_curves_frame(actor.cache["expressions"], expression_name, frame, start, expression_weights[i])
-    viseme_cache = actor.cache["visemes"]
-    for i, viseme_name in enumerate(viseme_cache):
-        store_cache_curves_frame(actor.cache["visemes"], viseme_name, frame, start, viseme_weights[i])
+    index = frame - start
+    expression_block: np.ndarray = actor.cache["expression_block"]
+    num_expressions = min(len(expression_block), len(expression_weights))
+    expression_block[:, 0, index, 0] = frame
+    expression_block[:num_expressions, 0, index, 1] = expression_weights[:num_expressions]
+    viseme_block: np.ndarray = actor.cache["viseme_block"]
+    num_visemes = min(len(viseme_block), len(viseme_weights))
+    viseme_block[:, 0, index, 0] = frame
+    viseme_block[:num_visemes, 0, index, 1] = viseme_weights[:num_visemes]
 
 
 def store_light_cache_keyframes(actor: LinkActor, frame, start):
@@ -1367,22 +1584,18 @@ def write_action_cache_curve(action: bpy.types.Action, cache, prop, data_path, n
         if group_name not in channel.groups:
             channel.groups.new(group_name)
         for i in range(0, num_curves):
-            cache_curve = prop_cache["curves"][i]
+            # if setting fewer frames than are in the cache (sequence was stopped early)
+            # this is a contiguous view of the (frame, value) pairs, no copy is made
+            cache_data = prop_cache["curves"][i][:num_frames].ravel()
             fcurve = channel.fcurves.new(data_path, index=i)
-            set_count = num_frames * 2
-            if set_count < len(cache_curve):
-                # if setting fewer frames than are in the cache (sequence was stopped early)
-                cache_data = cache_curve[:set_count]
-            else:
-                cache_data = cache_curve
             if reduce:
                 reduced = rlx.reduce_cache(cache_data, "LINEAR")
                 num_reduced = int(len(reduced) / 2)
                 fcurve.keyframe_points.add(num_reduced)
                 fcurve.keyframe_points.foreach_set('co', reduced)
             else:
-                fcurve.keyframe_points.add(num_frames)
-                fcurve.keyframe_points.foreach_set('co', cache_curve)
+                fcurve.keyframe_points.add(len(cache_data) // 2)
+                fcurve.keyframe_points.foreach_set('co', cache_data)
             rigutils.reset_fcurve_interpolation(fcurve)
 
 
@@ -1521,6 +1734,224 @@ def shutdown():
         link_service.shutdown()
 
 
+class LinkFileTransfer():
+    """Receiving end of a chunked file transfer.
+
+       Chunks are appended to a .part file next to the destination tar file while keeping a running md5
+       of the good data, which is checked against the sender's hash at the end of the transfer.
+       The .part file is kept if the connection is lost, so the transfer can be resumed from the
+       last good offset after reconnecting."""
+
+    def __init__(self, file_id, file_size, file_path):
+        self.file_id = file_id
+        self.file_size = file_size
+        self.file_path = file_path
+        self.part_path = file_path + ".part"
+        self.hash = md5()
+        self.offset = 0
+        self.file = None
+
+    def open(self, resume):
+        """Opens the .part file and returns the offset to (re)start the transfer from."""
+        self.hash = md5()
+        self.offset = 0
+        if resume and os.path.exists(self.part_path) and os.path.getsize(self.part_path) <= self.file_size:
+            # rebuild the running hash of the part already received
+            with open(self.part_path, "rb") as file:
+                for chunk in iter(lambda: file.read(FILE_CHUNK_SIZE), b""):
+                    self.hash.update(chunk)
+                    self.offset += len(chunk)
+            self.file = open(self.part_path, "ab")
+        else:
+            self.file = open(self.part_path, "wb")
+        return self.offset
+
+    def write(self, offset, chunk):
+        """Writes the chunk if it continues from the last good offset."""
+        if not self.file or offset != self.offset:
+            return False
+        self.file.write(chunk)
+        self.hash.update(chunk)
+        self.offset += len(chunk)
+        return True
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def finish(self, file_size, file_hash):
+        """Verifies the complete transfer and moves the .part file into place.
+           Returns True if verified, otherwise the transfer must resume from self.offset."""
+        self.close()
+        if self.offset == file_size:
+            if self.hash.hexdigest() == file_hash:
+                os.replace(self.part_path, self.file_path)
+                return True
+            # complete but corrupt: start again
+            os.remove(self.part_path)
+            self.offset = 0
+        return False
+
+
+class LinkReceiver():
+    """Background socket reader for the DataLink client socket.
+
+       A worker thread owns all reads from the socket, receiving each length prefixed message
+       directly into a preallocated buffer (recv_into) and putting the finished
+       (op_code, data, file_path) messages onto a bounded queue. The main thread only drains the queue.
+       When the queue is full the worker blocks, applying back-pressure to the sender.
+       A None message is queued when the connection is lost."""
+
+    def __init__(self, sock: socket.socket, file_folder):
+        self.sock = sock
+        self.file_folder = file_folder
+        self.queue = queue.Queue(maxsize=MAX_QUEUED_MESSAGES)
+        self.header = bytearray(8)
+        self.thread: threading.Thread = None
+        self.running = False
+        # stats
+        self.bytes_received = 0
+        self.messages_received = 0
+        self.max_queue_depth = 0
+        self.bytes_per_second = 0.0
+        self.rate_time = 0.0
+        self.rate_bytes = 0
+        self.error: Exception = None
+
+    def start(self):
+        self.running = True
+        self.rate_time = time.perf_counter()
+        self.thread = threading.Thread(target=self.run, name="DataLink Receiver", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+
+    def join(self):
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=SOCKET_TIMEOUT)
+        self.thread = None
+
+    def queue_depth(self):
+        return self.queue.qsize()
+
+    def peek_op_code(self):
+        """Returns the op code of the next queued message, without removing it from the queue."""
+        with self.queue.mutex:
+            if self.queue.queue:
+                message = self.queue.queue[0]
+                if message:
+                    return message[0]
+        return None
+
+    def update_rate(self, num_bytes=0):
+        self.bytes_received += num_bytes
+        self.rate_bytes += num_bytes
+        t = time.perf_counter()
+        duration = t - self.rate_time
+        if duration >= 1.0:
+            self.bytes_per_second = self.rate_bytes / duration
+            self.rate_bytes = 0
+            self.rate_time = t
+
+    def recv_into(self, view: memoryview):
+        """Fills the view from the socket. Returns False if the socket closed or the receiver was stopped."""
+        while len(view) > 0:
+            try:
+                size = self.sock.recv_into(view)
+            except socket.timeout:
+                if not self.running:
+                    return False
+                continue
+            if size == 0:
+                return False
+            view = view[size:]
+            self.update_rate(size)
+        return True
+
+    def recv_bytes(self, size):
+        buffer = bytearray(size)
+        if not self.recv_into(memoryview(buffer)):
+            raise ConnectionError("Socket closed during receive")
+        return buffer
+
+    def recv_file(self, compressed):
+        """Streams the file payload following a FILE message into a temp file in the file folder."""
+        size_buffer = bytearray(4)
+        if not self.recv_into(memoryview(size_buffer)):
+            return None
+        size = struct.unpack("!I", size_buffer)[0]
+        chunk = bytearray(MAX_CHUNK_SIZE)
+        chunk_view = memoryview(chunk)
+        fd, file_path = tempfile.mkstemp(suffix=".tar", dir=self.file_folder)
+        received = False
+        try:
+            with os.fdopen(fd, "wb") as file:
+                if compressed:
+                    recv_compressed_stream(self.recv_bytes, file)
+                    size = 0
+                while size > 0:
+                    view = chunk_view[:min(size, MAX_CHUNK_SIZE)]
+                    if not self.recv_into(view):
+                        return None
+                    file.write(view)
+                    size -= len(view)
+            received = True
+        finally:
+            # don't leave partially received temp files behind
+            if not received:
+                try:
+                    os.remove(file_path)
+                except:
+                    pass
+        return file_path
+
+    def put(self, message):
+        while True:
+            try:
+                self.queue.put(message, timeout=RECEIVER_POLL_S)
+                self.max_queue_depth = max(self.max_queue_depth, self.queue.qsize())
+                return True
+            except queue.Full:
+                if not self.running:
+                    return False
+
+    def run(self):
+        try:
+            while self.running:
+                r,w,x = select.select([self.sock], [], [], RECEIVER_POLL_S)
+                if not r:
+                    self.update_rate()
+                    continue
+                if not self.recv_into(memoryview(self.header)):
+                    break
+                op_code, size = struct.unpack("!II", self.header)
+                compressed = (op_code & COMPRESSED_FLAG) != 0
+                op_code &= OP_CODE_MASK
+                data = None
+                if size > 0:
+                    data = bytearray(size)
+                    if not self.recv_into(memoryview(data)):
+                        break
+                file_path = None
+                if op_code == OpCodes.FILE:
+                    file_path = self.recv_file(compressed)
+                    if not file_path:
+                        break
+                elif compressed and data:
+                    data = decompress_data(data)
+                self.messages_received += 1
+                if not self.put((op_code, data, file_path)):
+                    break
+        except Exception as e:
+            self.error = e
+        # if the receiver was not stopped, the connection was lost
+        if self.running:
+            self.put(None)
+        self.running = False
+
+
 class LinkService():
     timer = None
     server_sock: socket.socket = None
@@ -1567,10 +1998,17 @@ class LinkService():
     plugin_version: str = None
     link_data: LinkData = None
     remote_is_local: bool = True
+    receiver: LinkReceiver = None
+    compression_codec: str = None
+    chunked_files: bool = False
+    file_transfers: dict = {}
+    outgoing_files: dict = {}
 
     def __init__(self):
         global LINK_DATA
         self.link_data = LINK_DATA
+        self.file_transfers = {}
+        self.outgoing_files = {}
 
     def __enter__(self):
         return self
@@ -1672,6 +2110,7 @@ class LinkService():
                 self.remote_is_local = True if self.client_ip == "127.0.0.1" else False
                 utils.log_info(f"connecting with data link server on {host}:{port}")
                 self.send_hello()
+                self.start_receiver()
                 self.connecting.emit()
                 self.changed.emit()
                 return True
@@ -1701,15 +2140,55 @@ class LinkService():
             "Addon": vars.VERSION_STRING[1:],
             "Local": self.remote_is_local,
             "FPS": bpy.context.scene.render.fps,
+            "Compression": self.get_compression_codecs(),
+            "FileTransfer": ["chunked"],
         }
         self.link_data.link_fps = bpy.context.scene.render.fps
         utils.log_info(f"Send Hello: {self.local_path}")
         self.send(OpCodes.HELLO, encode_from_json(json_data))
 
+    def get_compression_codecs(self):
+        """The compression codecs offered to the remote, in order of preference."""
+        prefs = vars.prefs()
+        if prefs.datalink_compression == "ZLIB":
+            return ["zlib"]
+        elif prefs.datalink_compression == "LZMA":
+            return ["lzma", "zlib"]
+        return []
+
+    def negotiate_compression(self, remote_codecs):
+        """Agree on the first offered codec the remote also supports.
+           The remote may answer with either a single codec or a list."""
+        if not remote_codecs:
+            return None
+        if type(remote_codecs) is str:
+            remote_codecs = [remote_codecs]
+        for codec in self.get_compression_codecs():
+            if codec in remote_codecs:
+                utils.log_info(f"Using DataLink compression: {codec}")
+                COMPRESSION_STATS.reset()
+                return codec
+        return None
+
+    def should_compress(self, op_code, size):
+        if self.compression_codec and op_code in COMPRESSION_THRESHOLDS:
+            return size >= COMPRESSION_THRESHOLDS[op_code]
+        return False
+
+    def get_compression_stats(self):
+        """Returns the (codec, compression ratio, estimated time saved) or None if not compressing."""
+        if self.compression_codec:
+            return (self.compression_codec, COMPRESSION_STATS.ratio(), COMPRESSION_STATS.time_saved())
+        return None
+
     def stop_client(self):
         link_props = vars.link_props()
 
         try:
+            receiver = self.receiver
+            self.receiver = None
+            if receiver:
+                receiver.stop()
             if self.client_sock:
                 utils.log_info(f"Closing Client Socket")
                 try:
@@ -1717,12 +2196,20 @@ class LinkService():
                     self.client_sock.close()
                 except Exception as e:
                     utils.log_error("Closing Client Socket failed!", e)
+            if receiver:
+                receiver.join()
             self.is_connected = False
             self.is_connecting = False
             if link_props:
                 link_props.connected = False
             self.client_sock = None
             self.client_sockets = []
+            self.compression_codec = None
+            self.chunked_files = False
+            # keep the partial files of interrupted transfers to resume from
+            for transfer in self.file_transfers.values():
+                transfer.close()
+            self.file_transfers = {}
             if self.listening:
                 self.keepalive_timer = HANDSHAKE_TIMEOUT_S
             self.client_stopped.emit()
@@ -1742,12 +2229,135 @@ class LinkService():
         else:
             return False
 
-    def recv(self):
+    def start_receiver(self):
+        prefs = vars.prefs()
+        if prefs.datalink_threaded_receive and self.client_sock and not self.receiver:
+            self.receiver = LinkReceiver(self.client_sock, get_datalink_temp_local_folder())
+            self.receiver.start()
+            utils.log_info(f"Background receiver started")
+
+    def get_receiver_stats(self):
+        """Returns the background receiver (queue depth, max queue depth, bytes per second)
+           or None if not receiving in the background."""
+        if self.receiver:
+            return (self.receiver.queue_depth(),
+                    self.receiver.max_queue_depth,
+                    self.receiver.bytes_per_second)
+        return None
+
+    def recv_bytes(self, size):
+        """Receives exactly size bytes from the client socket."""
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        while len(view) > 0:
+            received = self.client_sock.recv_into(view)
+            if received == 0:
+                raise ConnectionError("Socket closed during receive")
+            view = view[received:]
+        return buffer
+
+    def peek_op_code(self):
+        """Returns the op code of the next message waiting on the client socket, without consuming it."""
+        try:
+            r,w,x = select.select(self.client_sockets, self.empty_sockets, self.empty_sockets, 0)
+            if r:
+                header = self.client_sock.recv(8, socket.MSG_PEEK)
+                if header and len(header) == 8:
+                    return struct.unpack("!II", header)[0] & OP_CODE_MASK
+        except Exception as e:
+            utils.log_error("Client socket recv:peek failed!", e)
+        return None
+
+    def is_stale_frame(self, op_code, peek_func):
+        """When previewing a live sequence with skip stale frames, a sequence frame is stale if
+           a newer sequence frame is already waiting: the latest frame wins."""
+        global LINK_DATA
+        if (LINK_DATA.preview_skip_frames and
+            op_code == OpCodes.SEQUENCE_FRAME and
+            peek_func() == OpCodes.SEQUENCE_FRAME):
+            LINK_DATA.sequence_skipped_frames += 1
+            return True
+        return False
+
+    def client_has_data(self):
+        """Returns True if more data is waiting on the client socket."""
+        try:
+            r,w,x = select.select(self.client_sockets, self.empty_sockets, self.empty_sockets, 0)
+            return bool(r)
+        except Exception as e:
+            utils.log_error("Client socket recv:select (reselect) failed!", e)
+            self.client_lost()
+            return False
+
+    def receiver_has_data(self):
+        """Returns True if more messages are waiting in the background receiver queue."""
+        return self.receiver is not None and not self.receiver.queue.empty()
+
+    def end_receive_tick(self, op_code, count, has_data_func):
+        """The per-tick receive rules, applied after every received message by both recv()
+           and recv_queued(): returns True if receiving should stop for this tick,
+           leaving is_data / is_import set for the next tick."""
         prefs = vars.prefs()
 
+        self.is_data = False
+        # parse may have received a disconnect notice
+        if not self.has_client_sock():
+            return True
+        # if preview frame sync update every frame in sequence
+        if op_code == OpCodes.SEQUENCE_FRAME and prefs.datalink_frame_sync:
+            self.is_data = True
+            return True
+        # if not key framing, update every frame
+        if not LINK_DATA.set_keyframes:
+            self.is_data = True
+            return True
+        if (op_code == OpCodes.CHARACTER or
+            op_code == OpCodes.PROP or
+            op_code == OpCodes.STAGING or
+            op_code == OpCodes.CAMERA):
+            # give imports time to process, otherwise bad things happen
+            self.is_data = False
+            self.is_import = True
+            return True
+        if not has_data_func():
+            return True
+        self.is_data = True
+        return count >= MAX_RECEIVE or op_code == OpCodes.NOTIFY or op_code == OpCodes.INVALID
+
+    def recv_queued(self):
+        """Parses the messages queued by the background receiver, following the same
+           per-tick rules as recv()"""
+        count = 0
+        while self.receiver:
+            try:
+                message = self.receiver.queue.get_nowait()
+            except queue.Empty:
+                return
+            if message is None:
+                if self.receiver.error:
+                    utils.log_error("Client socket background receive failed!", self.receiver.error)
+                else:
+                    utils.log_always("Socket closed by client")
+                self.client_lost()
+                return
+            op_code, data, file_path = message
+            if file_path:
+                remote_id = data.decode(encoding="utf-8")
+                shutil.move(file_path, get_remote_tar_file_path(remote_id))
+            if self.is_stale_frame(op_code, self.receiver.peek_op_code):
+                continue
+            self.parse(op_code, data)
+            self.received.emit(op_code, data)
+            count += 1
+            if self.end_receive_tick(op_code, count, self.receiver_has_data):
+                return
+
+    def recv(self):
         self.is_data = False
         self.is_import = False
-        if self.has_client_sock():
+        if self.receiver:
+            self.recv_queued()
+        elif self.has_client_sock():
             try:
                 r,w,x = select.select(self.client_sockets, self.empty_sockets, self.empty_sockets, 0)
             except Exception as e:
@@ -1769,6 +2379,8 @@ class LinkService():
                     return
                 if header and len(header) == 8:
                     op_code, size = struct.unpack("!II", header)
+                    compressed = (op_code & COMPRESSED_FLAG) != 0
+                    op_code &= OP_CODE_MASK
                     data = None
                     if size > 0:
                         data = bytearray()
@@ -1788,6 +2400,14 @@ class LinkService():
                         size = struct.unpack("!I", chunk)[0]
                         tar_file_path = get_remote_tar_file_path(remote_id)
                         with open(tar_file_path, 'wb') as file:
+                            if compressed:
+                                try:
+                                    recv_compressed_stream(self.recv_bytes, file)
+                                except Exception as e:
+                                    utils.log_error("Client socket recv:recv compressed file failed!", e)
+                                    self.client_lost()
+                                    return
+                                size = 0
                             while size > 0:
                                 chunk_size = min(size, MAX_CHUNK_SIZE)
                                 try:
@@ -1798,39 +2418,16 @@ class LinkService():
                                     self.client_lost()
                                     return
                                 size -= len(chunk)
+                    elif self.is_stale_frame(op_code, self.peek_op_code):
+                        # only decompress the frames that will be parsed
+                        continue
+                    elif compressed and data:
+                        data = decompress_data(data)
                     self.parse(op_code, data)
                     self.received.emit(op_code, data)
                     count += 1
-                self.is_data = False
-                # parse may have received a disconnect notice
-                if not self.has_client_sock():
+                if self.end_receive_tick(op_code, count, self.client_has_data):
                     return
-                # if preview frame sync update every frame in sequence
-                if op_code == OpCodes.SEQUENCE_FRAME and prefs.datalink_frame_sync:
-                    self.is_data = True
-                    return
-                # if not key framing, update every frame
-                if not LINK_DATA.set_keyframes:
-                    self.is_data = True
-                    return
-                if (op_code == OpCodes.CHARACTER or
-                    op_code == OpCodes.PROP or
-                    op_code == OpCodes.STAGING or
-                    op_code == OpCodes.CAMERA):
-                    # give imports time to process, otherwise bad things happen
-                    self.is_data = False
-                    self.is_import = True
-                    return
-                try:
-                    r,w,x = select.select(self.client_sockets, self.empty_sockets, self.empty_sockets, 0)
-                except Exception as e:
-                    utils.log_error("Client socket recv:select (reselect) failed!", e)
-                    self.client_lost()
-                    return
-                if r:
-                    self.is_data = True
-                    if count >= MAX_RECEIVE or op_code == OpCodes.NOTIFY or op_code == OpCodes.INVALID:
-                        return
 
     def accept(self):
         link_props = vars.link_props()
@@ -1855,6 +2452,7 @@ class LinkService():
                 self.ping_timer = PING_INTERVAL_S
                 utils.log_info(f"Incoming connection received from: {address[0]}:{address[1]}")
                 self.send_hello()
+                self.start_receiver()
                 self.accepted.emit(self.client_ip, self.client_port)
                 self.changed.emit()
                 r,w,x = select.select(self.server_sockets, self.empty_sockets, self.empty_sockets, 0)
@@ -1873,6 +2471,8 @@ class LinkService():
                 self.remote_path = json_data["Path"]
                 self.remote_exe = json_data["Exe"]
                 self.plugin_version = json_data.get("Plugin", "")
+                self.compression_codec = self.negotiate_compression(json_data.get("Compression"))
+                self.chunked_files = "chunked" in json_data.get("FileTransfer", [])
                 self.link_data.remote_app = self.remote_app
                 self.link_data.remote_version = self.remote_version
                 self.link_data.remote_path = self.remote_path
@@ -1927,6 +2527,18 @@ class LinkService():
         elif op_code == OpCodes.FILE:
             self.receive_remote_file(data)
 
+        elif op_code == OpCodes.FILE_START:
+            self.receive_file_start(data)
+
+        elif op_code == OpCodes.FILE_CHUNK:
+            self.receive_file_chunk(data)
+
+        elif op_code == OpCodes.FILE_END:
+            self.receive_file_end(data)
+
+        elif op_code == OpCodes.FILE_ACK:
+            self.receive_file_ack(data)
+
         elif op_code == OpCodes.TEMPLATE:
             self.receive_actor_templates(data)
 
@@ -2155,6 +2767,9 @@ class LinkService():
     def send(self, op_code, binary_data = None):
         try:
             if self.client_sock and (self.is_connected or self.is_connecting):
+                if binary_data and self.should_compress(op_code, len(binary_data)):
+                    binary_data = compress_data(COMPRESSION_CODECS[self.compression_codec], binary_data)
+                    op_code |= COMPRESSED_FLAG
                 data_length = len(binary_data) if binary_data else 0
                 header = struct.pack("!II", op_code, data_length)
                 data = bytearray()
@@ -2162,7 +2777,9 @@ class LinkService():
                 if binary_data:
                     data.extend(binary_data)
                 try:
+                    t = time.perf_counter()
                     self.client_sock.sendall(data)
+                    COMPRESSION_STATS.add_sent(len(data), time.perf_counter() - t)
                 except Exception as e:
                     utils.log_error("Client socket sendall failed!")
                     self.client_lost()
@@ -2173,28 +2790,155 @@ class LinkService():
             utils.log_error("LinkService send failed!", e)
 
     def send_file(self, tar_id, tar_file):
+        if self.chunked_files:
+            self.outgoing_files[tar_id] = (tar_file, utils.md5sum(tar_file))
+            self.send_file_start(tar_id, resume=False)
+            return
         try:
             utils.log_info(f"Sending Remote files: {tar_file}")
             if self.client_sock and (self.is_connected or self.is_connecting):
                 file_size = os.path.getsize(tar_file)
+                compressed = self.should_compress(OpCodes.FILE, file_size)
+                op_code = OpCodes.FILE | COMPRESSED_FLAG if compressed else OpCodes.FILE
                 id_data = pack_string(tar_id)
                 data = bytearray()
-                data.extend(struct.pack("!I", OpCodes.FILE))
+                data.extend(struct.pack("!I", op_code))
                 data.extend(id_data)
                 data.extend(struct.pack("!I", file_size))
-                self.client_sock.send(data)
-                remaining_size = file_size
+                self.client_sock.sendall(data)
                 with open(tar_file, 'rb') as file:
-                    while remaining_size > 0:
-                        chunk_size = min(MAX_CHUNK_SIZE, remaining_size)
-                        byte_array = bytearray(file.read(chunk_size))
-                        remaining_size -= MAX_CHUNK_SIZE
-                        self.client_sock.send(byte_array)
+                    if compressed:
+                        t = time.perf_counter()
+                        sent_before = COMPRESSION_STATS.compressed_sent
+                        compress_time_before = COMPRESSION_STATS.compress_time
+                        send_compressed_stream(self.client_sock, COMPRESSION_CODECS[self.compression_codec], file)
+                        # measure only the time spent sending, not compressing
+                        compress_time = COMPRESSION_STATS.compress_time - compress_time_before
+                        COMPRESSION_STATS.add_sent(COMPRESSION_STATS.compressed_sent - sent_before,
+                                                   time.perf_counter() - t - compress_time)
+                    else:
+                        self.client_sock.sendfile(file, 0, file_size)
                 self.ping_timer = PING_INTERVAL_S
                 self.sent.emit()
         except Exception as e:
             utils.log_error("LinkService send failed!", e)
 
+    def send_file_start(self, tar_id, resume=False):
+        """Starts (or resumes) a chunked file transfer. A new transfer is sent straight away,
+           so that it arrives before any messages that refer to it. A resumed transfer waits
+           for the remote to acknowledge the offset to resume from."""
+        tar_file, file_hash = self.outgoing_files[tar_id]
+        file_size = os.path.getsize(tar_file)
+        utils.log_info(f"Sending Remote files: {tar_file} {'(resume)' if resume else ''}")
+        self.send(OpCodes.FILE_START, encode_from_json({
+            "id": tar_id,
+            "size": file_size,
+            "hash": file_hash,
+            "resume": resume,
+        }))
+        if not resume:
+            self.send_file_range(tar_id, 0)
+
+    def send_file_range(self, tar_id, offset):
+        """Sends the file from offset in chunks, then the end of transfer with the file hash."""
+        tar_file, file_hash = self.outgoing_files[tar_id]
+        file_size = os.path.getsize(tar_file)
+        id_data = pack_string(tar_id)
+        try:
+            with open(tar_file, "rb") as file:
+                while offset < file_size:
+                    if not self.has_client_sock():
+                        return
+                    size = min(FILE_CHUNK_SIZE, file_size - offset)
+                    chunk_header = id_data + struct.pack("!Q", offset)
+                    if self.should_compress(OpCodes.FILE_CHUNK, size):
+                        file.seek(offset)
+                        self.send(OpCodes.FILE_CHUNK, chunk_header + file.read(size))
+                    else:
+                        # zero-copy: the chunk goes from the file to the socket without passing through python
+                        header = struct.pack("!II", OpCodes.FILE_CHUNK, len(chunk_header) + size)
+                        self.client_sock.sendall(header + chunk_header)
+                        self.client_sock.sendfile(file, offset, size)
+                    offset += size
+            self.send(OpCodes.FILE_END, encode_from_json({
+                "id": tar_id,
+                "size": file_size,
+                "hash": file_hash,
+            }))
+            self.ping_timer = PING_INTERVAL_S
+            self.sent.emit()
+        except Exception as e:
+            utils.log_error("LinkService send file chunks failed!", e)
+            self.client_lost()
+
+    def resume_file_transfers(self):
+        if self.chunked_files:
+            for tar_id in list(self.outgoing_files):
+                tar_file, file_hash = self.outgoing_files[tar_id]
+                if os.path.exists(tar_file):
+                    self.send_file_start(tar_id, resume=True)
+                else:
+                    del self.outgoing_files[tar_id]
+
+    def send_file_ack(self, file_id, offset, complete=False):
+        self.send(OpCodes.FILE_ACK, encode_from_json({
+            "id": file_id,
+            "offset": offset,
+            "complete": complete,
+        }))
+
+    def receive_file_start(self, data):
+        json_data = decode_to_json(data)
+        file_id = json_data["id"]
+        file_size = json_data["size"]
+        resume = json_data.get("resume", False)
+        transfer: LinkFileTransfer = self.file_transfers.pop(file_id, None)
+        if transfer:
+            transfer.close()
+        transfer = LinkFileTransfer(file_id, file_size, get_remote_tar_file_path(file_id))
+        offset = transfer.open(resume)
+        self.file_transfers[file_id] = transfer
+        utils.log_info(f"Receiving Remote files: {file_id} {file_size} bytes from offset: {offset}")
+        if resume:
+            self.send_file_ack(file_id, offset)
+
+    def receive_file_chunk(self, data):
+        offset, file_id = unpack_string(data)
+        chunk_offset = struct.unpack_from("!Q", data, offset)[0]
+        transfer: LinkFileTransfer = self.file_transfers.get(file_id)
+        if transfer:
+            if not transfer.write(chunk_offset, memoryview(data)[offset+8:]):
+                utils.log_warn(f"Remote file chunk out of sequence: {file_id} {chunk_offset} expected: {transfer.offset}")
+
+    def receive_file_end(self, data):
+        json_data = decode_to_json(data)
+        file_id = json_data["id"]
+        transfer: LinkFileTransfer = self.file_transfers.pop(file_id, None)
+        if not transfer:
+            return
+        if transfer.finish(json_data["size"], json_data["hash"]):
+            self.send_file_ack(file_id, transfer.offset, complete=True)
+            self.receive_remote_file(file_id.encode(encoding="utf-8"))
+        else:
+            utils.log_warn(f"Remote file transfer failed verification: {file_id}, resuming from: {transfer.offset}")
+            self.file_transfers[file_id] = transfer
+            transfer.open(resume=transfer.offset > 0)
+            self.send_file_ack(file_id, transfer.offset)
+
+    def receive_file_ack(self, data):
+        json_data = decode_to_json(data)
+        tar_id = json_data["id"]
+        if tar_id not in self.outgoing_files:
+            return
+        if json_data.get("complete", False):
+            tar_file, file_hash = self.outgoing_files.pop(tar_id)
+            utils.log_info(f"Remote files received: {tar_id}")
+            if os.path.exists(tar_file):
+                utils.log_info(f"Cleaning up remote export package: {tar_file}")
+                os.remove(tar_file)
+        else:
+            self.send_file_range(tar_id, json_data["offset"])
+
     def start_sequence(self, func=None):
         self.is_sequence = True
         self.sequence_send_count = 5
@@ -2221,6 +2965,7 @@ class LinkService():
 
     def on_connected(self):
         self.send_notify("Connected")
+        self.resume_file_transfers()
 
     def send_notify(self, message):
         notify_json = { "message": message }
@@ -2301,7 +3046,8 @@ class LinkService():
                 update_link_status("Sending Remote files")
                 link_service.send_file(remote_id, tar_file_path)
                 update_link_status("Files Sent")
-            if os.path.exists(tar_file_path):
+            # chunked transfers keep the package until the remote confirms it, so they can be resumed
+            if os.path.exists(tar_file_path) and remote_id not in link_service.outgoing_files:
                 utils.log_info(f"Cleaning up remote export package: {tar_file_path}")
                 os.remove(tar_file_path)
             if os.path.exists(export_folder):
@@ -2800,69 +3546,52 @@ class LinkService():
                     M: Matrix = export_rig.matrix_world
 
                     # pack object transform
-                    T: Matrix = M
-                    t = T.to_translation() * 100
-                    r = T.to_quaternion()
-                    s = T.to_scale()
-                    data += struct.pack("!ffffffffff", t.x, t.y, t.z, r.x, r.y, r.z, r.w, s.x, s.y, s.z)
+                    data += pack_float_block(pack_transform(M, 100))
 
                     # pack all the bone data for the exportable deformation bones
-                    data += struct.pack("!I", len(actor.bones))
+                    bone_block = np.zeros((len(actor.bones), TRANSFORM_FLOATS), dtype=np.float32)
                     if utils.object_mode_to(export_rig):
-                        for bone_name in actor.bones:
+                        for i, bone_name in enumerate(actor.bones):
                             pose_bone = export_rig.pose.bones[bone_name]
-                            T: Matrix = M @ pose_bone.matrix
-                            t = T.to_translation() * 100
-                            r = T.to_quaternion()
-                            s = T.to_scale()
-                            data += struct.pack("!ffffffffff", t.x, t.y, t.z, r.x, r.y, r.z, r.w, s.x, s.y, s.z)
+                            bone_block[i] = pack_transform(M @ pose_bone.matrix, 100)
+                    data += struct.pack("!I", len(actor.bones))
+                    data += pack_float_block(bone_block)
                 else:
                     rig: bpy.types.Object = chr_cache.get_armature()
                     M: Matrix = rig.matrix_world
 
                     # pack object transform
-                    T: Matrix = M
-                    t = T.to_translation() * 100
-                    r = T.to_quaternion()
-                    s = T.to_scale()
-                    data += struct.pack("!ffffffffff", t.x, t.y, t.z, r.x, r.y, r.z, r.w, s.x, s.y, s.z)
+                    data += pack_float_block(pack_transform(M, 100))
 
                     # pack all the bone data
-                    data += struct.pack("!I", len(rig.pose.bones))
+                    bone_block = np.zeros((len(rig.pose.bones), TRANSFORM_FLOATS), dtype=np.float32)
                     if utils.object_mode_to(rig):
                         pose_bone: bpy.types.PoseBone
-                        for pose_bone in rig.pose.bones:
-                            T: Matrix = M @ pose_bone.matrix
-                            t = T.to_translation()
-                            r = T.to_quaternion()
-                            s = T.to_scale()
-                            data += struct.pack("!ffffffffff", t.x, t.y, t.z, r.x, r.y, r.z, r.w, s.x, s.y, s.z)
+                        for i, pose_bone in enumerate(rig.pose.bones):
+                            bone_block[i] = pack_transform(M @ pose_bone.matrix)
+                    data += struct.pack("!I", len(rig.pose.bones))
+                    data += pack_float_block(bone_block)
 
                 # pack mesh transforms (actor.meshes is sanitized by encode_actor_templates)
                 if INCLUDE_POSE_MESHES:
-                    data += struct.pack("!I", len(actor.meshes))
+                    mesh_block = np.zeros((len(actor.meshes), TRANSFORM_FLOATS), dtype=np.float32)
                     if utils.object_mode_to(rig):
                         mesh_obj: bpy.types.Object
-                        for mesh_name in actor.meshes:
+                        for i, mesh_name in enumerate(actor.meshes):
                             mesh_obj = bpy.data.objects[mesh_name]
-                            T: Matrix = mesh_obj.matrix_world
-                            t = T.to_translation()
-                            r = T.to_quaternion()
-                            s = T.to_scale()
-                            data += struct.pack("!ffffffffff", t.x, t.y, t.z, r.x, r.y, r.z, r.w, s.x, s.y, s.z)
+                            mesh_block[i] = pack_transform(mesh_obj.matrix_world)
+                    data += struct.pack("!I", len(actor.meshes))
+                    data += pack_float_block(mesh_block)
 
                 # pack shape_keys
+                weights = np.fromiter((key.value for key in actor.shape_keys.values()),
+                                      dtype=np.float32, count=len(actor.shape_keys))
                 data += struct.pack("!I", len(actor.shape_keys))
-                for shape_key, key in actor.shape_keys.items():
-                    data += struct.pack("!f", key.value)
+                data += pack_float_block(weights)
 
             elif actor_type == "LIGHT":
                 M: Matrix = actor.object.matrix_world
-                T: Matrix = M
-                t = T.to_translation() * 100
-                r = T.to_quaternion()
-                s = T.to_scale()
-                data += struct.pack("!ffffffffff", t.x, t.y, t.z, r.x, r.y, r.z, r.w, s.x, s.y, s.z)
+                data += pack_float_block(pack_transform(M, 100))
                 light: bpy.types.SpotLight = actor.object.data
                 # pack animateable light data
                 data += struct.pack("!?fffffff",
@@ -2877,11 +3606,7 @@ class LinkService():
 
             elif actor_type == "CAMERA":
                 M: Matrix = actor.object.matrix_world
-                T: Matrix = M
-                t = T.to_translation() * 100
-                r = T.to_quaternion()
-                s = T.to_scale()
-                data += struct.pack("!ffffffffff", t.x, t.y, t.z, r.x, r.y, r.z, r.w, s.x, s.y, s.z)
+                data += pack_float_block(pack_transform(M, 100))
                 camera: bpy.types.Camera = actor.object.data
                 # pack animateable camera data
                 data += struct.pack("!f?ff",
@@ -3120,9 +3845,13 @@ class LinkService():
     def send_sequence_ack(self, frame):
         global LINK_DATA
         # encode sequence ack
+        # (skipped: the number of stale frames dropped since the last ack, i.e. how far behind the preview is)
+        skipped = LINK_DATA.sequence_skipped_frames - LINK_DATA.ack_skipped_frames
+        LINK_DATA.ack_skipped_frames = LINK_DATA.sequence_skipped_frames
         data = encode_from_json({
             "frame": BFA(frame),
             "rate": self.loop_rate,
+            "skipped": skipped,
         })
         # send sequence ack
         self.send(OpCodes.SEQUENCE_ACK, data)
@@ -3197,53 +3926,47 @@ class LinkService():
                 # unpack bone transforms
                 num_bones = struct.unpack_from("!I", pose_data, offset)[0]
                 offset += 4
+                offset, translations, rotations, signs = unpack_transform_block(pose_data, offset, num_bones)
 
-                # unpack the binary transform data directly into the datalink rig pose bones
-                for i in range(0, num_bones):
-                    tx,ty,tz,rx,ry,rz,rw,sx,sy,sz = struct.unpack_from("!ffffffffff", pose_data, offset)
-                    offset += 40
-                    if actor and datalink_rig:
+                # apply the unpacked transform data directly into the datalink rig pose bones
+                if actor and datalink_rig:
+                    for i in range(0, num_bones):
                         id = actor.ids[i]
                         if id in actor.id_map:
                             id_def = actor.id_map[id]
+                            loc = Vector(translations[i]) * 0.01
+                            rot = Quaternion(rotations[i])
+                            sca = Vector(signs[i]) * rig.scale
                             if id_def["mesh"]:
-                                obj = actor.skin_meshes[id][0]
-                                actor.skin_meshes[id][1] = Vector((tx, ty, tz)) * 0.01
-                                actor.skin_meshes[id][2] = Quaternion((rw, rx, ry, rz))
-                                actor.skin_meshes[id][3] = Vector((utils.sign(sx), utils.sign(sy), utils.sign(sz))) * rig.scale
+                                actor.skin_meshes[id][1] = loc
+                                actor.skin_meshes[id][2] = rot
+                                actor.skin_meshes[id][3] = sca
                             else:
                                 bone_name = id_def["name"]
                                 pose_bone: bpy.types.PoseBone = datalink_rig.pose.bones[bone_name]
-                                loc = Vector((tx, ty, tz)) * 0.01
-                                rot = Quaternion((rw, rx, ry, rz))
-                                sca = Vector((utils.sign(sx), utils.sign(sy), utils.sign(sz))) * rig.scale
                                 pose_bone.location = loc
                                 utils.set_transform_rotation(pose_bone, rot)
                                 pose_bone.scale = sca
 
+                preview_shape_keys = actor and objects and (prefs.datalink_preview_shape_keys or not LINK_DATA.set_keyframes)
+
                 # unpack the expression shape keys into the mesh objects
                 num_weights = struct.unpack_from("!I", pose_data, offset)[0]
                 offset += 4
-                expression_weights = [0] * num_weights
-                for i in range(0, num_weights):
-                    weight = struct.unpack_from("!f", pose_data, offset)[0]
-                    offset += 4
-                    if actor and objects and (prefs.datalink_preview_shape_keys or not LINK_DATA.set_keyframes):
-                        expression_name = actor.expressions[i]
+                offset, weights = unpack_float_block(pose_data, offset, num_weights)
+                expression_weights = weights.tolist()
+                if preview_shape_keys:
+                    for expression_name, weight in zip(actor.expressions, expression_weights):
                         set_actor_expression_weight(objects, expression_name, weight)
-                    expression_weights[i] = weight
 
                 # unpack the viseme shape keys into the mesh objects
                 num_weights = struct.unpack_from("!I", pose_data, offset)[0]
                 offset += 4
-                viseme_weights = [0] * num_weights
-                for i in range(0, num_weights):
-                    weight = struct.unpack_from("!f", pose_data, offset)[0]
-                    offset += 4
-                    if actor and objects and (prefs.datalink_preview_shape_keys or not LINK_DATA.set_keyframes):
-                        viseme_name = actor.visemes[i]
+                offset, weights = unpack_float_block(pose_data, offset, num_weights)
+                viseme_weights = weights.tolist()
+                if preview_shape_keys:
+                    for viseme_name, weight in zip(actor.visemes, viseme_weights):
                         set_actor_viseme_weight(objects, viseme_name, weight)
-                    viseme_weights[i] = weight
 
                 # TODO: morph weights
                 morph_weights = []
@@ -3763,6 +4486,7 @@ class LinkService():
 
     def receive_sequence(self, data):
         props = vars.props()
+        prefs = vars.prefs()
         global LINK_DATA
 
         props.validate_and_clean_up()
@@ -3781,6 +4505,10 @@ class LinkService():
         LINK_DATA.sequence_current_frame = start_frame
         LINK_DATA.scene_current_frame = current_frame
         LINK_DATA.set_action_settings(motion_prefix, use_fake_user, set_keyframes)
+        # stale frames can only be skipped when previewing, all frames are needed for keyframing
+        LINK_DATA.preview_skip_frames = prefs.datalink_skip_stale_frames and not set_keyframes
+        LINK_DATA.sequence_skipped_frames = 0
+        LINK_DATA.ack_skipped_frames = 0
         num_frames = end_frame - start_frame + 1
         utils.log_info(f"Receive Sequence: {start_frame} to {end_frame}, {num_frames} frames")
 
@@ -3922,6 +4650,8 @@ class LinkService():
         utils.log_timer("Select Rigs", name="SELECT_RIGS")
         utils.log_timer("Store Cache", name="STORE_CACHE")
         utils.log_timer("Write", name="WRITE")
+        if LINK_DATA.sequence_skipped_frames:
+            utils.log_info(f"Skipped stale frames: {LINK_DATA.sequence_skipped_frames}")
 
         # stop sequence
         self.stop_sequence()
@@ -4695,6 +5425,7 @@ class LinkService():
                 temp_chr_cache.clean_up()
                 chr_cache.clean_up()
                 utils.remove_from_collection(props.import_cache, temp_chr_cache)
+                properties.invalidate_cache_index()
 
             # delete the temp rig
             if temp_rig:
@@ -4744,6 +5475,7 @@ class LinkService():
                 chr_cache.delete()
                 chr_cache.clean_up()
                 utils.remove_from_collection(props.import_cache, chr_cache)
+                properties.invalidate_cache_index()
 
     def receive_rigify_request(self, data):
         props = vars.props()
@@ -5109,6 +5841,140 @@ def test():
     utils.log_always("====")
 
 
+def benchmark_pose_frame_codec(num_actors=4, num_bones=250, num_weights=150, num_frames=200):
+    """Compares the throughput (frames per second) of the per-value struct pose frame codec
+       against the block codec, on synthetic pose frame bone and weight blocks."""
+    utils.log_always("")
+    utils.log_always("BENCHMARK: Pose Frame Codec")
+    utils.log_always("===========================")
+
+    rng = np.random.default_rng(0)
+    bone_block = rng.standard_normal((num_bones, TRANSFORM_FLOATS)).astype(np.float32)
+    weights = rng.random(num_weights).astype(np.float32)
+    bone_rows = bone_block.tolist()
+    weight_values = weights.tolist()
+
+    def encode_struct():
+        data = bytearray()
+        for a in range(num_actors):
+            data += struct.pack("!I", num_bones)
+            for row in bone_rows:
+                data += struct.pack("!ffffffffff", *row)
+            data += struct.pack("!I", num_weights)
+            for w in weight_values:
+                data += struct.pack("!f", w)
+        return data
+
+    def encode_block():
+        data = bytearray()
+        for a in range(num_actors):
+            data += struct.pack("!I", num_bones)
+            data += pack_float_block(bone_block)
+            data += struct.pack("!I", num_weights)
+            data += pack_float_block(weights)
+        return data
+
+    def decode_struct(data):
+        offset = 0
+        for a in range(num_actors):
+            count = struct.unpack_from("!I", data, offset)[0]
+            offset += 4
+            for i in range(count):
+                tx,ty,tz,rx,ry,rz,rw,sx,sy,sz = struct.unpack_from("!ffffffffff", data, offset)
+                offset += 40
+                loc = Vector((tx, ty, tz)) * 0.01
+                rot = Quaternion((rw, rx, ry, rz))
+                sca = Vector((utils.sign(sx), utils.sign(sy), utils.sign(sz)))
+            count = struct.unpack_from("!I", data, offset)[0]
+            offset += 4
+            for i in range(count):
+                weight = struct.unpack_from("!f", data, offset)[0]
+                offset += 4
+
+    def decode_block(data):
+        offset = 0
+        for a in range(num_actors):
+            count = struct.unpack_from("!I", data, offset)[0]
+            offset += 4
+            offset, translations, rotations, signs = unpack_transform_block(data, offset, count)
+            for i in range(count):
+                loc = Vector(translations[i]) * 0.01
+                rot = Quaternion(rotations[i])
+                sca = Vector(signs[i])
+            count = struct.unpack_from("!I", data, offset)[0]
+            offset += 4
+            offset, weights_block = unpack_float_block(data, offset, count)
+            weights_block.tolist()
+
+    struct_data = encode_struct()
+    block_data = encode_block()
+    if struct_data != block_data:
+        utils.log_error("Block codec wire format does not match struct codec!")
+        return
+
+    def fps(func, *args):
+        t = time.perf_counter()
+        for f in range(num_frames):
+            func(*args)
+        return num_frames / max(time.perf_counter() - t, 1e-9)
+
+    utils.log_always(f"{num_actors} actors, {num_bones} bones, {num_weights} weights, {len(block_data)} bytes per frame")
+    utils.log_always(f"Encode: struct {fps(encode_struct):.1f} fps, block {fps(encode_block):.1f} fps")
+    utils.log_always(f"Decode: struct {fps(decode_struct, struct_data):.1f} fps, block {fps(decode_block, block_data):.1f} fps")
+
+
+def benchmark_sequence_cache(num_bones=150, num_frames=1000):
+    """Compares the memory use and the time to store and write out (num_frames) of keyframes
+       for (num_bones) using the per channel python list caches and the preallocated cache block."""
+    import tracemalloc
+    utils.log_always("")
+    utils.log_always("BENCHMARK: Sequence Keyframe Cache")
+    utils.log_always("==================================")
+
+    rng = np.random.default_rng(0)
+    frame_values = rng.standard_normal((num_bones, BONE_CACHE_CHANNELS)).astype(np.float32).tolist()
+
+    def list_cache():
+        caches = [ [ [0.0] * (num_frames * 2) for c in range(BONE_CACHE_CHANNELS) ] for b in range(num_bones) ]
+        for frame in range(num_frames):
+            index = frame * 2
+            for b in range(num_bones):
+                bone_values = frame_values[b]
+                for c in range(BONE_CACHE_CHANNELS):
+                    curve = caches[b][c]
+                    curve[index] = frame
+                    curve[index + 1] = bone_values[c]
+        # what would be passed to foreach_set
+        for b in range(num_bones):
+            for c in range(BONE_CACHE_CHANNELS):
+                caches[b][c][:num_frames * 2]
+        return caches
+
+    def block_cache():
+        block = np.empty((num_bones, BONE_CACHE_CHANNELS, num_frames, 2), dtype=np.float32)
+        values = np.empty((num_bones, BONE_CACHE_CHANNELS), dtype=np.float32)
+        for frame in range(num_frames):
+            for b in range(num_bones):
+                values[b] = frame_values[b]
+            block[:, :, frame, 0] = frame
+            block[:, :, frame, 1] = values
+        for b in range(num_bones):
+            for c in range(BONE_CACHE_CHANNELS):
+                block[b, c, :num_frames].ravel()
+        return block
+
+    for name, func in [("list", list_cache), ("block", block_cache)]:
+        tracemalloc.start()
+        t = time.perf_counter()
+        cache = func()
+        duration = time.perf_counter() - t
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del cache
+        per_1000 = duration * 1000 / num_frames
+        utils.log_always(f"{name}: {per_1000 * 1000:.1f} ms per 1000 frames, peak memory: {peak / 1048576:.1f} MB")
+
+
 class CCICLinkConfirmDialog(bpy.types.Operator):
     bl_idname = "ccic.link_confirm_dialog"
     bl_label = "Confirm Action"
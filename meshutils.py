@@ -15,6 +15,7 @@
 # along with CC/iC Blender Tools.  If not, see <https://www.gnu.org/licenses/>.
 
 import math
+import numpy as np
 
 import bpy, bmesh, mathutils
 
@@ -90,19 +91,30 @@ def total_vertex_group_weight(obj, vertex_group: bpy.types.VertexGroup):
     return weight
 
 
+def get_vertex_group_weight_totals(obj):
+    """Returns the total weight of every vertex group of the object, indexed by group index,
+       from a single scan of the mesh vertex weights."""
+    totals = np.zeros(len(obj.vertex_groups), dtype=np.float64)
+    if obj.type == "MESH" and len(totals):
+        pairs = [ (g.group, g.weight) for vert in obj.data.vertices for g in vert.groups ]
+        if pairs:
+            groups, weights = np.array(pairs, dtype=np.float64).T
+            totals += np.bincount(groups.astype(np.int64), weights=weights, minlength=len(totals))[:len(totals)]
+    return totals
+
+
+def find_empty_vertex_groups(obj, threshold = 0.001):
+    """Returns the vertex groups of the object with a total weight below the threshold."""
+    totals = get_vertex_group_weight_totals(obj)
+    return [ vg for vg in obj.vertex_groups if totals[vg.index] <= threshold ]
+
+
 def is_empty_vertex_group(obj, vertex_group: bpy.types.VertexGroup, threshold = 0.001):
     if type(vertex_group) is str or type(vertex_group) is list:
         vertex_group = get_vertex_group(obj, vertex_group)
-    weight = 0.0
     if vertex_group:
-        vg_idx = vertex_group.index
-        for vert in obj.data.vertices:
-            for g in vert.groups:
-                if g.group == vg_idx:
-                    weight += g.weight
-                    break
-            if weight > threshold:
-                return False
+        totals = get_vertex_group_weight_totals(obj)
+        return totals[vertex_group.index] <= threshold
     return True
 
 
@@ -1,87 +1,179 @@
 import bpy
-from mathutils import Vector
+import numpy as np
 from . import nodeutils, utils, vars
 
-def normal_to_height(normal_image: bpy.types.Image, height_image: bpy.types.Image, iterations = 10):
+HEIGHT_TILE_SIZE = 2048
+HEIGHT_TILE_OVERLAP = 64
+MIN_NORMAL_Z = 0.1
+
+
+def normal_gradients(normals):
+    """Returns the height gradients (dz/dx, dz/dy) of an (h, w, 3) array of unit normals."""
+    nz = np.maximum(normals[..., 2], MIN_NORMAL_Z)
+    return -normals[..., 0] / nz, -normals[..., 1] / nz
+
+
+def gradient_divergence(p, q):
+    """Divergence of the gradient field, with the gradients averaged onto the pixel edges
+       and zero flux across the image border (Neumann boundary)."""
+    div = np.zeros(p.shape, dtype=np.float32)
+    gx = (p[:, :-1] + p[:, 1:]) / 2
+    div[:, :-1] += gx
+    div[:, 1:] -= gx
+    gy = (q[:-1, :] + q[1:, :]) / 2
+    div[:-1, :] += gy
+    div[1:, :] -= gy
+    return div
+
+
+def solve_poisson_fft(div):
+    """Solves the discrete Poisson equation (5-point Laplacian) for the height field
+       with Neumann boundaries, by mirror extension of the divergence and a real FFT."""
+    h, w = div.shape
+    mirrored = np.empty((2 * h, 2 * w), dtype=np.float32)
+    mirrored[:h, :w] = div
+    mirrored[:h, w:] = div[:, ::-1]
+    mirrored[h:, :] = mirrored[:h, :][::-1, :]
+    spectrum = np.fft.rfft2(mirrored)
+    wx = np.cos(np.pi * np.arange(spectrum.shape[1]) / w)
+    wy = np.cos(np.pi * np.fft.fftfreq(2 * h) * 2)
+    eigen = (2 * wx[np.newaxis, :] - 2) + (2 * wy[:, np.newaxis] - 2)
+    eigen[0, 0] = 1
+    spectrum /= eigen
+    spectrum[0, 0] = 0
+    heights = np.fft.irfft2(spectrum, s=mirrored.shape)[:h, :w]
+    return heights.astype(np.float32)
+
+
+# the red (0,0), (1,1) and black (0,1), (1,0) sub-grids of the height field
+RED_BLACK_PARITIES = [ [(0, 0), (1, 1)], [(0, 1), (1, 0)] ]
+
+
+def add_row_neighbours(out, heights, r0, c0, dy):
+    """Adds the neighbour (dy = -1 or 1) rows of the strided sub-grid heights[r0::2, c0::2] to out,
+       clamping at the image border (Neumann boundary)."""
+    h = heights.shape[0]
+    sub = heights[r0::2, c0::2]
+    ny = sub.shape[0]
+    k0 = 1 if r0 + dy < 0 else 0
+    start = r0 + dy + 2 * k0
+    k1 = min(ny, k0 + len(range(start, h, 2)))
+    out[k0:k1] += heights[start::2, c0::2][:k1 - k0]
+    out[:k0] += sub[:k0]
+    out[k1:] += sub[k1:]
+
+
+def parity_neighbours(out, heights, r0, c0):
+    """Sums the 4 neighbours of the strided sub-grid heights[r0::2, c0::2] into out."""
+    out.fill(0)
+    add_row_neighbours(out, heights, r0, c0, -1)
+    add_row_neighbours(out, heights, r0, c0, 1)
+    add_row_neighbours(out.T, heights.T, c0, r0, -1)
+    add_row_neighbours(out.T, heights.T, c0, r0, 1)
+    return out
+
+
+def relax_heights(heights, div, iterations, tolerance):
+    """Red-black Gauss-Seidel relaxation of the height field until the largest update
+       falls below the tolerance or the iterations run out. Returns the iterations used.
+       Each colour is updated in place through its strided sub-grids, so the only temporaries
+       are quarter size sub-grid buffers."""
+    buffers = { parity: np.empty(heights[parity[0]::2, parity[1]::2].shape, dtype=np.float32)
+                for color in RED_BLACK_PARITIES for parity in color }
+    for itx in range(0, iterations):
+        max_update = 0.0
+        for color in RED_BLACK_PARITIES:
+            for r0, c0 in color:
+                cells = heights[r0::2, c0::2]
+                if cells.size == 0:
+                    continue
+                relaxed = parity_neighbours(buffers[(r0, c0)], heights, r0, c0)
+                relaxed -= div[r0::2, c0::2]
+                relaxed /= 4
+                cells -= relaxed
+                max_update = max(max_update, float(np.abs(cells).max()))
+                cells[...] = relaxed
+        utils.log_detail(f"iteration: {itx} max update: {max_update}")
+        if max_update < tolerance:
+            return itx + 1
+    return iterations
+
+
+def tile_weights(h, w, overlap):
+    """Feathered blending weights for a tile, ramping up over the overlap at each edge."""
+    ramp_y = np.minimum(np.arange(h) + 1, np.arange(h)[::-1] + 1)
+    ramp_x = np.minimum(np.arange(w) + 1, np.arange(w)[::-1] + 1)
+    ramp_y = np.minimum(ramp_y / (overlap + 1), 1.0)
+    ramp_x = np.minimum(ramp_x / (overlap + 1), 1.0)
+    return np.outer(ramp_y, ramp_x).astype(np.float32)
+
+
+def solve_poisson_tiled(p, q, tile_size, overlap):
+    """Solves overlapping tiles independently, aligns each tile's height offset to the
+       tiles already placed and feather blends them together."""
+    h, w = p.shape
+    accumulated = np.zeros((h, w), dtype=np.float32)
+    weight_sum = np.zeros((h, w), dtype=np.float32)
+    step = max(1, tile_size - overlap)
+    for y0 in range(0, h, step):
+        for x0 in range(0, w, step):
+            y1 = min(y0 + tile_size, h)
+            x1 = min(x0 + tile_size, w)
+            tile = solve_poisson_fft(gradient_divergence(p[y0:y1, x0:x1], q[y0:y1, x0:x1]))
+            acc = accumulated[y0:y1, x0:x1]
+            wsum = weight_sum[y0:y1, x0:x1]
+            placed = wsum > 0
+            if placed.any():
+                tile += (acc[placed] / wsum[placed] - tile[placed]).mean()
+            weights = tile_weights(y1 - y0, x1 - x0, overlap)
+            acc += weights * tile
+            wsum += weights
+            if x1 == w: break
+        if y1 == h: break
+    return accumulated / np.maximum(weight_sum, 1e-6)
+
+
+def normal_to_height(normal_image: bpy.types.Image, height_image: bpy.types.Image, iterations = 10,
+                     tolerance = 1e-4, tile_size = HEIGHT_TILE_SIZE):
+    """Integrates a tangent space normal map into a height map by solving the Poisson equation
+       of the normal gradients: directly by FFT, in overlapping tiles for maps larger than the tile size,
+       then relaxed until the largest height update is below the tolerance (at most iterations)."""
 
-    pixels = pixels = list(normal_image.pixels)
     w = int(normal_image.size[0])
     h = int(normal_image.size[1])
-    l = w*h
-
-    N: Vector
-    D: Vector
-    T: Vector
-
-    # convert to normal vectors
-    normals = [None]*l
-    for i in range(0, l):
-        p = i*4
-        x = 2*pixels[p]-1
-        y = 2*pixels[p+1]-1
-        z = 2*pixels[p+2]-1
-        N = Vector((x,y,z))
-        #N.normalize()
-        normals[i] = N
-
-    directional_displacements = []
-
-    utils.log_always("Building directional displacements")
-    for j in range(-1, 2):
-        for k in range(-1, 2):
-            D = Vector((j, -k, 0))
-
-            if k == 0 and j == 0:
-                directional_displacements.append(None)
-
-            else:
-                displacement_map = [0]*l
-                for i in range(0, l):
-                    N = normals[i]
-                    a = N.dot(D)
-                    T = D - N*a
-                    T.normalize()
-                    d = T.z * 0.5 * D.length
-                    displacement_map[i] = d
-                directional_displacements.append(displacement_map)
-
-    heights = [0]*l
-    for itx in range(0, iterations):
-        utils.log_always(f"iteration: {itx}")
-        for v in range(0, h):
-            for u in range(0, w):
-                i = u+v*w
-                height = 0
-                for j in range(-1, 2, 1):
-                    uu = min(max(u+j, 0), w-1)
-                    for k in range(-1, 2, 1):
-                        if j == 0 and k == 0: continue
-                        vv = min(max(v+k, 0), h-1)
-                        ii = uu + vv*w
-                        jk = j + 3*k + 4
-                        d = directional_displacements[jk][ii] + directional_displacements[jk][i]
-                        height += heights[ii] - d
-                height /= 8
-                heights[i] = height
-
-    min_height = 999999
-    max_height = -999999
-    abs_height = 0
-    for i in range(0, l):
-        min_height = min(min_height, heights[i])
-        max_height = max(max_height, heights[i])
-        abs_height = max(abs_height, abs(heights[i]))
+
+    pixels = np.empty(w * h * 4, dtype=np.float32)
+    normal_image.pixels.foreach_get(pixels)
+    normals = pixels.reshape(h, w, 4)[..., :3] * 2 - 1
+    del pixels
+    p, q = normal_gradients(normals)
+    del normals
+
+    if w <= tile_size and h <= tile_size:
+        utils.log_info(f"Solving height map: {w} x {h}")
+        heights = solve_poisson_fft(gradient_divergence(p, q))
+    else:
+        utils.log_info(f"Solving height map: {w} x {h} in {tile_size} x {tile_size} tiles")
+        heights = solve_poisson_tiled(p, q, tile_size, HEIGHT_TILE_OVERLAP)
+
+    if iterations > 0:
+        div = gradient_divergence(p, q)
+        del p, q
+        used = relax_heights(heights, div, iterations, tolerance)
+        utils.log_info(f"Relaxed height map in {used} iterations")
+
+    heights -= heights.mean()
+    min_height = float(heights.min())
+    max_height = float(heights.max())
+    abs_height = max(abs(min_height), abs(max_height), 1e-6)
 
     utils.log_always(f"min: {min_height} max: {max_height} abs: {abs_height}")
 
-    pixels = list(height_image.pixels)
-    for i in range(0, l):
-        p = i * 4
-        h = min(5*0.5*heights[i]/abs_height + 0.5,1)
-        pixels[p] = h
-        pixels[p+1] = h
-        pixels[p+2] = h
-    height_image.pixels[:] = pixels
+    pixels = np.empty(len(height_image.pixels), dtype=np.float32)
+    height_image.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(-1, 4)
+    pixels[:, 0:3] = np.minimum(5*0.5*heights.reshape(-1, 1)/abs_height + 0.5, 1)
+    height_image.pixels.foreach_set(pixels.ravel())
 
 
 def build_displacement_system(chr_cache, mat_cache):
@@ -1007,6 +1007,7 @@ class CC3CharacterSettingsPanel(bpy.types.Panel):
             column.prop(PREFS, "action_add_key_slots_per_obj")
             #column.prop(PREFS, "action_clean_actions")
             column.prop(PREFS, "action_add_empty_key_channels")
+            column.prop(PREFS, "action_reduce_tolerance")
             column.separator()
             if PREFS.import_auto_convert:
                 column.prop(PREFS, "auto_convert_materials")
@@ -3901,6 +3902,20 @@ class CCICDataLinkPanel(bpy.types.Panel):
         row.prop(link_props, "link_status", text="")
         row.enabled = False
 
+        receiver_stats = link_service.get_receiver_stats() if link_service else None
+        if receiver_stats:
+            queue_depth, max_queue_depth, bytes_per_second = receiver_stats
+            row = layout.row()
+            row.label(text=f"Queue: {queue_depth} (max {max_queue_depth})")
+            row.label(text=f"{bytes_per_second / 1024:.1f} KB/s")
+
+        compression_stats = link_service.get_compression_stats() if link_service else None
+        if compression_stats:
+            codec, ratio, time_saved = compression_stats
+            row = layout.row()
+            row.label(text=f"Compression ({codec}): {ratio:.1f}:1")
+            row.label(text=f"Saved: {time_saved:.2f}s")
+
         column = layout.column(align=True)
         row = column.row(align=True)
         text = "Connect"
@@ -3938,18 +3953,23 @@ class CCICDataLinkPanel(bpy.types.Panel):
             col_2.prop(prefs, "datalink_frame_sync", text="")
             col_1.label(text="Preview Shape Keys")
             col_2.prop(prefs, "datalink_preview_shape_keys", text="")
+            col_1.label(text="Skip Stale Frames")
+            col_2.prop(prefs, "datalink_skip_stale_frames", text="")
             col_1.label(text="Match Client Rate")
             col_2.prop(prefs, "datalink_match_client_rate", text="")
             col_1.label(text="Retarget Prop Actions")
             col_2.prop(prefs, "datalink_retarget_prop_actions", text="")
             col_1.label(text="Hide Prop Bones")
             col_2.prop(prefs, "datalink_hide_prop_bones", text="")
+            col_1.label(text="Background Receive")
+            col_2.prop(prefs, "datalink_threaded_receive", text="")
             #col_1.label(text="Disable Leg Stretch")
             #col_2.prop(prefs, "datalink_disable_tweak_bones", text="")
             col_1.label(text="Confirm Motion")
             col_2.prop(prefs, "datalink_confirm_mismatch", text="")
             col_1.label(text="Confirm Replace")
             col_2.prop(prefs, "datalink_confirm_replace", text="")
+            box.prop(prefs, "datalink_compression", text="Compression")
             box.prop(prefs, "temp_folder")
             box.operator("cc3.setpreferences", icon="FILE_REFRESH", text="Reset").param="RESET_DATALINK"
 
@@ -4190,6 +4210,7 @@ class CC3ToolsPipelineImportPanel(bpy.types.Panel):
             column.prop(PREFS, "action_add_key_slots_per_obj")
             #column.prop(PREFS, "action_clean_actions")
             column.prop(PREFS, "action_add_empty_key_channels")
+            column.prop(PREFS, "action_reduce_tolerance")
             column.separator()
             if PREFS.import_auto_convert:
                 column.prop(PREFS, "auto_convert_materials")
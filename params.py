@@ -2190,6 +2190,7 @@ SHADER_MATRIX = [
             ["PROP", "Normal Strength", "hair_normal_strength", True, "Normal Map"],
             ["PROP", "Bump Strength", "hair_bump_strength", True, "Bump Map"],
             ["OP", "Generate Normal Map", "cc3.bake", "PLAY", "BAKE_FLOW_NORMAL", "Flow Map"], #, "!Normal Map"],
+            ["OP", "Generate All Hair Normal Maps", "cc3.bake", "PLAY", "BAKE_FLOW_NORMAL_ALL", "Flow Map"],
             ["HEADER",  "Displacement", "MOD_DISPLACE", "Displacement Map"],
             ["PROP", "Displacement", "hair_displacement_strength", True, "Displacement Map"],
             ["PROP", "Base", "hair_displacement_base", True, "Displacement Map"],
@@ -106,6 +106,9 @@ def reset_datalink():
     prefs.datalink_retarget_prop_actions = True
     prefs.datalink_disable_tweak_bones = True
     prefs.datalink_hide_prop_bones = True
+    prefs.datalink_skip_stale_frames = False
+    prefs.datalink_compression = "ZLIB"
+    prefs.datalink_threaded_receive = False
     prefs.datalink_send_mode = "ACTIVE"
     prefs.datalink_confirm_mismatch = True
     prefs.datalink_confirm_replace = True
@@ -139,6 +142,7 @@ def reset_preferences():
     prefs.import_auto_convert = True
     prefs.auto_convert_materials = True
     prefs.import_deduplicate = True
+    prefs.import_image_hash = "FAST"
     prefs.import_reset_custom_normals = False
     prefs.import_fix_5_1_normals = True
     prefs.build_pack_texture_channels = False
@@ -159,6 +163,7 @@ def reset_preferences():
     prefs.action_add_empty_key_channels = False
     prefs.action_add_key_slots_per_obj = True
     prefs.action_clean_actions = False
+    prefs.action_reduce_tolerance = 0.0
     prefs.clean_empty_mesh_data = True
     reset_cycles()
     reset_rigify()
@@ -284,6 +289,10 @@ class CC3ToolsAddonPreferences(bpy.types.AddonPreferences):
     action_add_empty_key_channels: bpy.props.BoolProperty(default=False,
                                              description="Add single zero keyframe for empty shape_key channels",
                                              name="Add Empty Channels")
+    action_reduce_tolerance: bpy.props.FloatProperty(default=0.0, min=0.0, soft_max=0.01, precision=4,
+                                             description="When reducing light and camera keyframes, also remove keys that can be linearly interpolated to within this tolerance. " \
+                                                         "0 removes only redundant keys",
+                                             name="Key Reduction Tolerance")
     clean_empty_mesh_data: bpy.props.BoolProperty(default=True,
                                              description="Clean up empty shape-keys and vertex groups from all character meshes",
                                              name="Clean Empty Mesh Data")
@@ -381,6 +390,11 @@ class CC3ToolsAddonPreferences(bpy.types.AddonPreferences):
                 description="Blender 5.1 introduced an export bug that fails to export custom normals on meshes with shape-keys, this option will remove custom normals from all meshes with shape keys on import")
     import_deduplicate: bpy.props.BoolProperty(default=True, name="De-duplicate Materials",
                 description="Detects and re-uses duplicate textures and consolidates materials with same name, textures and parameters into a single material")
+    import_image_hash: bpy.props.EnumProperty(items=[
+                        ("FAST","Fast","Fast non-cryptographic file hash for detecting duplicate textures"),
+                        ("MD5","MD5","MD5 file hash for detecting duplicate textures"),
+                    ], default="FAST", name="Texture Hash",
+                    description="File hash used to detect duplicate textures. File hashes are cached on disk, so unchanged textures are only hashed once")
     import_auto_convert: bpy.props.BoolProperty(default=True, name="Auto Convert Generic",
                 description="When importing generic characters (GLTF, GLB, VRM or OBJ) automatically convert to Reallusion Non-Standard characters or props."
                 "Which sets up Reallusion import compatible materials and material parameters")
@@ -554,6 +568,16 @@ class CC3ToolsAddonPreferences(bpy.types.AddonPreferences):
                         description="Tweak bones cause bone length stretching which is largely incompatible with CC/iC animations. This option disables the stretch constraint to leg tweak bones so that the feet target correctly")
     datalink_hide_prop_bones: bpy.props.BoolProperty(default=True,
                         description="Hide internal prop bones")
+    datalink_compression: bpy.props.EnumProperty(items=[
+                        ("NONE","None","Do not compress DataLink transfers"),
+                        ("ZLIB","Zlib","Offer fast zlib compression for large DataLink transfers (pose frames, templates and files)"),
+                        ("LZMA","LZMA","Offer LZMA compression for large DataLink transfers. Smaller than zlib but slower, better suited to slow remote connections"),
+                    ], default="ZLIB", name = "DataLink Compression",
+                    description="Compression offered to CC/iC when connecting. Only used if CC/iC also supports it. Takes effect on the next connection")
+    datalink_skip_stale_frames: bpy.props.BoolProperty(default=False,
+                        description="When previewing a live sequence without keyframing, skip any received frames that are already superseded by newer frames, so the preview keeps up with the sender")
+    datalink_threaded_receive: bpy.props.BoolProperty(default=False,
+                        description="Receive DataLink data on a background thread, so that large transfers do not stall the interface. Takes effect on the next connection")
 
     datalink_send_mode: bpy.props.EnumProperty(items=[
                     ("ALL","All","Send all materials in the selected meshes", "RESTRICT_SELECT_OFF", 0),
@@ -634,6 +658,7 @@ class CC3ToolsAddonPreferences(bpy.types.AddonPreferences):
         grid.prop(self, "import_reset_custom_normals")
         grid.prop(self, "import_fix_5_1_normals")
         grid.prop(self, "import_deduplicate")
+        grid.prop(self, "import_image_hash")
         grid.prop(self, "import_auto_convert")
         grid.prop(self, "auto_convert_materials")
         grid.prop(self, "build_limit_textures")
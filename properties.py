@@ -22,6 +22,90 @@ from . import (channel_mixer, imageutils, meshutils, sculpting, materials, rigid
                params, physics, basic, jsonutils, utils, vars)
 from . rlx import get_rlx_generation
 from .meshutils import get_head_body_object_quick
+from bpy.app.handlers import persistent
+
+
+# property dependency indexes for live material updates:
+# shader_name -> prop_name -> shader defs, and material -> the nodes those defs write to
+SHADER_DEPENDENCIES = {}
+MATERIAL_DEPENDENCIES = {}
+
+# runtime lookup indexes for the character, object and material caches:
+# keyed by (pointer of the owning property group, index name), rebuilt when the
+# cache collection sizes or owner identity change, when the owning character's
+# object, material or id changes, or when invalidated by the generation counter
+# (bumped on import_cache changes, undo / redo and file load)
+CACHE_INDEX = {}
+CACHE_INDEX_GENERATION = 0
+CACHE_INDEX_BUILDS = 0
+
+MATERIAL_CACHE_COLLECTIONS = [
+    "eye_material_cache",
+    "hair_material_cache",
+    "head_material_cache",
+    "skin_material_cache",
+    "tongue_material_cache",
+    "teeth_material_cache",
+    "tearline_material_cache",
+    "eye_occlusion_material_cache",
+    "pbr_material_cache",
+    "sss_material_cache",
+]
+
+
+def invalidate_cache_index(*args):
+    global CACHE_INDEX_GENERATION
+    CACHE_INDEX_GENERATION += 1
+    CACHE_INDEX.clear()
+
+
+@persistent
+def invalidate_cache_index_handler(*args):
+    invalidate_cache_index()
+    invalidate_material_dependencies()
+
+
+def invalidate_owner_cache_index(self, context):
+    """Property update: drops only the lookup index of the character cache that owns
+       the changed object / material cache. (Staging caches are not indexed.)
+    """
+    try:
+        path = self.path_from_id()
+        owner_path = path[:path.index("]", path.index("import_cache[")) + 1]
+        owner = self.id_data.path_resolve(owner_path)
+        CACHE_INDEX.pop((owner.as_pointer(), "caches"), None)
+    except:
+        pass
+
+
+def invalidate_link_id_index(self, context):
+    for key in [ key for key in CACHE_INDEX if key[1] == "link_ids" ]:
+        CACHE_INDEX.pop(key)
+
+
+def get_cache_index(owner, name, sizes, build_func, identity=None, rebuild=False):
+    """Returns the (index, built) lookup index for the owner, (re)building it if forced, if the
+       sizes or identity of the owner have changed, or if the index has been invalidated.
+
+       Owner pointers are not stable (collection items move when the collection is added to or
+       removed from), so lookups that hit an entry that no longer matches should force a rebuild.
+    """
+    global CACHE_INDEX_BUILDS
+    key = (owner.as_pointer(), name)
+    index = CACHE_INDEX.get(key)
+    if (rebuild or index is None or
+            index["sizes"] != sizes or
+            index["identity"] != identity or
+            index["generation"] != CACHE_INDEX_GENERATION):
+        index = build_func()
+        CACHE_INDEX_BUILDS += 1
+        index["build"] = CACHE_INDEX_BUILDS
+        index["sizes"] = sizes
+        index["identity"] = identity
+        index["generation"] = CACHE_INDEX_GENERATION
+        CACHE_INDEX[key] = index
+        return index, True
+    return index, False
 
 
 def open_mouth_update(self, context):
@@ -226,86 +310,172 @@ def set_linked_property(prop_name, active_mat_cache, mat_cache):
     vars.block_property_update = False
 
 
-def update_shader_property(obj, mat_cache, prop_name):
-    props = vars.props()
+def get_shader_dependencies(shader_name):
+    """Returns the property dependencies of the shader definition:
+       "props": prop_name -> { def category: [defs] }, "categories": def category -> [prop_names],
+       "defs": def category -> [defs]. Or None if there is no shader definition.
+    """
+    if shader_name in SHADER_DEPENDENCIES:
+        return SHADER_DEPENDENCIES[shader_name]
+
+    shader_def = params.get_shader_def(shader_name)
+    dependencies = None
+
+    if shader_def:
+        props = {}
+        categories = {}
+
+        def add_dependency(category, prop_names, dependent_def):
+            for prop_name in dict.fromkeys(prop_names):
+                props.setdefault(prop_name, {}).setdefault(category, []).append(dependent_def)
+                category_props = categories.setdefault(category, [])
+                if prop_name not in category_props:
+                    category_props.append(prop_name)
+
+        for input_def in shader_def.get("inputs", []):
+            add_dependency("inputs", input_def[2:], input_def)
+        for input_def in shader_def.get("bsdf", []):
+            add_dependency("bsdf", input_def[2:], input_def)
+        for texture_def in shader_def.get("textures", []):
+            if len(texture_def) > 5:
+                add_dependency("textures", texture_def[5:], texture_def)
+        for mapping_def in shader_def.get("mapping", []):
+            add_dependency("mapping", mapping_def[3:], mapping_def)
+        for mod_def in shader_def.get("modifiers", []):
+            add_dependency("modifiers", [mod_def[0]], mod_def)
+        for key_def in shader_def.get("shape_keys", []):
+            add_dependency("shape_keys", [key_def[2]], key_def)
+        for setting_def in shader_def.get("settings", []):
+            add_dependency("settings", [setting_def[0]], setting_def)
+
+        dependencies = { "props": props,
+                         "categories": categories,
+                         "defs": { category: shader_def.get(category, [])
+                                   for category in ["inputs", "bsdf"] } }
+
+    SHADER_DEPENDENCIES[shader_name] = dependencies
+    return dependencies
+
+
+def invalidate_material_dependencies():
+    MATERIAL_DEPENDENCIES.clear()
+
+
+def get_material_dependencies(mat, mat_cache):
+    """Returns the dependency index entry of the material along with it's bsdf and shader nodes.
+
+       The entry stores the node names (not the nodes) the shader defs write to, which are re-validated
+       on every lookup, so rebuilt or removed nodes will trigger a rebuild of the entry.
+    """
+    shader_name = params.get_shader_name(mat_cache)
+    key = mat.as_pointer()
+    entry = MATERIAL_DEPENDENCIES.get(key)
+
+    if entry and entry["material"] == mat.name and entry["shader_name"] == shader_name:
+        nodes = mat.node_tree.nodes
+        shader_node = nodes.get(entry["shader_node"]) if entry["shader_node"] else None
+        bsdf_node = nodes.get(entry["bsdf_node"]) if entry["bsdf_node"] else None
+        if (shader_node or not entry["shader_node"]) and (bsdf_node or not entry["bsdf_node"]):
+            return entry, bsdf_node, shader_node
+
+    bsdf_node, shader_node, mix_node = nodeutils.get_shader_nodes(mat, shader_name)
+    entry = {
+        "material": mat.name,
+        "shader_name": shader_name,
+        "dependencies": get_shader_dependencies(shader_name),
+        "shader_node": shader_node.name if shader_node else None,
+        "bsdf_node": bsdf_node.name if bsdf_node else None,
+        "tiling_nodes": {},
+    }
+    MATERIAL_DEPENDENCIES[key] = entry
+    return entry, bsdf_node, shader_node
+
+
+def get_dependency_tiling_node(mat, entry, texture_type):
+    tiling_nodes = entry["tiling_nodes"]
+    if texture_type in tiling_nodes:
+        node_name = tiling_nodes[texture_type]
+        if not node_name:
+            return None
+        node = mat.node_tree.nodes.get(node_name)
+        if node:
+            return node
+    node = nodeutils.get_tiling_node(mat, entry["shader_name"], texture_type)
+    tiling_nodes[texture_type] = node.name if node else None
+    return node
+
+
+def set_dependency_input(node, socket_name, evaluator, *args):
+    node_socket = nodeutils.input_socket(node, socket_name)
+    if node_socket:
+        value = evaluator(*args)
+        if value is not None:
+            nodeutils.set_node_input_value(node, node_socket, value)
+
+
+def update_material_dependencies(obj, mat, mat_cache, prop_names, all_inputs=False):
+    """Updates only the node sockets, modifiers, shape keys and settings of the material
+       that depend on the given properties. (Or all shader and bsdf inputs if all_inputs)
+    """
+    entry, bsdf_node, shader_node = get_material_dependencies(mat, mat_cache)
+    dependencies = entry["dependencies"]
+
+    if not dependencies:
+        utils.log_error("No shader definition for: " + entry["shader_name"])
+        return
+
+    # gather the dependent defs by category, each def only once
+    dependent_defs = {}
+    if all_inputs:
+        for category, defs in dependencies["defs"].items():
+            dependent_defs[category] = { id(d): d for d in defs }
+    for prop_name in prop_names:
+        if prop_name in dependencies["props"]:
+            for category, defs in dependencies["props"][prop_name].items():
+                category_defs = dependent_defs.setdefault(category, {})
+                for d in defs:
+                    category_defs[id(d)] = d
+
+    if shader_node and "inputs" in dependent_defs:
+        for input_def in dependent_defs["inputs"].values():
+            set_dependency_input(shader_node, input_def[0], shaders.eval_input_param, input_def, mat_cache)
+
+    if bsdf_node and "bsdf" in dependent_defs:
+        bsdf_nodes = nodeutils.get_custom_bsdf_nodes(bsdf_node)
+        for input_def in dependent_defs["bsdf"].values():
+            for node in bsdf_nodes:
+                set_dependency_input(node, input_def[0], shaders.eval_input_param, input_def, mat_cache)
+
+    if "textures" in dependent_defs:
+        for texture_def in dependent_defs["textures"].values():
+            tiling_node = get_dependency_tiling_node(mat, entry, texture_def[2])
+            if tiling_node:
+                set_dependency_input(tiling_node, "Tiling", shaders.eval_tiling_param, texture_def, mat_cache)
+
+    if "mapping" in dependent_defs:
+        for mapping_def in dependent_defs["mapping"].values():
+            mapping_node = get_dependency_tiling_node(mat, entry, mapping_def[0])
+            if mapping_node:
+                set_dependency_input(mapping_node, mapping_def[1], shaders.eval_tiling_param, mapping_def, mat_cache, 2)
+
+    for prop_name in prop_names:
+        if prop_name in dependencies["props"]:
+            prop_dependencies = dependencies["props"][prop_name]
+            if "modifiers" in prop_dependencies:
+                update_object_modifier(obj, mat_cache, prop_name, prop_dependencies["modifiers"])
+            if "shape_keys" in prop_dependencies:
+                update_object_shape_keys(obj, mat_cache, prop_name, prop_dependencies["shape_keys"])
+            if "settings" in prop_dependencies:
+                update_material_setting(mat, mat_cache, prop_name, prop_dependencies["settings"])
+
 
+def update_shader_property(obj, mat_cache, prop_name):
     if not mat_cache: return
 
     mat = mat_cache.material
 
     if mat and mat.node_tree:
-        shader_name = params.get_shader_name(mat_cache)
-        bsdf_node, shader_node, mix_node = nodeutils.get_shader_nodes(mat, shader_name)
-        shader_def = params.get_shader_def(shader_name)
-
-        if shader_def:
-
-            if "inputs" in shader_def.keys():
-                update_shader_input(shader_node, mat_cache, prop_name, shader_def["inputs"])
-
-            if "bsdf" in shader_def.keys():
-                bsdf_nodes = nodeutils.get_custom_bsdf_nodes(bsdf_node)
-                for bsdf_node in bsdf_nodes:
-                    update_bsdf_input(bsdf_node, mat_cache, prop_name, shader_def["bsdf"])
-
-            if "textures" in shader_def.keys():
-                update_shader_tiling(shader_name, mat, mat_cache, prop_name, shader_def["textures"])
-
-            if "mapping" in shader_def.keys():
-                update_shader_mapping(shader_name, mat, mat_cache, prop_name, shader_def["mapping"])
-
-            if "modifiers" in shader_def.keys():
-                update_object_modifier(obj, mat_cache, prop_name, shader_def["modifiers"])
-
-            if "shape_keys" in shader_def.keys():
-                update_object_shape_keys(obj, mat_cache, prop_name, shader_def["shape_keys"])
-
-            if "settings" in shader_def.keys():
-                update_material_setting(mat, mat_cache, prop_name, shader_def["settings"])
-
-        else:
-            utils.log_error("No shader definition for: " + shader_name)
-
-
-def update_shader_input(shader_node, mat_cache, prop_name, input_defs):
-    if shader_node:
-        for input_def in input_defs:
-            if prop_name in input_def[2:]:
-                nodeutils.set_node_input_value(shader_node, input_def[0], shaders.eval_input_param(input_def, mat_cache))
-
-
-def update_bsdf_input(bsdf_node, mat_cache, prop_name, bsdf_defs):
-    if bsdf_node:
-        for input_def in bsdf_defs:
-            if prop_name in input_def[2:]:
-                nodeutils.set_node_input_value(bsdf_node,
-                                               input_def[0],
-                                               shaders.eval_input_param(input_def, mat_cache))
-
-
-def update_shader_tiling(shader_name, mat, mat_cache, prop_name, texture_defs):
-    for texture_def in texture_defs:
-        if len(texture_def) > 5:
-            tiling_props = texture_def[5:]
-            texture_type = texture_def[2]
-            if prop_name in tiling_props:
-                tiling_node = nodeutils.get_tiling_node(mat, shader_name, texture_type)
-                nodeutils.set_node_input_value(tiling_node, "Tiling", shaders.eval_tiling_param(texture_def, mat_cache))
-
-
-def update_shader_mapping(shader_name, mat, mat_cache, prop_name, mapping_defs):
-    mapping_node = None
-    current_texture_type = None
-    for mapping_def in mapping_defs:
-        texture_type = mapping_def[0]
-        if current_texture_type != texture_type:
-            mapping_node = nodeutils.get_tiling_node(mat, shader_name, texture_type)
-            current_texture_type = texture_type
-        if mapping_node:
-            tiling_props = mapping_def[3:]
-            if prop_name in tiling_props:
-                socket_name = mapping_def[1]
-                nodeutils.set_node_input_value(mapping_node, socket_name, shaders.eval_tiling_param(mapping_def, mat_cache, 2))
+        update_material_dependencies(obj, mat, mat_cache, [prop_name])
 
 
 def update_object_modifier(obj, mat_cache, prop_name, mod_defs):
@@ -468,38 +638,23 @@ def update_all_properties(context, update_mode = None):
                         if not already_processed:
                             basic.update_basic_material(mat, mat_cache, "ALL")
 
-                    else: # ADVANCED
+                    elif mat_cache and mat and mat.node_tree: # ADVANCED
 
                         shader_name = params.get_shader_name(mat_cache)
-                        bsdf_node, shader_node, mix_node = nodeutils.get_shader_nodes(mat, shader_name)
-                        shader_def = params.get_shader_def(shader_name)
+                        dependencies = get_shader_dependencies(shader_name)
 
-                        if shader_def:
+                        if dependencies:
+                            categories = dependencies["categories"]
+                            prop_names = []
                             if not already_processed:
-                                shaders.apply_prop_matrix(bsdf_node, shader_node, mat_cache, shader_name)
-
-                                if "textures" in shader_def.keys():
-                                    for tex_def in shader_def["textures"]:
-                                        tiling_props = tex_def[5:]
-                                        for prop_name in tiling_props:
-                                            update_shader_property(obj, mat_cache, prop_name)
-
+                                prop_names.extend(categories.get("textures", []))
                             # modifiers need updating even if material already processed for split objects
-                            if "modifiers" in shader_def.keys():
-                                for mod_def in shader_def["modifiers"]:
-                                    prop_name = mod_def[0]
-                                    update_shader_property(obj, mat_cache, prop_name)
-
-                            if "shape_keys" in shader_def.keys():
-                                for mod_def in shader_def["shape_keys"]:
-                                    prop_name = mod_def[2]
-                                    update_shader_property(obj, mat_cache, prop_name)
-
+                            prop_names.extend(categories.get("modifiers", []))
+                            prop_names.extend(categories.get("shape_keys", []))
                             if not already_processed:
-                                if "settings" in shader_def.keys():
-                                    for mat_def in shader_def["settings"]:
-                                        prop_name = mat_def[0]
-                                        update_shader_property(obj, mat_cache, prop_name)
+                                prop_names.extend(categories.get("settings", []))
+                            update_material_dependencies(obj, mat, mat_cache, prop_names,
+                                                         all_inputs=not already_processed)
 
                     processed.append(mat)
 
@@ -1397,8 +1552,8 @@ class CC3TextureMapping(bpy.types.PropertyGroup):
 
 # region MaterialCache
 class CC3MaterialCache:
-    material_id: bpy.props.StringProperty(default="")
-    material: bpy.props.PointerProperty(type=bpy.types.Material)
+    material_id: bpy.props.StringProperty(default="", update=invalidate_owner_cache_index)
+    material: bpy.props.PointerProperty(type=bpy.types.Material, update=invalidate_owner_cache_index)
     source_name: bpy.props.StringProperty(default="")
     material_type: bpy.props.EnumProperty(items=vars.ENUM_MATERIAL_TYPES, default="DEFAULT", update=lambda s,c: update_material_property(s,c,"material_type"))
     texture_mappings: bpy.props.CollectionProperty(type=CC3TextureMapping)
@@ -1620,8 +1775,8 @@ class CC3SSSMaterialCache(bpy.types.PropertyGroup, CC3MaterialCache):
 
 # region ObjectCache
 class CC3ObjectCache(bpy.types.PropertyGroup):
-    object_id: bpy.props.StringProperty(default="")
-    object: bpy.props.PointerProperty(type=bpy.types.Object)
+    object_id: bpy.props.StringProperty(default="", update=invalidate_owner_cache_index)
+    object: bpy.props.PointerProperty(type=bpy.types.Object, update=invalidate_owner_cache_index)
     source_name: bpy.props.StringProperty(default="")
     object_type: bpy.props.EnumProperty(items=vars.ENUM_OBJECT_TYPES, default="DEFAULT", update=lambda s,c: update_object_property(s,c,"object_type"))
     collision_physics: bpy.props.StringProperty(default="DEFAULT") # DEFAULT, OFF, ON, PROXY
@@ -1950,7 +2105,7 @@ class CC3CharacterCache(bpy.types.PropertyGroup):
     import_flags: bpy.props.IntProperty(default=0)
     import_embedded: bpy.props.BoolProperty(default=False)
     # which character in the import
-    link_id: bpy.props.StringProperty(default="")
+    link_id: bpy.props.StringProperty(default="", update=invalidate_link_id_index)
     character_name: bpy.props.StringProperty(default="")
     generation: bpy.props.StringProperty(default="None")
     parent_object: bpy.props.PointerProperty(type=bpy.types.Object)
@@ -2574,24 +2729,68 @@ class CC3CharacterCache(bpy.types.PropertyGroup):
             return obj_cache.get_object() != obj
         return False
 
+    def get_cache_index(self, rebuild=False):
+        """Returns the (index, built) lookup index for the object and material caches of this character,
+           (re)building it if the cache collections have changed size or the index has been invalidated.
+
+           The index stores collection indices, not cache references, as these become invalid
+           when the collections are added to or removed from.
+        """
+        sizes = (len(self.object_cache),) + tuple(len(getattr(self, name)) for name in MATERIAL_CACHE_COLLECTIONS)
+        return get_cache_index(self, "caches", sizes, self.build_cache_index, identity=self.link_id, rebuild=rebuild)
+
+    def build_cache_index(self):
+        objects = {}
+        object_ids = {}
+        for i, obj_cache in enumerate(self.object_cache):
+            cache_object = obj_cache.get_object()
+            if cache_object:
+                objects.setdefault(cache_object.as_pointer(), []).append(i)
+            if obj_cache.object_id:
+                object_ids.setdefault(obj_cache.object_id, []).append(i)
+        materials = {}
+        material_ids = {}
+        for name in MATERIAL_CACHE_COLLECTIONS:
+            for i, mat_cache in enumerate(getattr(self, name)):
+                if mat_cache.material:
+                    materials.setdefault(mat_cache.material.as_pointer(), (name, i))
+                if mat_cache.material_id:
+                    material_ids.setdefault(mat_cache.material_id, (name, i))
+        return { "objects": objects, "object_ids": object_ids,
+                 "materials": materials, "material_ids": material_ids }
+
+    def find_indexed_object_cache(self, index, obj, by_id, include_disabled):
+        stale = False
+        # by object
+        for i in index["objects"].get(obj.as_pointer(), []):
+            obj_cache = self.object_cache[i]
+            if obj_cache.get_object() != obj:
+                stale = True
+            elif include_disabled or not obj_cache.disabled:
+                return obj_cache, False
+        # by id
+        if by_id:
+            for i in index["object_ids"].get(by_id, []):
+                obj_cache = self.object_cache[i]
+                if obj_cache.object_id != by_id:
+                    stale = True
+                elif include_disabled or not obj_cache.disabled:
+                    return obj_cache, stale
+        return None, stale
+
     def get_object_cache(self, obj, include_disabled=False, by_id=None, strict=False) -> CC3ObjectCache:
         """Returns the object cache for this object.
         """
         if utils.object_exists(obj):
-            # by object
             if not strict and not by_id:
                 by_id = utils.get_rl_id(obj)
-            for obj_cache in self.object_cache:
-                if include_disabled or not obj_cache.disabled:
-                    cache_object = obj_cache.get_object()
-                    if cache_object and cache_object == obj:
-                        return obj_cache
-            # by id
-            if by_id:
-                for obj_cache in self.object_cache:
-                    if include_disabled or not obj_cache.disabled:
-                        if obj_cache.object_id == by_id:
-                            return obj_cache
+            index, built = self.get_cache_index()
+            obj_cache, stale = self.find_indexed_object_cache(index, obj, by_id, include_disabled)
+            if stale and not built:
+                # object pointers can be re-used or changed without notification (i.e. deleted objects)
+                index, built = self.get_cache_index(rebuild=True)
+                obj_cache, stale = self.find_indexed_object_cache(index, obj, by_id, include_disabled)
+            return obj_cache
         return None
 
     def remove_object_cache(self, obj):
@@ -2681,13 +2880,14 @@ class CC3CharacterCache(bpy.types.PropertyGroup):
 
     def get_objects_of_type(self, object_type):
         objects = []
+        chr_objects_by_id = None
         for obj_cache in self.object_cache:
             if obj_cache.object_type == object_type:
-                body_id = obj_cache.object_id
-                chr_objects = self.get_cache_objects()
-                for obj in chr_objects:
-                    if utils.get_rl_id(obj) == body_id:
-                        objects.append(obj)
+                if chr_objects_by_id is None:
+                    chr_objects_by_id = {}
+                    for obj in self.get_cache_objects():
+                        chr_objects_by_id.setdefault(utils.get_rl_id(obj), []).append(obj)
+                objects.extend(chr_objects_by_id.get(obj_cache.object_id, []))
         return objects
 
     def get_object_of_type(self, object_type, include_disabled=False):
@@ -2782,6 +2982,25 @@ class CC3CharacterCache(bpy.types.PropertyGroup):
                             count += 1
         return count
 
+    def find_indexed_material_cache(self, index, mat, by_id):
+        stale = False
+        entry = index["materials"].get(mat.as_pointer())
+        if entry:
+            name, i = entry
+            mat_cache = getattr(self, name)[i]
+            if mat_cache.material == mat:
+                return mat_cache, False
+            stale = True
+        if by_id:
+            entry = index["material_ids"].get(by_id)
+            if entry:
+                name, i = entry
+                mat_cache = getattr(self, name)[i]
+                if mat_cache.material_id == by_id:
+                    return mat_cache, stale
+                stale = True
+        return None, stale
+
     def get_material_cache(self, mat, by_id=None):
         """Returns the material cache for this material.
 
@@ -2790,68 +3009,12 @@ class CC3CharacterCache(bpy.types.PropertyGroup):
 
         mat_cache: CC3MaterialCache
         if mat is not None:
-            for mat_cache in self.eye_material_cache:
-                if mat_cache.material == mat:
-                    return mat_cache
-            for mat_cache in self.hair_material_cache:
-                if mat_cache.material == mat:
-                    return mat_cache
-            for mat_cache in self.head_material_cache:
-                if mat_cache.material == mat:
-                    return mat_cache
-            for mat_cache in self.skin_material_cache:
-                if mat_cache.material == mat:
-                    return mat_cache
-            for mat_cache in self.tongue_material_cache:
-                if mat_cache.material == mat:
-                    return mat_cache
-            for mat_cache in self.teeth_material_cache:
-                if mat_cache.material == mat:
-                    return mat_cache
-            for mat_cache in self.tearline_material_cache:
-                if mat_cache.material == mat:
-                    return mat_cache
-            for mat_cache in self.eye_occlusion_material_cache:
-                if mat_cache.material == mat:
-                    return mat_cache
-            for mat_cache in self.pbr_material_cache:
-                if mat_cache.material == mat:
-                    return mat_cache
-            for mat_cache in self.sss_material_cache:
-                if mat_cache.material == mat:
-                    return mat_cache
-
-            if by_id:
-                for mat_cache in self.eye_material_cache:
-                    if mat_cache.material_id == by_id:
-                        return mat_cache
-                for mat_cache in self.hair_material_cache:
-                    if mat_cache.material_id == by_id:
-                        return mat_cache
-                for mat_cache in self.head_material_cache:
-                    if mat_cache.material_id == by_id:
-                        return mat_cache
-                for mat_cache in self.skin_material_cache:
-                    if mat_cache.material_id == by_id:
-                        return mat_cache
-                for mat_cache in self.tongue_material_cache:
-                    if mat_cache.material_id == by_id:
-                        return mat_cache
-                for mat_cache in self.teeth_material_cache:
-                    if mat_cache.material_id == by_id:
-                        return mat_cache
-                for mat_cache in self.tearline_material_cache:
-                    if mat_cache.material_id == by_id:
-                        return mat_cache
-                for mat_cache in self.eye_occlusion_material_cache:
-                    if mat_cache.material_id == by_id:
-                        return mat_cache
-                for mat_cache in self.pbr_material_cache:
-                    if mat_cache.material_id == by_id:
-                        return mat_cache
-                for mat_cache in self.sss_material_cache:
-                    if mat_cache.material_id == by_id:
-                        return mat_cache
+            index, built = self.get_cache_index()
+            mat_cache, stale = self.find_indexed_material_cache(index, mat, by_id)
+            if stale and not built:
+                index, built = self.get_cache_index(rebuild=True)
+                mat_cache, stale = self.find_indexed_material_cache(index, mat, by_id)
+            return mat_cache
         return None
 
 
@@ -3570,6 +3733,7 @@ class CC3ImportProps(bpy.types.PropertyGroup):
 
     def add_character_cache(self, copy_from=None) -> 'CC3CharacterCache':
         chr_cache = self.import_cache.add()
+        invalidate_cache_index()
         if copy_from:
             exclude_list = ["*_material_cache", "object_cache"]
             utils.copy_property_group(copy_from, chr_cache, exclude=exclude_list)
@@ -3608,29 +3772,99 @@ class CC3ImportProps(bpy.types.PropertyGroup):
                         return chr_cache
         return None
 
-    def get_character_cache(self, obj, mat, by_id=None) -> 'CC3CharacterCache':
+    def get_character_index(self):
+        """Returns the object pointer / object id / material pointer -> import_cache indices lookup.
+
+           Merged from the lookup index of each character cache, only the characters whose
+           index has been rebuilt since are re-merged.
+        """
+        key = (self.as_pointer(), "characters")
+        index = CACHE_INDEX.get(key)
+        num_characters = len(self.import_cache)
+        if (index is None or
+                index["generation"] != CACHE_INDEX_GENERATION or
+                len(index["builds"]) != num_characters):
+            index = { "objects": {}, "object_ids": {}, "materials": {},
+                      "builds": [None] * num_characters,
+                      "keys": [None] * num_characters,
+                      "generation": CACHE_INDEX_GENERATION }
+            CACHE_INDEX[key] = index
+        for i, chr_cache in enumerate(self.import_cache):
+            chr_index, built = chr_cache.get_cache_index()
+            if index["builds"][i] != chr_index["build"]:
+                if index["keys"][i]:
+                    for name, keys in index["keys"][i].items():
+                        for k in keys:
+                            indices = index[name][k]
+                            indices.remove(i)
+                            if not indices:
+                                del index[name][k]
+                keys = { name: list(chr_index[name].keys()) for name in ["objects", "object_ids", "materials"] }
+                for name, name_keys in keys.items():
+                    for k in name_keys:
+                        index[name].setdefault(k, []).append(i)
+                index["keys"][i] = keys
+                index["builds"][i] = chr_index["build"]
+        return index
+
+    def get_indexed_characters(self, obj=None, by_id=None, mat=None):
+        """Returns the character caches (in import_cache order) that may contain the object, object id or material."""
+        index = self.get_character_index()
+        indices = set()
         if obj:
+            indices.update(index["objects"].get(obj.as_pointer(), []))
+        if by_id:
+            indices.update(index["object_ids"].get(by_id, []))
+        if mat:
+            indices.update(index["materials"].get(mat.as_pointer(), []))
+        return [ self.import_cache[i] for i in sorted(indices) ]
+
+    def get_character_cache(self, obj, mat, by_id=None) -> 'CC3CharacterCache':
+        if utils.object_exists(obj):
             if not by_id:
                 by_id = utils.get_rl_id(obj)
-            for chr_cache in self.import_cache:
+            for chr_cache in self.get_indexed_characters(obj=obj, by_id=by_id):
                 if not chr_cache.disabled:
                     obj_cache = chr_cache.get_object_cache(obj, by_id=by_id)
                     if obj_cache and not obj_cache.disabled:
                         return chr_cache
         if mat:
-            for chr_cache in self.import_cache:
+            for chr_cache in self.get_indexed_characters(mat=mat):
                 if not chr_cache.disabled:
                     mat_cache = chr_cache.get_material_cache(mat)
                     if mat_cache and not mat_cache.disabled:
                         return chr_cache
         return None
 
+    def get_link_id_index(self, rebuild=False):
+        """Returns the (link_id -> import_cache indices, built) lookup.
+        """
+        def build():
+            link_ids = {}
+            for i, chr_cache in enumerate(self.import_cache):
+                if chr_cache.link_id:
+                    link_ids.setdefault(chr_cache.link_id, []).append(i)
+            return { "link_ids": link_ids }
+        index, built = get_cache_index(self, "link_ids", (len(self.import_cache),), build, rebuild=rebuild)
+        return index["link_ids"], built
+
     def get_characters_by_link_id(self, character_ids):
-        characters = []
-        for chr_cache in self.import_cache:
-            if chr_cache.link_id in character_ids:
-                characters.append(chr_cache)
-        return characters
+        link_ids, built = self.get_link_id_index()
+        while True:
+            characters = []
+            indices = set()
+            stale = False
+            for link_id in set(character_ids):
+                indices.update(link_ids.get(link_id, []))
+            for i in sorted(indices):
+                chr_cache = self.import_cache[i]
+                if chr_cache.link_id in character_ids:
+                    characters.append(chr_cache)
+                else:
+                    stale = True
+            if built or not stale:
+                return characters
+            link_ids, built = self.get_link_id_index(rebuild=True)
 
     def get_staging_cache(self, obj, by_id=None, create=False) -> 'CC3StagingCache':
         if obj:
@@ -3671,9 +3905,18 @@ class CC3ImportProps(bpy.types.PropertyGroup):
 
     def find_character_by_link_id(self, link_id):
         if link_id:
-            for chr_cache in self.import_cache:
-                if not chr_cache.disabled and chr_cache.link_id == link_id:
-                    return chr_cache
+            link_ids, built = self.get_link_id_index()
+            while True:
+                stale = False
+                for i in link_ids.get(link_id, []):
+                    chr_cache = self.import_cache[i]
+                    if chr_cache.link_id != link_id:
+                        stale = True
+                    elif not chr_cache.disabled:
+                        return chr_cache
+                if built or not stale:
+                    break
+                link_ids, built = self.get_link_id_index(rebuild=True)
         return None
 
     def get_context_character_cache(self, context=None, strict=False) -> CC3CharacterCache:
@@ -3722,8 +3965,9 @@ class CC3ImportProps(bpy.types.PropertyGroup):
             return None
 
     def get_object_cache(self, obj, include_disabled=False):
-        if obj:
-            for chr_cache in self.import_cache:
+        if utils.object_exists(obj):
+            by_id = utils.get_rl_id(obj)
+            for chr_cache in self.get_indexed_characters(obj=obj, by_id=by_id):
                 obj_cache = chr_cache.get_object_cache(obj, include_disabled=include_disabled)
                 if obj_cache:
                     return obj_cache
@@ -3731,7 +3975,7 @@ class CC3ImportProps(bpy.types.PropertyGroup):
 
     def get_material_cache(self, mat):
         if mat:
-            for imp_cache in self.import_cache:
+            for imp_cache in self.get_indexed_characters(mat=mat):
                 mat_cache = imp_cache.get_material_cache(mat)
                 if mat_cache:
                     return mat_cache
@@ -19,6 +19,7 @@ from mathutils import Vector, Matrix, Quaternion, Euler
 from random import random
 from enum import IntEnum
 import re, time, os, json
+import numpy as np
 from . import springbones, bones, facerig, modifiers, rigify_mapping_data, lib, ui, utils, vars
 from typing import List
 
@@ -3877,112 +3878,145 @@ def clean_actions(obj):
                 clean_action_keyframes(key_action)
 
 
+# per key-frame properties preserved when cleaning: (property, size, dtype)
+KEYFRAME_CLEAN_PROPS = [
+    ("handle_left", 2, np.float32),
+    ("handle_right", 2, np.float32),
+    ("handle_left_type", 1, np.int32),
+    ("handle_right_type", 1, np.int32),
+    ("interpolation", 1, np.int32),
+    ("easing", 1, np.int32),
+]
+
+
 def clean_action_keyframes(action: bpy.types.Action, bone_threshold=0.0001, key_threshold=0.001, facerig_threshold=0.00001, other_threshold=0.0001, channels=True):
     """Note: bone threshold value of 0.0001 will clean bone key-frames to 1/200th of a degree 1/10th of a mm
              key threshold value of 0.01 will clean shape key key-frames to 1/1000th of their range
              facerig threshold value of about 0.00001 will clean key-frames on the
-                     face rig controls to within 1/1000th on it's driven shape-key value."""
+                     face rig controls to within 1/1000th on it's driven shape-key value.
+       Works directly on the key-frame data (no operators or UI needed).
+       channels: also remove fcurves left with a single key-frame at the property's default value.
+       Returns the number of key-frames removed."""
 
     if not action:
-        return
-    fcurves = utils.get_action_fcurves(action)
-    bone_curves = []
-    key_curves = []
-    facerig_curves = []
-    other_curves = []
-    fcurve: bpy.types.FCurve
-    for fcurve in fcurves:
-        if fcurve.data_path.startswith("key_blocks"):
-            key_curves.append(fcurve)
-        elif fcurve.data_path.startswith("pose.bones"):
-            if "CTRL_" in fcurve.data_path:
-                facerig_curves.append(fcurve)
-            else:
-                bone_curves.append(fcurve)
-        else:
-            other_curves.append(fcurve)
-    groups = {}
-    groups["Pose Bone"] = (bone_curves, bone_threshold)
-    groups["Shape Keys"] = (key_curves, key_threshold)
-    groups["Face Rig Control"] = (facerig_curves, facerig_threshold)
-    groups["Other"] = (other_curves, other_threshold)
-
-    if bpy.context.screen.areas:
-        area = bpy.context.screen.areas[0]
-        area_type = area.type
-        area.type = "DOPESHEET_EDITOR"
-
-        if utils.B320():
-            with bpy.context.temp_override(area=area):
-
-                # deselect all key-frames
-                bpy.ops.action.select_all(action="DESELECT")
-
-                # deselect all channel groups and fcurves,
-                # otherwise everything gets cleaned (in channel mode) ...
-                for action in bpy.data.actions:
-                    action_groups = utils.get_action_groups(action)
-                    for group in action_groups:
-                        group.select = False
-                    action_fcurves = utils.get_action_fcurves(action)
-                    for fcurve in action_fcurves:
-                        fcurve.select = False
-
-                for group_name, (curves, threshold) in groups.items():
-                    if curves:
-                        curve_count = 0
-                        keyframe_count = 0
-
-                        # select the channels & groups to be cleaned
-                        for fcurve in curves:
-                            if utils.id_exists(fcurve):
-                                fcurve.select = True
-                                if utils.id_exists(fcurve.group):
-                                    fcurve.group.select = True
-                                curve_count += 1
-
-                            # if not cleaning by channel, select all the keyframes in each fcurve
-                            if not channels:
-                                kf: bpy.types.Keyframe
-                                for kf in fcurve.keyframe_points:
-                                    kf.select_control_point = True
-                                    keyframe_count += 1
-
-                        if channels:
-                            utils.log_info(f"Cleaning action {group_name} key-frames: {action.name} ({curve_count} channels) Threshold: {threshold}")
-                        else:
-                            utils.log_info(f"Cleaning action {group_name} key-frames: {action.name} ({curve_count} channels, {keyframe_count} key-frames) Threshold: {threshold}")
-
-                        # clean the selected channels / key-frames
-                        bpy.ops.action.clean(threshold=threshold, channels=channels)
-
-                        # deselect the channels we just cleaned
-                        for fcurve in curves:
-                            if utils.id_exists(fcurve):
-                                fcurve.select = False
-                                if utils.id_exists(fcurve.group) and fcurve.group.name != "":
-                                    fcurve.group.select = False
-
-                        # deselect all key-frames
-                        bpy.ops.action.select_all(action="DESELECT")
+        return 0
+    thresholds = {
+        "Pose Bone": bone_threshold,
+        "Shape Keys": key_threshold,
+        "Face Rig Control": facerig_threshold,
+        "Other": other_threshold,
+    }
+    counts = { group_name: [0, 0, 0] for group_name in thresholds }
+
+    for channel in utils.get_action_channelbags_list(action):
+        fcurve: bpy.types.FCurve
+        for fcurve in list(channel.fcurves):
+            group_name = get_fcurve_clean_group(fcurve)
+            num_keys = len(fcurve.keyframe_points)
+            count = counts[group_name]
+            count[0] += 1
+            count[1] += num_keys
+            if num_keys == 0:
+                continue
+            co = np.empty(num_keys * 2, dtype=np.float32)
+            fcurve.keyframe_points.foreach_get("co", co)
+            co = co.reshape(-1, 2)
+            keep = clean_keyframe_values(co[:, 0], co[:, 1], thresholds[group_name])
+            num_kept = int(np.count_nonzero(keep))
+            if channels and num_kept == 1:
+                default_value = get_fcurve_default_value(fcurve)
+                if default_value is not None and abs(co[keep][0, 1] - default_value) <= thresholds[group_name]:
+                    channel.fcurves.remove(fcurve)
+                    count[2] += num_keys
+                    continue
+            if num_kept < num_keys:
+                # keep the per key handles, handle types, interpolation and easing of the kept keys
+                key_data = {}
+                for prop, size, dtype in KEYFRAME_CLEAN_PROPS:
+                    data = np.empty(num_keys * size, dtype=dtype)
+                    fcurve.keyframe_points.foreach_get(prop, data)
+                    key_data[prop] = np.ascontiguousarray(data.reshape(num_keys, size)[keep]).ravel()
+                fcurve.keyframe_points.clear()
+                fcurve.keyframe_points.add(num_kept)
+                fcurve.keyframe_points.foreach_set("co", np.ascontiguousarray(co[keep]).ravel())
+                for prop, size, dtype in KEYFRAME_CLEAN_PROPS:
+                    fcurve.keyframe_points.foreach_set(prop, key_data[prop])
+                fcurve.update()
+                count[2] += num_keys - num_kept
+
+    total_removed = 0
+    for group_name, (curve_count, keyframe_count, removed) in counts.items():
+        if curve_count:
+            utils.log_info(f"Cleaned action {group_name} key-frames: {action.name} ({curve_count} channels, "
+                           f"{keyframe_count} key-frames) Threshold: {thresholds[group_name]} Removed: {removed}")
+            total_removed += removed
+    utils.log_info(f"Cleaned action: {action.name}, removed {total_removed} key-frames")
+    return total_removed
+
+
+def get_fcurve_clean_group(fcurve: bpy.types.FCurve):
+    if fcurve.data_path.startswith("key_blocks"):
+        return "Shape Keys"
+    elif fcurve.data_path.startswith("pose.bones"):
+        if "CTRL_" in fcurve.data_path:
+            return "Face Rig Control"
+        return "Pose Bone"
+    return "Other"
+
+
+def get_fcurve_default_value(fcurve: bpy.types.FCurve):
+    """Default value of the common animated transform and shape key properties, or None if not known."""
+    data_path = fcurve.data_path
+    if data_path.endswith("location") or data_path.endswith("rotation_euler"):
+        return 0.0
+    elif data_path.endswith("rotation_quaternion"):
+        return 1.0 if fcurve.array_index == 0 else 0.0
+    elif data_path.endswith("rotation_axis_angle"):
+        # (angle, x, y, z) defaults to (0, 0, 1, 0)
+        return 1.0 if fcurve.array_index == 2 else 0.0
+    elif data_path.endswith("scale"):
+        return 1.0
+    elif data_path.startswith("key_blocks") and data_path.endswith(".value"):
+        return 0.0
+    return None
 
-        else:
-            utils.log_info(f"Cleaning action keyframes: {action.name} ({len(fcurves)} fcurves)")
-            context_override = bpy.context.copy()
-            context_override["area"] = area
-            context_override["selected_editable_fcurves"] = fcurves
-            context_override["selected_visible_fcurves"] = fcurves
-            bpy.ops.action.select_all(context_override, action="DESELECT")
-            bpy.ops.action.clean(context_override, threshold=threshold, channels=channels)
-        #except:
-        #    utils.log_error(f"Unable to clean action keyframes: {action.name}")
-        area.type = area_type
+
+def clean_keyframe_values(frames, values, threshold):
+    """Returns a mask of the key-frames to keep: removes the keys that are within threshold
+       of both their neighbours, and restores keys where the removed runs would drift
+       more than threshold from the original values."""
+    num_keys = len(values)
+    keep = np.ones(num_keys, dtype=bool)
+    if num_keys < 2:
+        return keep
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    flat = np.abs(np.diff(values)) <= threshold
+    keep[1:-1] = ~(flat[:-1] & flat[1:])
+    # a flat curve only needs its first key
+    if np.ptp(values) <= threshold:
+        keep[1:] = False
+        return keep
+    # linearly interpolate each removed key from the kept keys either side of it
+    indices = np.arange(num_keys)
+    prev_kept = np.maximum.accumulate(np.where(keep, indices, 0))
+    next_kept = np.minimum.accumulate(np.where(keep, indices, num_keys - 1)[::-1])[::-1]
+    span = frames[next_kept] - frames[prev_kept]
+    t = np.divide(frames - frames[prev_kept], span, out=np.zeros(num_keys), where=span != 0)
+    error = np.abs(values - (values[prev_kept] + t * (values[next_kept] - values[prev_kept])))
+    drifted = (~keep) & (error > threshold)
+    for first in np.unique(prev_kept[drifted]):
+        last = next_kept[first + 1]
+        run = slice(first, last + 1)
+        keep[run] |= utils.simplify_curve_keys(frames[run], values[run], threshold)
+    return keep
 
 
 def reset_fcurve_interpolation(fcurve: bpy.types.FCurve, interpolation="LINEAR"):
     if interpolation != "BEZIER":
-        for keyframe in fcurve.keyframe_points:
-            keyframe.interpolation = interpolation
+        value = bpy.types.Keyframe.bl_rna.properties["interpolation"].enum_items[interpolation].value
+        values = np.full(len(fcurve.keyframe_points), value, dtype=np.int32)
+        fcurve.keyframe_points.foreach_set("interpolation", values)
     else:
         L = len(fcurve.keyframe_points)
         for i, keyframe in enumerate(fcurve.keyframe_points):
@@ -4876,98 +4910,46 @@ def blend_bone_curves(motion_channel, stored_channel,
         stored_loc_curves, stored_rot_curves, stored_sca_curves, stored_rot_type = stored_transform_set
         stored_curves = stored_sca_curves + stored_loc_curves + stored_rot_curves
 
-        frames = base_frames.copy()
+        # read the key-frames of the transform curves
+        motion_sampler = TransformSampler(motion_transform_set)
+        stored_sampler = TransformSampler(stored_transform_set) if (use_blend or overwrite) else None
 
-        # include all frames from the motion curve
-        fcurve: bpy.types.FCurve = None
-        for fcurve in motion_curves:
-            if fcurve:
-                num_points = len(fcurve.keyframe_points)
-                data = [0.0, 0.0] * num_points
-                fcurve.keyframe_points.foreach_get('co', data)
-                for i in range(0, len(data), 2):
-                    frame = data[i]
-                    frames.add(frame)
-
-        # include all frames from the source curve
-        if use_blend or overwrite:
-            for fcurve in stored_curves:
-                if fcurve:
-                    num_points = len(fcurve.keyframe_points)
-                    data = [0.0, 0.0] * num_points
-                    fcurve.keyframe_points.foreach_get('co', data)
-                    for i in range(0, len(data), 2):
-                        frame = data[i]
-                        frames.add(frame)
-
-        # sort the frames in order
+        # include all frames from the motion curves (and the source curves if blending)
+        if stored_sampler:
+            frames = sampled_frames(base_frames, motion_sampler.frames(), stored_sampler.frames())
+        else:
+            frames = sampled_frames(base_frames, motion_sampler.frames())
         num_frames = len(frames)
-        sorted_frames = list(frames)
-        sorted_frames.sort()
         utils.log_detail(f" - {num_frames} resampled frames")
 
-        # generate resampled data lists for the curves in the motion bone transform
-        resampled_data = []
-        for i in range(0, num_target_curves):
-            data = [0.0, 0.0] * num_frames
-            resampled_data.append(data)
-
-        # evaluate the motion root transform at each frame ...
-        for f, frame in enumerate(sorted_frames):
-            motion_loc, motion_rot, motion_sca = evaluate_action_bone_transform_set(motion_transform_set, frame)
-
-            # apply relative root:
-            if is_root and (relative_root or current_root):
-                MF = utils.make_transform_matrix(motion_loc, motion_rot, motion_sca)
-                MR: Matrix = MD @ MF
-                motion_loc = MR.to_translation()
-                motion_rot = MR.to_quaternion()
-                motion_sca = MR.to_scale()
-
-            # if blending, apply motion blend:
-            if use_blend or overwrite:
-                blend_strength = overall_strength if use_blend else 1.0
-                stored_loc, stored_rot, stored_sca = evaluate_action_bone_transform_set(stored_transform_set, frame)
-                if frame < from_frame or frame > to_frame:
-                    blend_strength = 0
-                elif blend_in_frames > 0 and frame < (from_frame + blend_in_frames):
-                    pos = (frame - from_frame + 1) / (blend_in_frames + 1)
-                    blend_strength *= ui.eval_curve(blend_in_data, pos)
-                elif blend_out_frames > 0 and frame > (to_frame - blend_out_frames):
-                    pos = (frame - to_frame + blend_out_frames) / (blend_out_frames + 1)
-                    blend_strength *= ui.eval_curve(blend_out_data, pos)
-                if use_mask_bones:
-                    if bone_name in blend_mask_bones:
-                        blend_strength *= blend_mask_bones[bone_name]
-                    else:
-                        blend_strength = 0.0
-
-                if blend_strength <= 0:
-                    blend_loc = stored_loc
-                    blend_rot = stored_rot
-                    blend_sca = stored_sca
-                elif blend_strength >= 1:
-                    blend_loc = motion_loc
-                    blend_rot = motion_rot
-                    blend_sca = motion_sca
-                else:
-                    blend_loc = stored_loc.lerp(motion_loc, blend_strength)
-                    blend_rot = stored_rot.slerp(motion_rot, blend_strength)
-                    blend_sca = stored_sca.lerp(motion_sca, blend_strength)
+        # evaluate the motion transform over all the frames ...
+        motion_loc, motion_rot, motion_sca = motion_sampler.sample(frames)
 
-            # if not blending or overwriting, use the motion transform directly
-            else:
-                blend_loc = motion_loc
-                blend_rot = motion_rot
-                blend_sca = motion_sca
+        # apply relative root:
+        if is_root and (relative_root or current_root):
+            MR = np.matmul(np.array(MD), compose_transform_matrices(motion_loc, motion_rot, motion_sca))
+            motion_loc, motion_rot, motion_sca = decompose_transform_matrices(MR)
 
-            transform_data = make_flat_transform(target_rot_type, loc=blend_loc, rot=blend_rot, sca=blend_sca)
+        # if blending, apply motion blend:
+        if use_blend or overwrite:
+            stored_loc, stored_rot, stored_sca = stored_sampler.sample(frames)
+            blend_strengths = get_blend_strengths(frames, from_frame, to_frame,
+                                                  use_blend, overall_strength,
+                                                  blend_in_frames, blend_out_frames,
+                                                  blend_in_data, blend_out_data)
+            if use_mask_bones:
+                blend_strengths *= blend_mask_bones.get(bone_name, 0.0)
+            blend_loc = blend_arrays(stored_loc, motion_loc, blend_strengths)
+            blend_rot = slerp_quaternions(stored_rot, motion_rot, blend_strengths)
+            blend_sca = blend_arrays(stored_sca, motion_sca, blend_strengths)
+
+        # if not blending or overwriting, use the motion transform directly
+        else:
+            blend_loc = motion_loc
+            blend_rot = motion_rot
+            blend_sca = motion_sca
 
-            # write frame to the resampled curve data:
-            index = f * 2
-            for i in range(0, num_target_curves):
-                resampled_data[i][index] = frame
-                resampled_data[i][index+1] = transform_data[i]
+        resampled_data = make_flat_transforms(target_rot_type, blend_loc, blend_rot, blend_sca)
 
         if overwrite:
             # write the resampled curve data back to the stored transform curves:
@@ -4985,10 +4967,7 @@ def blend_bone_curves(motion_channel, stored_channel,
                     if not fcurve:
                         fcurve = add_resampled_bone_curve(bone_name, i, target_rot_type, stored_channelbag)
                     if fcurve:
-                        fcurve.keyframe_points.clear()
-                        fcurve.keyframe_points.add(num_frames)
-                        fcurve.keyframe_points.foreach_set('co', resampled_data[i])
-                        reset_fcurve_interpolation(fcurve)
+                        write_resampled_curve(fcurve, frames, resampled_data[:, i])
         else:
             # write the resampled curve data back to the motion transform curves:
             for i in range(0, 10):
@@ -5004,10 +4983,42 @@ def blend_bone_curves(motion_channel, stored_channel,
                     if not fcurve:
                         fcurve = add_resampled_bone_curve(bone_name, i, target_rot_type, motion_channelbag)
                     if fcurve:
-                        fcurve.keyframe_points.clear()
-                        fcurve.keyframe_points.add(num_frames)
-                        fcurve.keyframe_points.foreach_set('co', resampled_data[i])
-                        reset_fcurve_interpolation(fcurve)
+                        write_resampled_curve(fcurve, frames, resampled_data[:, i])
+
+
+def blend_curve_values(motion_curve, stored_curve, base_frames,
+                       from_frame, to_frame,
+                       use_blend, overwrite, overall_strength,
+                       blend_in_frames, blend_out_frames,
+                       blend_in_data, blend_out_data,
+                       mask_strength=1.0):
+    """Resamples the motion curve (blended over the stored curve) on the union of their key-frames
+       and the base frames. Returns the frames and values arrays."""
+    motion_sampler = FCurveSampler(motion_curve)
+    stored_sampler = FCurveSampler(stored_curve) if (use_blend or overwrite) else None
+
+    # add frames from the motion curve (and the source curve if blending)
+    if stored_sampler:
+        frames = sampled_frames(base_frames, motion_sampler.frames(), stored_sampler.frames())
+    else:
+        frames = sampled_frames(base_frames, motion_sampler.frames())
+    utils.log_detail(f" - {len(frames)} resampled frames")
+
+    # evaluate the motion curve over all the frames ...
+    motion_values = motion_sampler.sample(frames)
+
+    # if blending, apply motion blend:
+    if use_blend or overwrite:
+        stored_values = stored_sampler.sample(frames)
+        blend_strengths = get_blend_strengths(frames, from_frame, to_frame,
+                                              use_blend, overall_strength,
+                                              blend_in_frames, blend_out_frames,
+                                              blend_in_data, blend_out_data)
+        blend_strengths *= mask_strength
+        return frames, blend_arrays(stored_values, motion_values, blend_strengths)
+
+    # otherwise use motion values directly
+    return frames, motion_values
 
 
 def blend_key_curves(motion_channel, stored_channel,
@@ -5052,76 +5063,16 @@ def blend_key_curves(motion_channel, stored_channel,
 
         utils.log_detail(f"Blending motion key: {key_name} {from_frame}-{to_frame}")
 
-        # go through motion bone transform fcurves and build a list of discrete frames
-        frames = base_frames.copy()
-        fcurve: bpy.types.FCurve = None
-
-        # add frames from the motion curve
-        if motion_key_curve:
-            num_points = len(motion_key_curve.keyframe_points)
-            data = [0.0, 0.0] * num_points
-            motion_key_curve.keyframe_points.foreach_get('co', data)
-            for i in range(0, len(data), 2):
-                frame = data[i]
-                frames.add(frame)
-
-        # also include frames from the source curve
-        if use_blend or overwrite:
-            if stored_key_curve:
-                num_points = len(stored_key_curve.keyframe_points)
-                data = [0.0, 0.0] * num_points
-                stored_key_curve.keyframe_points.foreach_get('co', data)
-                for i in range(0, len(data), 2):
-                    frame = data[i]
-                    frames.add(frame)
-
-        # sort the frames in order
-        num_frames = len(frames)
-        sorted_frames = list(frames)
-        sorted_frames.sort()
-        utils.log_detail(f" - {num_frames} resampled frames")
-
-        # generate resampled data lists for the motion curve
-        resampled_data = [0.0, 0.0] * num_frames
+        mask_strength = 1.0
+        if use_mask_keys:
+            mask_strength = blend_mask_keys.get(key_name, 0.0)
 
-        # evaluate the motion curve at each frame ...
-        for f, frame in enumerate(sorted_frames):
-            motion_value = evaluate_action_curve(motion_key_curve, frame)
-
-            # if blending, apply motion blend:
-            if use_blend or overwrite:
-                blend_strength = overall_strength if use_blend else 1.0
-                stored_value = evaluate_action_curve(stored_key_curve, frame)
-
-                if frame < from_frame or frame > to_frame:
-                    blend_strength = 0
-                elif blend_in_frames > 0 and frame < (from_frame + blend_in_frames):
-                    pos = (frame - from_frame + 1) / (blend_in_frames + 1)
-                    blend_strength *= ui.eval_curve(blend_in_data, pos)
-                elif blend_out_frames > 0 and frame > (to_frame - blend_out_frames):
-                    pos = (frame - to_frame + blend_out_frames) / (blend_out_frames + 1)
-                    blend_strength *= ui.eval_curve(blend_out_data, pos)
-                if use_mask_keys:
-                    if key_name in blend_mask_keys:
-                        blend_strength *= blend_mask_keys[key_name]
-                    else:
-                        blend_strength = 0.0
-
-                if blend_strength <= 0:
-                    blend_value = stored_value
-                elif blend_strength >= 1:
-                    blend_value = motion_value
-                else:
-                    blend_value = utils.lerp(stored_value, motion_value, blend_strength)
-
-            # otherwise use motion value directly
-            else:
-                blend_value = motion_value
-
-            # write frame to the resampled curve data:
-            index = f * 2
-            resampled_data[index] = frame
-            resampled_data[index+1] = blend_value
+        frames, resampled_values = blend_curve_values(motion_key_curve, stored_key_curve, base_frames,
+                                                      from_frame, to_frame,
+                                                      use_blend, overwrite, overall_strength,
+                                                      blend_in_frames, blend_out_frames,
+                                                      blend_in_data, blend_out_data,
+                                                      mask_strength)
 
         if overwrite:
             # write the resampled curve data back to the stored curve:
@@ -5130,10 +5081,7 @@ def blend_key_curves(motion_channel, stored_channel,
                 if stored_key_curve:
                     utils.log_detail(f"Added key fcurve {obj_name}/{key_name}")
             if stored_key_curve:
-                stored_key_curve.keyframe_points.clear()
-                stored_key_curve.keyframe_points.add(num_frames)
-                stored_key_curve.keyframe_points.foreach_set('co', resampled_data)
-                reset_fcurve_interpolation(stored_key_curve)
+                write_resampled_curve(stored_key_curve, frames, resampled_values)
         else:
             # write the resampled curve data back to the motion curve:
             if not motion_key_curve:
@@ -5141,10 +5089,7 @@ def blend_key_curves(motion_channel, stored_channel,
                 if motion_key_curve:
                     utils.log_detail(f"Added key fcurve {obj_name}/{key_name}")
             if motion_key_curve:
-                motion_key_curve.keyframe_points.clear()
-                motion_key_curve.keyframe_points.add(num_frames)
-                motion_key_curve.keyframe_points.foreach_set('co', resampled_data)
-                reset_fcurve_interpolation(motion_key_curve)
+                write_resampled_curve(motion_key_curve, frames, resampled_values)
 
 
 def blend_data_curves(motion_channel, stored_channel,
@@ -5199,76 +5144,11 @@ def blend_data_curves(motion_channel, stored_channel,
 
         utils.log_info(f"Blending motion data: {data_path} {from_frame}-{to_frame}")
 
-        # go through motion bone transform fcurves and build a list of discrete frames
-        frames = base_frames.copy()
-        fcurve: bpy.types.FCurve = None
-
-        # add frames from the motion curve
-        if motion_data_curve:
-            num_points = len(motion_data_curve.keyframe_points)
-            data = [0.0, 0.0] * num_points
-            motion_data_curve.keyframe_points.foreach_get('co', data)
-            for i in range(0, len(data), 2):
-                frame = data[i]
-                frames.add(frame)
-
-        # also include frames from the source curve
-        if use_blend or overwrite:
-            if stored_data_curve:
-                num_points = len(stored_data_curve.keyframe_points)
-                data = [0.0, 0.0] * num_points
-                stored_data_curve.keyframe_points.foreach_get('co', data)
-                for i in range(0, len(data), 2):
-                    frame = data[i]
-                    frames.add(frame)
-
-        # sort the frames in order
-        num_frames = len(frames)
-        sorted_frames = list(frames)
-        sorted_frames.sort()
-        utils.log_detail(f" - {num_frames} resampled frames")
-
-        # generate resampled data lists for the motion curve
-        resampled_data = [0.0, 0.0] * num_frames
-
-        # evaluate the motion curve at each frame ...
-        for f, frame in enumerate(sorted_frames):
-            motion_value = evaluate_action_curve(motion_data_curve, frame)
-
-            # if blending, apply motion blend:
-            if use_blend or overwrite:
-                blend_strength = overall_strength if use_blend else 1.0
-                stored_value = evaluate_action_curve(stored_data_curve, frame)
-
-                if frame < from_frame or frame > to_frame:
-                    blend_strength = 0
-                elif blend_in_frames > 0 and frame < (from_frame + blend_in_frames):
-                    pos = (frame - from_frame + 1) / (blend_in_frames + 1)
-                    blend_strength *= ui.eval_curve(blend_in_data, pos)
-                elif blend_out_frames > 0 and frame > (to_frame - blend_out_frames):
-                    pos = (frame - to_frame + blend_out_frames) / (blend_out_frames + 1)
-                    blend_strength *= ui.eval_curve(blend_out_data, pos)
-                #if use_mask_paths:
-                #    if data_path in blend_mask_paths:
-                #        blend_strength *= blend_mask_paths[data_path]
-                #    else:
-                #        blend_strength = 0.0
-
-                if blend_strength <= 0:
-                    blend_value = stored_value
-                elif blend_strength >= 1:
-                    blend_value = motion_value
-                else:
-                    blend_value = utils.lerp(stored_value, motion_value, blend_strength)
-
-            # otherwise use motion value directly
-            else:
-                blend_value = motion_value
-
-            # write frame to the resampled curve data:
-            index = f * 2
-            resampled_data[index] = frame
-            resampled_data[index+1] = blend_value
+        frames, resampled_values = blend_curve_values(motion_data_curve, stored_data_curve, base_frames,
+                                                      from_frame, to_frame,
+                                                      use_blend, overwrite, overall_strength,
+                                                      blend_in_frames, blend_out_frames,
+                                                      blend_in_data, blend_out_data)
 
         if overwrite:
             # write the resampled curve data back to the stored curve:
@@ -5277,10 +5157,7 @@ def blend_data_curves(motion_channel, stored_channel,
                 if stored_data_curve:
                     utils.log_detail(f"Added data fcurve {path_id}")
             if stored_data_curve:
-                stored_data_curve.keyframe_points.clear()
-                stored_data_curve.keyframe_points.add(num_frames)
-                stored_data_curve.keyframe_points.foreach_set('co', resampled_data)
-                reset_fcurve_interpolation(stored_data_curve)
+                write_resampled_curve(stored_data_curve, frames, resampled_values)
         else:
             # write the resampled curve data back to the motion curve:
             if not motion_data_curve:
@@ -5288,10 +5165,7 @@ def blend_data_curves(motion_channel, stored_channel,
                 if motion_data_curve:
                     utils.log_detail(f"Added data fcurve {path_id}")
             if motion_data_curve:
-                motion_data_curve.keyframe_points.clear()
-                motion_data_curve.keyframe_points.add(num_frames)
-                motion_data_curve.keyframe_points.foreach_set('co', resampled_data)
-                reset_fcurve_interpolation(motion_data_curve)
+                write_resampled_curve(motion_data_curve, frames, resampled_values)
 
 
 def get_relative_transformation(motion_loc: Vector, motion_rot: Quaternion,
@@ -5506,6 +5380,424 @@ def evaluate_action_curve(key_curve: tuple, frame: int):
     except:
         value = 0.0
     return value
+
+
+# Keyframe interpolation enum values (as read by keyframe_points.foreach_get('interpolation'))
+KEYFRAME_CONSTANT = 0
+KEYFRAME_LINEAR = 1
+KEYFRAME_BEZIER = 2
+
+
+class FCurveSampler:
+    """Reads the key-frames of an fcurve into arrays once,
+       to evaluate whole frame ranges with vectorized interpolation."""
+
+    def __init__(self, fcurve: bpy.types.FCurve, default=0.0):
+        self.fcurve = fcurve
+        self.default = default
+        self.num_keys = len(fcurve.keyframe_points) if fcurve else 0
+        if self.num_keys:
+            n = self.num_keys
+            self.co = np.empty(n * 2, dtype=np.float32)
+            self.handle_left = np.empty(n * 2, dtype=np.float32)
+            self.handle_right = np.empty(n * 2, dtype=np.float32)
+            self.interpolation = np.empty(n, dtype=np.int32)
+            fcurve.keyframe_points.foreach_get("co", self.co)
+            fcurve.keyframe_points.foreach_get("handle_left", self.handle_left)
+            fcurve.keyframe_points.foreach_get("handle_right", self.handle_right)
+            fcurve.keyframe_points.foreach_get("interpolation", self.interpolation)
+            self.co = self.co.astype(np.float64).reshape(-1, 2)
+            self.handle_left = self.handle_left.astype(np.float64).reshape(-1, 2)
+            self.handle_right = self.handle_right.astype(np.float64).reshape(-1, 2)
+            self.extrapolate_linear = fcurve.extrapolation == "LINEAR"
+            # modifiers (cycles, noise ...) can't be sampled from the key-frames alone
+            self.use_evaluate = len(fcurve.modifiers) > 0
+
+    def frames(self):
+        if self.num_keys:
+            return self.co[:, 0]
+        return np.empty(0, dtype=np.float64)
+
+    def evaluate(self, frames):
+        return np.array([ eval_curve(self.fcurve, frame, self.default) for frame in frames ], dtype=np.float64)
+
+    def sample(self, frames):
+        frames = np.asarray(frames, dtype=np.float64)
+        if not self.num_keys:
+            return np.full(len(frames), self.default, dtype=np.float64)
+        if self.use_evaluate:
+            return self.evaluate(frames)
+
+        n = self.num_keys
+        kx = self.co[:, 0]
+        ky = self.co[:, 1]
+        values = np.empty(len(frames), dtype=np.float64)
+        index = np.searchsorted(kx, frames, side="right") - 1
+
+        before = index < 0
+        after = index >= n - 1
+        values[before] = self.extrapolate(frames[before], 0)
+        values[after] = self.extrapolate(frames[after], n - 1)
+
+        inside = np.flatnonzero(~before & ~after)
+        seg = index[inside]
+        f = frames[inside]
+        x0 = kx[seg]
+        x1 = kx[seg + 1]
+        y0 = ky[seg]
+        y1 = ky[seg + 1]
+        interpolation = self.interpolation[seg]
+        result = np.empty(len(inside), dtype=np.float64)
+
+        constant = interpolation == KEYFRAME_CONSTANT
+        result[constant] = y0[constant]
+
+        linear = interpolation == KEYFRAME_LINEAR
+        span = x1[linear] - x0[linear]
+        t = np.divide(f[linear] - x0[linear], span, out=np.zeros(len(span)), where=span != 0)
+        result[linear] = y0[linear] + t * (y1[linear] - y0[linear])
+
+        bezier = np.flatnonzero(interpolation == KEYFRAME_BEZIER)
+        if len(bezier):
+            result[bezier] = self.sample_bezier(seg[bezier], f[bezier])
+
+        # easing interpolation types
+        other = np.flatnonzero(interpolation > KEYFRAME_BEZIER)
+        if len(other):
+            result[other] = self.evaluate(f[other])
+
+        # exactly on a key-frame
+        on_key = np.abs(f - x0) < 0.0001
+        result[on_key] = y0[on_key]
+        values[inside] = result
+        return values
+
+    def extrapolate(self, frames, key):
+        ky = self.co[key, 1]
+        if not self.extrapolate_linear or self.num_keys < 2 or len(frames) == 0:
+            return np.full(len(frames), ky, dtype=np.float64)
+        interpolation = self.interpolation[key]
+        if interpolation == KEYFRAME_CONSTANT:
+            return np.full(len(frames), ky, dtype=np.float64)
+        kx = self.co[key, 0]
+        if interpolation == KEYFRAME_LINEAR:
+            other = self.co[1] if key == 0 else self.co[key - 1]
+            dx = other[0] - kx
+            dy = other[1] - ky
+        else:
+            handle = self.handle_left[key] if key == 0 else self.handle_right[key]
+            dx = handle[0] - kx
+            dy = handle[1] - ky
+        slope = dy / dx if dx != 0 else 0.0
+        return ky + (frames - kx) * slope
+
+    def sample_bezier(self, seg, frames):
+        p0 = self.co[seg]
+        p1 = self.handle_right[seg].copy()
+        p2 = self.handle_left[seg + 1].copy()
+        p3 = self.co[seg + 1]
+        # correct the handles so the curve can't loop back on itself in time
+        length = p3[:, 0] - p0[:, 0]
+        h1 = p0 - p1
+        h2 = p3 - p2
+        len1 = np.abs(h1[:, 0])
+        len2 = np.abs(h2[:, 0])
+        total = len1 + len2
+        over = total > length
+        if np.any(over):
+            fac = (length[over] / total[over])[:, np.newaxis]
+            p1[over] = p0[over] - fac * h1[over]
+            p2[over] = p3[over] - fac * h2[over]
+        # find the curve parameter for each frame by bisection (x is monotonic after correction)
+        lo = np.zeros(len(frames), dtype=np.float64)
+        hi = np.ones(len(frames), dtype=np.float64)
+        for i in range(24):
+            t = (lo + hi) * 0.5
+            x = bezier_component(p0[:, 0], p1[:, 0], p2[:, 0], p3[:, 0], t)
+            below = x < frames
+            lo = np.where(below, t, lo)
+            hi = np.where(below, hi, t)
+        t = (lo + hi) * 0.5
+        return bezier_component(p0[:, 1], p1[:, 1], p2[:, 1], p3[:, 1], t)
+
+
+def bezier_component(a, b, c, d, t):
+    s = 1.0 - t
+    return s * s * s * a + 3.0 * s * s * t * b + 3.0 * s * t * t * c + t * t * t * d
+
+
+class TransformSampler:
+    """Samplers for the location, rotation and scale fcurves of a bone transform set."""
+
+    def __init__(self, transform_set: tuple):
+        loc_curves, rot_curves, sca_curves, rot_type = transform_set
+        self.rot_type = rot_type
+        self.loc = [ FCurveSampler(fcurve) for fcurve in loc_curves ]
+        self.rot = [ FCurveSampler(fcurve) for fcurve in rot_curves ]
+        self.sca = [ FCurveSampler(fcurve, default=1.0) for fcurve in sca_curves ]
+
+    def frames(self):
+        samplers = self.loc + self.rot + self.sca
+        return np.concatenate([ sampler.frames() for sampler in samplers ])
+
+    def sample(self, frames):
+        """Returns location (N,3), rotation quaternions (N,4) and scale (N,3) arrays for the frames."""
+        loc = np.stack([ sampler.sample(frames) for sampler in self.loc ], axis=1)
+        sca = np.stack([ sampler.sample(frames) for sampler in self.sca ], axis=1)
+        if self.rot_type == RotationType.QUATERNION:
+            rot = np.stack([ sampler.sample(frames) for sampler in self.rot ], axis=1)
+        elif self.rot_type == RotationType.EULER:
+            euler = np.stack([ sampler.sample(frames) for sampler in self.rot[:3] ], axis=1)
+            rot = euler_to_quaternions(euler)
+        elif self.rot_type == RotationType.AXIS_ANGLE:
+            angle = self.rot[0].sample(frames)
+            axis = np.stack([ sampler.sample(frames) for sampler in self.rot[1:] ], axis=1)
+            rot = axis_angle_to_quaternions(axis, angle)
+        else:
+            rot = np.zeros((len(frames), 4), dtype=np.float64)
+            rot[:, 0] = 1.0
+        return loc, rot, sca
+
+
+def sampled_frames(base_frames, *frame_arrays):
+    """Sorted unique union of the base frames and the key-frame frames."""
+    frames = [ np.fromiter(base_frames, dtype=np.float64, count=len(base_frames)) ]
+    frames.extend(frame_arrays)
+    return np.unique(np.concatenate(frames))
+
+
+def get_blend_strengths(frames, from_frame, to_frame,
+                        use_blend, overall_strength,
+                        blend_in_frames, blend_out_frames,
+                        blend_in_data, blend_out_data):
+    """Per frame blend strength of the motion over the stored motion."""
+    strengths = np.full(len(frames), overall_strength if use_blend else 1.0, dtype=np.float64)
+    outside = (frames < from_frame) | (frames > to_frame)
+    blend_in = ~outside & (frames < (from_frame + blend_in_frames)) if blend_in_frames > 0 else np.zeros(len(frames), dtype=bool)
+    blend_out = ~outside & ~blend_in & (frames > (to_frame - blend_out_frames)) if blend_out_frames > 0 else np.zeros(len(frames), dtype=bool)
+    for i in np.flatnonzero(blend_in):
+        pos = (frames[i] - from_frame + 1) / (blend_in_frames + 1)
+        strengths[i] *= ui.eval_curve(blend_in_data, pos)
+    for i in np.flatnonzero(blend_out):
+        pos = (frames[i] - to_frame + blend_out_frames) / (blend_out_frames + 1)
+        strengths[i] *= ui.eval_curve(blend_out_data, pos)
+    strengths[outside] = 0.0
+    return strengths
+
+
+def blend_arrays(stored, motion, strengths):
+    s = strengths.reshape(-1, *([1] * (stored.ndim - 1)))
+    result = stored + (motion - stored) * s
+    result = np.where(s <= 0, stored, result)
+    return np.where(s >= 1, motion, result)
+
+
+def normalize_quaternions(quats):
+    length = np.linalg.norm(quats, axis=1, keepdims=True)
+    identity = np.array([1.0, 0.0, 0.0, 0.0])
+    return np.where(length > 0, quats / np.where(length > 0, length, 1.0), identity)
+
+
+def slerp_quaternions(q0, q1, strengths):
+    """Batched spherical interpolation (as Quaternion.slerp) from q0 to q1 by strengths.
+       At zero (or full) strength q0 (or q1) is returned unchanged."""
+    q0_in = q0
+    q1_in = q1
+    q0 = normalize_quaternions(q0)
+    q1 = normalize_quaternions(q1)
+    cosom = np.sum(q0 * q1, axis=1)
+    # take the shortest path (for the interpolated result only)
+    q0 = np.where((cosom < 0)[:, np.newaxis], -q0, q0)
+    cosom = np.abs(cosom)
+    t = np.clip(strengths, 0.0, 1.0)
+    omega = np.arccos(np.clip(cosom, -1.0, 1.0))
+    sinom = np.sin(omega)
+    use_linear = (1.0 - cosom) <= 0.0001
+    safe_sinom = np.where(use_linear, 1.0, sinom)
+    sc1 = np.where(use_linear, 1.0 - t, np.sin((1.0 - t) * omega) / safe_sinom)
+    sc2 = np.where(use_linear, t, np.sin(t * omega) / safe_sinom)
+    result = sc1[:, np.newaxis] * q0 + sc2[:, np.newaxis] * q1
+    result = np.where((strengths <= 0)[:, np.newaxis], q0_in, result)
+    return np.where((strengths >= 1)[:, np.newaxis], q1_in, result)
+
+
+def euler_to_quaternions(euler):
+    """XYZ euler rotations (N,3) to quaternions (N,4)."""
+    half = euler * 0.5
+    ci, cj, ch = np.cos(half[:, 0]), np.cos(half[:, 1]), np.cos(half[:, 2])
+    si, sj, sh = np.sin(half[:, 0]), np.sin(half[:, 1]), np.sin(half[:, 2])
+    cc = ci * ch
+    cs = ci * sh
+    sc = si * ch
+    ss = si * sh
+    return np.stack([cj * cc + sj * ss,
+                     cj * sc - sj * cs,
+                     cj * ss + sj * cc,
+                     cj * cs - sj * sc], axis=1)
+
+
+def axis_angle_to_quaternions(axis, angle):
+    length = np.linalg.norm(axis, axis=1)
+    valid = length > 0
+    axis = axis / np.where(valid, length, 1.0)[:, np.newaxis]
+    half = angle * 0.5
+    quats = np.concatenate([np.cos(half)[:, np.newaxis], axis * np.sin(half)[:, np.newaxis]], axis=1)
+    quats[~valid] = (1.0, 0.0, 0.0, 0.0)
+    return quats
+
+
+def quaternions_to_matrices(quats):
+    """Unit quaternions (N,4) to (row major) rotation matrices (N,3,3)."""
+    w, x, y, z = quats[:, 0], quats[:, 1], quats[:, 2], quats[:, 3]
+    M = np.empty((len(quats), 3, 3), dtype=np.float64)
+    M[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    M[:, 0, 1] = 2 * (x * y - w * z)
+    M[:, 0, 2] = 2 * (x * z + w * y)
+    M[:, 1, 0] = 2 * (x * y + w * z)
+    M[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    M[:, 1, 2] = 2 * (y * z - w * x)
+    M[:, 2, 0] = 2 * (x * z - w * y)
+    M[:, 2, 1] = 2 * (y * z + w * x)
+    M[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    return M
+
+
+def matrices_to_quaternions(M):
+    """Orthonormal rotation matrices (N,3,3) to quaternions (N,4) with w >= 0."""
+    m00, m01, m02 = M[:, 0, 0], M[:, 0, 1], M[:, 0, 2]
+    m10, m11, m12 = M[:, 1, 0], M[:, 1, 1], M[:, 1, 2]
+    m20, m21, m22 = M[:, 2, 0], M[:, 2, 1], M[:, 2, 2]
+    trace = m00 + m11 + m22
+    quats = np.empty((len(M), 4), dtype=np.float64)
+    c0 = trace > 0
+    c1 = ~c0 & (m00 > m11) & (m00 > m22)
+    c2 = ~c0 & ~c1 & (m11 > m22)
+    c3 = ~c0 & ~c1 & ~c2
+    s = np.sqrt(np.maximum(trace[c0] + 1.0, 0)) * 2
+    quats[c0] = np.stack([0.25 * s, (m21[c0] - m12[c0]) / s, (m02[c0] - m20[c0]) / s, (m10[c0] - m01[c0]) / s], axis=1)
+    s = np.sqrt(np.maximum(1.0 + m00[c1] - m11[c1] - m22[c1], 0)) * 2
+    quats[c1] = np.stack([(m21[c1] - m12[c1]) / s, 0.25 * s, (m01[c1] + m10[c1]) / s, (m02[c1] + m20[c1]) / s], axis=1)
+    s = np.sqrt(np.maximum(1.0 + m11[c2] - m00[c2] - m22[c2], 0)) * 2
+    quats[c2] = np.stack([(m02[c2] - m20[c2]) / s, (m01[c2] + m10[c2]) / s, 0.25 * s, (m12[c2] + m21[c2]) / s], axis=1)
+    s = np.sqrt(np.maximum(1.0 + m22[c3] - m00[c3] - m11[c3], 0)) * 2
+    quats[c3] = np.stack([(m10[c3] - m01[c3]) / s, (m02[c3] + m20[c3]) / s, (m12[c3] + m21[c3]) / s, 0.25 * s], axis=1)
+    quats = normalize_quaternions(quats)
+    return np.where((quats[:, 0] < 0)[:, np.newaxis], -quats, quats)
+
+
+def quaternions_to_eulers(quats):
+    """Quaternions (N,4) to XYZ eulers (N,3), choosing the smallest of the two solutions (as Quaternion.to_euler)."""
+    M = quaternions_to_matrices(normalize_quaternions(quats))
+    cy = np.hypot(M[:, 0, 0], M[:, 1, 0])
+    eul1 = np.stack([np.arctan2(M[:, 2, 1], M[:, 2, 2]),
+                     np.arctan2(-M[:, 2, 0], cy),
+                     np.arctan2(M[:, 1, 0], M[:, 0, 0])], axis=1)
+    eul2 = np.stack([np.arctan2(-M[:, 2, 1], -M[:, 2, 2]),
+                     np.arctan2(-M[:, 2, 0], -cy),
+                     np.arctan2(-M[:, 1, 0], -M[:, 0, 0])], axis=1)
+    gimbal = cy <= 16 * np.finfo(np.float32).eps
+    eul1[gimbal] = np.stack([np.arctan2(-M[gimbal, 1, 2], M[gimbal, 1, 1]),
+                             np.arctan2(-M[gimbal, 2, 0], cy[gimbal]),
+                             np.zeros(np.count_nonzero(gimbal))], axis=1)
+    eul2[gimbal] = eul1[gimbal]
+    use_eul2 = np.sum(np.abs(eul2), axis=1) < np.sum(np.abs(eul1), axis=1)
+    return np.where(use_eul2[:, np.newaxis], eul2, eul1)
+
+
+def quaternions_to_axis_angles(quats):
+    """Quaternions (N,4) to (angle, axis x, axis y, axis z) (N,4) (as Quaternion.to_axis_angle)."""
+    quats = normalize_quaternions(quats)
+    half = np.arccos(np.clip(quats[:, 0], -1.0, 1.0))
+    si = np.sin(half)
+    si = np.where(np.abs(si) < 0.0005, 1.0, si)
+    axis = quats[:, 1:] / si[:, np.newaxis]
+    zero = ~np.any(axis, axis=1)
+    axis[zero, 1] = 1.0
+    return np.concatenate([(half * 2)[:, np.newaxis], axis], axis=1)
+
+
+def compose_transform_matrices(loc, rot, sca):
+    """Batched utils.make_transform_matrix: (N,4,4) matrices from location, quaternion and scale arrays."""
+    M = np.zeros((len(loc), 4, 4), dtype=np.float64)
+    M[:, :3, :3] = quaternions_to_matrices(normalize_quaternions(rot)) * sca[:, np.newaxis, :]
+    M[:, :3, 3] = loc
+    M[:, 3, 3] = 1.0
+    return M
+
+
+def decompose_transform_matrices(M):
+    """Location, rotation quaternion and scale arrays of (N,4,4) matrices."""
+    loc = M[:, :3, 3].copy()
+    sca = np.linalg.norm(M[:, :3, :3], axis=1)
+    R = M[:, :3, :3] / np.where(sca > 0, sca, 1.0)[:, np.newaxis, :]
+    rot = matrices_to_quaternions(R)
+    return loc, rot, sca
+
+
+def make_flat_transforms(rot_type: RotationType, loc, rot, sca):
+    """Batched make_flat_transform: (N, 9 or 10) array of the scale, location and rotation curve values."""
+    if rot_type == RotationType.EULER:
+        flat_rot = quaternions_to_eulers(rot)
+    elif rot_type == RotationType.AXIS_ANGLE:
+        flat_rot = quaternions_to_axis_angles(rot)
+    else:
+        flat_rot = rot
+    return np.concatenate([sca, loc, flat_rot], axis=1)
+
+
+def write_resampled_curve(fcurve: bpy.types.FCurve, frames, values):
+    data = np.empty((len(frames), 2), dtype=np.float32)
+    data[:, 0] = frames
+    data[:, 1] = values
+    fcurve.keyframe_points.clear()
+    fcurve.keyframe_points.add(len(frames))
+    fcurve.keyframe_points.foreach_set('co', data.ravel())
+    reset_fcurve_interpolation(fcurve)
+
+
+def benchmark_fcurve_sampling(num_bones=150, num_frames=1000):
+    """Compares the per frame fcurve.evaluate() bone transform sampling with the
+       vectorized sampling of (num_bones) bones over (num_frames) of baked key-frames."""
+    utils.log_always("")
+    utils.log_always("BENCHMARK: FCurve Sampling")
+    utils.log_always("==========================")
+
+    rng = np.random.default_rng(0)
+    action = bpy.data.actions.new("CC3_Benchmark_Sampling")
+    channelbag = utils.get_action_channelbag(action, slot_type="OBJECT")
+    keyframes = np.empty((num_frames, 2), dtype=np.float32)
+    keyframes[:, 0] = np.arange(1, num_frames + 1)
+    for b in range(num_bones):
+        bone_path = f"pose.bones[\"Bone_{b}\"]"
+        for prop, count in [("location", 3), ("rotation_quaternion", 4), ("scale", 3)]:
+            for index in range(count):
+                fcurve = channelbag.fcurves.new(f"{bone_path}.{prop}", index=index)
+                keyframes[:, 1] = np.cumsum(rng.standard_normal(num_frames)) * 0.01
+                fcurve.keyframe_points.add(num_frames)
+                fcurve.keyframe_points.foreach_set('co', keyframes.ravel())
+                fcurve.update()
+    bone_dict = get_bone_transform_dict(None, channelbag)
+    # sample between the key-frames to exercise the interpolation
+    frames = np.arange(1, num_frames + 1) + 0.5
+
+    t = time.perf_counter()
+    for bone_name in bone_dict:
+        transform_set, has_curves = fetch_action_bone_transform_set_dict(bone_dict, bone_name)
+        for frame in frames:
+            loc, rot, sca = evaluate_action_bone_transform_set(transform_set, frame)
+            make_flat_transform(RotationType.QUATERNION, loc=loc, rot=rot, sca=sca)
+    per_frame_time = time.perf_counter() - t
+
+    t = time.perf_counter()
+    for bone_name in bone_dict:
+        transform_set, has_curves = fetch_action_bone_transform_set_dict(bone_dict, bone_name)
+        loc, rot, sca = TransformSampler(transform_set).sample(frames)
+        make_flat_transforms(RotationType.QUATERNION, loc, rot, sca)
+    vectorized_time = time.perf_counter() - t
+
+    bpy.data.actions.remove(action)
+    utils.log_always(f"per frame evaluate: {per_frame_time * 1000:.1f} ms")
+    utils.log_always(f"vectorized: {vectorized_time * 1000:.1f} ms ({per_frame_time / max(vectorized_time, 1e-9):.1f}x)")
 #endregion
 
 
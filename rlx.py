@@ -14,7 +14,8 @@
 # You should have received a copy of the GNU General Public License
 # along with CC/iC Blender Tools.  If not, see <https://www.gnu.org/licenses/>.
 
-import bpy, struct, json, os
+import bpy, struct, json, os, mmap
+import numpy as np
 from mathutils import Vector, Matrix, Color, Quaternion
 from enum import IntEnum
 from . import vars, utils, rigutils, nodeutils, imageutils
@@ -28,25 +29,77 @@ TUBE_AS_AREA = True
 ENERGY_SCALE = 35 * 0.7
 SUN_SCALE = 2 * 0.7
 
+# per frame record layouts of the RLX light and camera frame blocks
+RLX_LIGHT_FRAME = np.dtype([
+    ("time", ">u4"), ("frame", ">u4"), ("active", "?"),
+    ("loc", ">f4", 3), ("rot", ">f4", 4), ("sca", ">f4", 3), ("color", ">f4", 3),
+    ("multiplier", ">f4"), ("range", ">f4"), ("angle", ">f4"),
+    ("falloff", ">f4"), ("attenuation", ">f4"), ("darkness", ">f4"),
+])
+
+RLX_CAMERA_FRAME = np.dtype([
+    ("time", ">u4"), ("frame", ">u4"),
+    ("loc", ">f4", 3), ("rot", ">f4", 4), ("sca", ">f4", 3),
+    ("focal_length", ">f4"), ("dof_enable", "?"),
+    ("dof_focus", ">f4"), ("dof_range", ">f4"), ("dof_far_blur", ">f4"), ("dof_near_blur", ">f4"),
+    ("dof_far_transition", ">f4"), ("dof_near_transition", ">f4"), ("dof_min_blend_distance", ">f4"),
+    ("fov", ">f4"), ("active", "?"),
+])
+
+
 class BinaryData():
-    data: bytearray = None
+    """Sequential reader over a memoryview of the data.
+       Files are memory mapped and sub-blocks are views, nothing is copied until decoded."""
+    data: memoryview = None
     offset: int = 0
+    file = None
+    map: mmap.mmap = None
 
-    def __init__(self, data: bytearray = None, start_offset = 0,
+    def __init__(self, data = None, start_offset = 0,
                        file_path: str = None, file = None):
-        if data:
-            self.data = data
+        if data is not None:
+            self.data = memoryview(data)
         elif file_path:
-            with open(file_path, 'rb') as read_file:
-                self.data = bytearray(read_file.read())
+            self.file = open(file_path, 'rb')
+            self.map_file(self.file)
         elif file:
-            self.data = bytearray(file.read())
+            self.map_file(file)
         self.offset = start_offset
 
+    def map_file(self, file):
+        try:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.data = memoryview(self.map)
+        except (ValueError, OSError):
+            # empty or unmappable files
+            self.data = memoryview(file.read())
+
+    def close(self):
+        data = self.data
+        self.data = None
+        try:
+            if data is not None:
+                data.release()
+            if self.map:
+                self.map.close()
+        except BufferError:
+            # views into the map are still alive, the map closes when they are released
+            pass
+        self.map = None
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def json(self):
         size = self.int()
         data = self.bytes(size)
-        text = data.decode("utf-8")
+        text = str(data, "utf-8")
         obj = json.loads(text)
         return obj
 
@@ -68,7 +121,7 @@ class BinaryData():
     def string(self):
         length = self.int()
         data = self.bytes(length)
-        value = data.decode(encoding="utf-8")
+        value = str(data, "utf-8")
         return value
 
     def time(self):
@@ -76,26 +129,19 @@ class BinaryData():
         return float(time_code) / 6000.0
 
     def vector(self):
-        x = self.float()
-        y = self.float()
-        z = self.float()
-        value = Vector((x, y, z))
-        return value
+        x, y, z = struct.unpack_from("!fff", self.data, self.offset)
+        self.offset += 12
+        return Vector((x, y, z))
 
     def quaternion(self):
-        x = self.float()
-        y = self.float()
-        z = self.float()
-        w = self.float()
-        value = Quaternion((w, x, y, z))
-        return value
+        x, y, z, w = struct.unpack_from("!ffff", self.data, self.offset)
+        self.offset += 16
+        return Quaternion((w, x, y, z))
 
     def color(self):
-        r = self.float()
-        g = self.float()
-        b = self.float()
-        value = Color((r, g, b))
-        return value
+        r, g, b = struct.unpack_from("!fff", self.data, self.offset)
+        self.offset += 12
+        return Color((r, g, b))
 
     def bytes(self, size):
         sub_data = self.data[self.offset:self.offset+size]
@@ -107,19 +153,32 @@ class BinaryData():
         data = self.bytes(size)
         return BinaryData(data=data)
 
+    def array(self, dtype, count):
+        """Reads count values of dtype (e.g. '>f4') as a read-only numpy view."""
+        dtype = np.dtype(dtype)
+        values = np.frombuffer(self.data, dtype=dtype, count=count, offset=self.offset)
+        self.offset += dtype.itemsize * count
+        return values
+
+    def records(self, dtype):
+        """Reads all remaining data as fixed size records of a structured dtype."""
+        dtype = np.dtype(dtype)
+        count = (len(self.data) - self.offset) // dtype.itemsize
+        return self.array(dtype, count)
+
     def eof(self):
         return self.offset >= len(self.data)
 
 
 def import_rlx(file_path, start_frame=1):
     data_folder, data_file = os.path.split(file_path)
-    data = BinaryData(file_path=file_path)
-    rlx_code = data.int()
-    utils.log_info(f"RLX Code: {rlx_code}")
-    if rlx_code == RLXCodes.RLX_ID_LIGHT:
-        return import_rlx_light(data, data_folder, start_frame)
-    elif rlx_code == RLXCodes.RLX_ID_CAMERA:
-        return import_rlx_camera(data, data_folder, start_frame)
+    with BinaryData(file_path=file_path) as data:
+        rlx_code = data.int()
+        utils.log_info(f"RLX Code: {rlx_code}")
+        if rlx_code == RLXCodes.RLX_ID_LIGHT:
+            return import_rlx_light(data, data_folder, start_frame)
+        elif rlx_code == RLXCodes.RLX_ID_CAMERA:
+            return import_rlx_camera(data, data_folder, start_frame)
     return None
 
 
@@ -267,48 +326,47 @@ def import_rlx_light(data: BinaryData, data_folder, start_frame=1):
     visible_cache = frame_cache(num_frames)
     render_cache = frame_cache(num_frames)
 
-    first_frame = None
-    while not frames.eof():
-        time = frames.time()
-        rlx_frame = frames.int() + 1
-        if first_frame is None:
-            first_frame = rlx_frame
-        frame = rlx_frame - first_frame + start_frame
-        active = frames.bool()
-        loc = frames.vector() / 100
-        rot = frames.quaternion()
-        sca = frames.vector()
-        color = frames.color()
-        multiplier = frames.float()
-        range = frames.float() / 100
-        angle = frames.float() * 0.01745329
-        falloff = frames.float() / 100
-        attenuation = frames.float() / 100
-        darkness = frames.float()
+    # decode all the frames at once
+    records = frames.records(RLX_LIGHT_FRAME)
+    if len(records):
+        rlx_frames = records["frame"].astype(np.int64) + 1
+        frame = rlx_frames - rlx_frames[0] + start_frame
+        active = records["active"]
+        loc = records["loc"] / 100
+        rot = rotation_frame_values(light, records["rot"])
+        sca = records["sca"]
+        color = records["color"]
+        multiplier = records["multiplier"].astype(np.float64)
+        range = records["range"] / 100
+        angle = records["angle"] * 0.01745329
+        falloff = records["falloff"] / 100
+        attenuation = records["attenuation"] / 100
         cutoff_distance = range
-        store_frame(light, loc_cache, frame, start_frame, loc)
-        store_frame(light, rot_cache, frame, start_frame, rot)
-        store_frame(light, sca_cache, frame, start_frame, sca)
-        store_frame(light, color_cache, frame, start_frame, color)
-        store_frame(light, cutoff_distance_cache, frame, start_frame, cutoff_distance)
+        store_frames(loc_cache, frame, start_frame, loc)
+        store_frames(rot_cache, frame, start_frame, rot)
+        store_frames(sca_cache, frame, start_frame, sca)
+        store_frames(color_cache, frame, start_frame, color)
+        store_frames(cutoff_distance_cache, frame, start_frame, cutoff_distance)
         if light_type == "SUN":
             energy = SUN_SCALE * multiplier
-            store_frame(light, energy_cache, frame, start_frame, energy)
+            store_frames(energy_cache, frame, start_frame, energy)
         elif light_type == "SPOT":
             energy = ENERGY_SCALE * multiplier
             spot_blend = (falloff + attenuation) / 2
             spot_size = angle
-            store_frame(light, energy_cache, frame, start_frame, energy)
-            store_frame(light, spot_blend_cache, frame, start_frame, spot_blend)
-            store_frame(light, spot_size_cache, frame, start_frame, spot_size)
+            store_frames(energy_cache, frame, start_frame, energy)
+            store_frames(spot_blend_cache, frame, start_frame, spot_blend)
+            store_frames(spot_size_cache, frame, start_frame, spot_size)
         elif light_type == "AREA":
             energy = ENERGY_SCALE * multiplier
-            store_frame(light, energy_cache, frame, start_frame, energy)
+            store_frames(energy_cache, frame, start_frame, energy)
         elif light_type == "POINT":
             energy = ENERGY_SCALE * multiplier
-            store_frame(light, energy_cache, frame, start_frame, energy)
-        store_frame(light, visible_cache, frame, start_frame, 0.0 if active else 1.0)
-        store_frame(light, render_cache, frame, start_frame, 0.0 if active else 1.0)
+            store_frames(energy_cache, frame, start_frame, energy)
+        hidden = np.where(active, 0.0, 1.0)
+        store_frames(visible_cache, frame, start_frame, hidden)
+        store_frames(render_cache, frame, start_frame, hidden)
+    del records
 
     actor = RLXActor(light)
     rlx_cache = actor.get_rlx_cache(create=True)
@@ -358,38 +416,36 @@ def import_rlx_camera(data: BinaryData, data_folder, start_frame=1):
     f_stop_cache = frame_cache(num_frames)
     active_cache = []
 
-    first_frame = None
-    while not frames.eof():
-        time = frames.time()
-        rlx_frame = frames.int() + 1
-        if first_frame is None:
-            first_frame = rlx_frame
-        frame = rlx_frame - first_frame + start_frame
-        loc = frames.vector() / 100
-        rot = frames.quaternion()
-        sca = frames.vector()
-        focal_length = frames.float() # mm
-        dof_enable = frames.bool()
-        dof_focus = frames.float() / 100
-        dof_range = frames.float() / 100
-        dof_far_blur = frames.float()
-        dof_near_blur = frames.float()
-        dof_far_transition = frames.float() / 100
-        dof_near_transition = frames.float() / 100
-        dof_min_blend_distance = frames.float()
-        fov = frames.float()
-        active = frames.bool()
-        store_frame(camera, loc_cache, frame, start_frame, loc)
-        store_frame(camera, rot_cache, frame, start_frame, rot)
-        store_frame(camera, sca_cache, frame, start_frame, sca)
-        store_frame(camera, lens_cache, frame, start_frame, focal_length)
-        store_frame(camera, dof_cache, frame, start_frame, 1.0 if dof_enable else 0.0)
-        store_frame(camera, focus_distance_cache, frame, start_frame, dof_focus)
+    # decode all the frames at once
+    records = frames.records(RLX_CAMERA_FRAME)
+    if len(records):
+        rlx_frames = records["frame"].astype(np.int64) + 1
+        frame = rlx_frames - rlx_frames[0] + start_frame
+        time = records["time"] / 6000.0
+        loc = records["loc"] / 100
+        rot = rotation_frame_values(camera, records["rot"])
+        sca = records["sca"]
+        focal_length = records["focal_length"] # mm
+        dof_enable = records["dof_enable"]
+        dof_focus = records["dof_focus"] / 100
+        dof_range = records["dof_range"] / 100
+        dof_far_blur = records["dof_far_blur"].astype(np.float64)
+        dof_near_blur = records["dof_near_blur"].astype(np.float64)
+        dof_far_transition = records["dof_far_transition"] / 100
+        dof_near_transition = records["dof_near_transition"] / 100
+        active = records["active"]
+        store_frames(loc_cache, frame, start_frame, loc)
+        store_frames(rot_cache, frame, start_frame, rot)
+        store_frames(sca_cache, frame, start_frame, sca)
+        store_frames(lens_cache, frame, start_frame, focal_length)
+        store_frames(dof_cache, frame, start_frame, np.where(dof_enable, 1.0, 0.0))
+        store_frames(focus_distance_cache, frame, start_frame, dof_focus)
         blur = (dof_far_blur + dof_near_blur) / 2
         transition = (1 / blur) * (dof_range + dof_far_transition + dof_near_transition) / 16
         f_stop = transition
-        store_frame(camera, f_stop_cache, frame, start_frame, f_stop)
-        active_cache.append((frame, time, active))
+        store_frames(f_stop_cache, frame, start_frame, f_stop)
+        active_cache = list(zip(frame.tolist(), time.tolist(), active.tolist()))
+    del records
 
     actor = RLXActor(camera)
     rlx_cache = actor.get_rlx_cache(create=True)
@@ -417,63 +473,41 @@ def frame_rotation_cache(obj, frames):
     else: # transform_object.rotation_mode in [ "XYZ", "XZY", "YXZ", "YZX", "ZXY", "ZYX" ]:
         indices = 3
         defaults = [0,0,0]
-    cache = []
-    for i in range(0, indices):
-        data = [0, defaults[i]] * frames
-        for j in range(0, frames):
-            data[j * 2] = j
-        cache.append(data)
+    cache = frame_cache(frames, indices)
+    cache[:, :, 1] = np.array(defaults, dtype=np.float32)[:, np.newaxis]
     return cache
 
 
 def frame_cache(frames, indices=1, default_value=0.0):
-    cache = []
-    for i in range(0, indices):
-        data = [0, default_value] * frames
-        for j in range(0, frames):
-            data[j * 2] = j
-        cache.append(data)
+    """Returns a float32 cache of (frame, value) pairs with shape (indices, frames, 2)"""
+    cache = np.empty((indices, frames, 2), dtype=np.float32)
+    cache[:, :, 0] = np.arange(frames)
+    cache[:, :, 1] = default_value
     return cache
 
 
-def store_frame(obj, cache, frame, start, value):
-    T = type(value)
-    index = (frame - start) * 2
-    if T is Quaternion:
-        if obj.rotation_mode == "QUATERNION":
-            l = len(value)
-            for i in range(0, l):
-                curve = cache[i]
-                curve[index] = frame
-                curve[index + 1] = value[i]
-        elif obj.rotation_mode == "AXIS_ANGLE":
-            # convert quaternion to angle axis
-            v,a = value.to_axis_angle()
-            l = len(v)
-            for i in range(0, l):
-                curve = cache[i]
-                curve[index] = frame
-                curve[index + 1] = v[i]
-            curve = cache[3]
-            curve[index] = frame
-            curve[index + 1] = a
-        else:
-            euler = value.to_euler(obj.rotation_mode)
-            l = len(euler)
-            for i in range(0, l):
-                curve = cache[i]
-                curve[index] = frame
-                curve[index + 1] = euler[i]
-    elif T is Vector or T is Color:
-        l = len(value)
-        for i in range(0, l):
-            curve = cache[i]
-            curve[index] = frame
-            curve[index + 1] = value[i]
+def rotation_frame_values(obj, rotations):
+    """Converts (x, y, z, w) quaternion records into values for each rotation curve of the object."""
+    quaternions = np.asarray(rotations, dtype=np.float64)[:, [3, 0, 1, 2]]
+    if obj.rotation_mode == "QUATERNION":
+        return quaternions
+    values = []
+    if obj.rotation_mode == "AXIS_ANGLE":
+        for q in quaternions:
+            v, a = Quaternion(q).to_axis_angle()
+            values.append((v[0], v[1], v[2], a))
     else:
-        curve = cache[0]
-        curve[index] = frame
-        curve[index + 1] = value
+        for q in quaternions:
+            values.append(Quaternion(q).to_euler(obj.rotation_mode)[:])
+    return np.array(values, dtype=np.float64)
+
+
+def store_frames(cache, frames, start, values):
+    """Stores the values for all frames in one pass, values have one column per curve in the cache."""
+    index = frames - start
+    values = np.asarray(values).reshape(len(index), -1)
+    cache[:, index, 0] = frames
+    cache[:, index, 1] = values.T
 
 
 def add_cache_rotation_fcurves(obj, action: bpy.types.Action, cache, num_frames, slot=None):
@@ -506,30 +540,31 @@ def add_cache_fcurves(action: bpy.types.Action, data_path, cache, num_frames, gr
             fcurve.keyframe_points.foreach_set('co', reduced)
             rigutils.reset_fcurve_interpolation(fcurve, interpolation=interpolation)
 
-def reduce_cache(cache, interpolation):
-    if not cache or len(cache) <= 4:
+def reduce_cache(cache, interpolation, tolerance=None):
+    """Reduces a flat (frame, value, frame, value ...) keyframe cache to its significant keys.
+       Returns a contiguous float32 array ready for keyframe_points.foreach_set('co', ...)"""
+    if cache is None:
         return cache
-    reduced = []
-    L = len(cache)
-    Lm2 = L - 2
-    # add first frame
-    reduced.append(cache[0])
-    reduced.append(cache[1])
-    use_next = interpolation != "CONSTANT"
-    for i in range(2, L, 2):
-        frame = cache[i]
-        value = cache[i+1]
-        value_last = cache[i-1]
-        value_next = cache[i+3] if i < Lm2 else value
-        last_changed = abs(value - value_last) > 0.0001
-        next_changed = abs(value - value_next) > 0.0001
-        if last_changed or (use_next and next_changed):
-            reduced.append(frame)
-            reduced.append(value)
-    # add last frame
-    #reduced.append(cache[-2])
-    #reduced.append(cache[-1])
-    return reduced
+    pairs = np.asarray(cache, dtype=np.float64).reshape(-1, 2)
+    if len(pairs) <= 2:
+        return np.ascontiguousarray(pairs, dtype=np.float32).ravel()
+    if tolerance is None:
+        tolerance = vars.prefs().action_reduce_tolerance
+    values = pairs[:, 1]
+    # a key is kept if its value changed from the last key,
+    # or (for non constant interpolation) if it changes to the next key.
+    # the first key is always kept, the last key compares with itself.
+    changed = np.abs(np.diff(values)) > 0.0001
+    keep = np.ones(len(values), dtype=bool)
+    keep[1:] = changed
+    if interpolation != "CONSTANT":
+        keep[1:-1] |= changed[1:]
+        if tolerance and tolerance > 0.0:
+            # simplify what remains of the curve to within the tolerance
+            indices = np.flatnonzero(keep)
+            simplified = utils.simplify_curve_keys(pairs[indices, 0], values[indices], tolerance)
+            keep[indices[~simplified]] = False
+    return np.ascontiguousarray(pairs[keep], dtype=np.float32).ravel()
 
 
 def add_camera_markers(camera, cache, num_frames, start):
@@ -35,143 +35,184 @@ def eval_texture_rules(tex_type):
         return True
 
 
-def exec_var_param(var_def, mat_cache, mat_json):
-    try:
-        parameters = mat_cache.parameters
+# compiled shader parameter expressions:
+#   (func, args) -> callable(mat_cache, parameters)
+#   (id(def), start_index) -> (def, compiled callable or None if the def failed to compile)
+COMPILED_EXPRESSIONS = {}
+COMPILED_PARAMS = {}
+COMPILED_SHADERS = set()
+
+
+def compile_param_expression(func, args):
+    """Compiles the parameter expression func(mat_cache, parameters.arg1, parameters.arg2...),
+       or parameters.arg1 if there is no function, into a callable(mat_cache, parameters).
+    """
+    if func == "" or func == "=":
+        # expression is mat_cache parameter
+        expression = "parameters." + args[0]
+    else:
+        if func not in globals():
+            raise NameError(f"Unknown parameter function: {func}")
+        expression = func + "(mat_cache, " + ", ".join("parameters." + arg for arg in args) + ")"
+    code = compile("lambda mat_cache, parameters: " + expression, "<shader parameter>", "eval")
+    function = eval(code, globals())
+    function.expression = expression
+    return function
+
+
+def get_compiled_expression(func, args):
+    key = (func, tuple(args))
+    if key not in COMPILED_EXPRESSIONS:
+        COMPILED_EXPRESSIONS[key] = compile_param_expression(func, args)
+    return COMPILED_EXPRESSIONS[key]
 
-        prop_name = var_def[0]
-        default_value = var_def[1]
-        func = var_def[2]
-        args = var_def[3:]
 
+def compile_var_param(var_def):
+    """Compiles the shader variable def: [prop_name, default_value, function, json_id_arg1, json_id_arg2...]
+       into a callable(mat_cache, mat_json) returning the parameter value, with the json accessors resolved up front.
+    """
+    prop_name = var_def[0]
+    default_value = var_def[1]
+    func = var_def[2]
+    args = var_def[3:]
+
+    function = None
+    if func == "" or func == "=":
+        if not args:
+            raise ValueError(f"No json var for parameter: {prop_name}")
+    elif func != "DEF":
+        if func not in globals():
+            raise NameError(f"Unknown parameter function: {func}")
+        function = globals()[func]
+
+    accessors = []
+    for arg in args:
+        quote = False
+        if arg.startswith("$"):
+            arg = arg[1:]
+            quote = True
+        accessors.append((jsonutils.get_material_json_var_accessor(arg), quote))
+
+    def evaluate(mat_cache, mat_json):
+        value = default_value
         if type(default_value) is list:
             material_type = jsonutils.get_json(mat_json, "Material Type")
             if material_type == "Tra":
-                default_value = default_value[1]
+                value = default_value[1]
             else:
-                default_value = default_value[0]
-
-        exec_expression = str(default_value)
+                value = default_value[0]
 
         if mat_json:
 
             if func == "" or func == "=":
-                # expression is json var value
-                json_value = jsonutils.get_material_json_var(mat_json, args[0])
+                # value is json var value
+                json_value = accessors[0][0](mat_json)
                 if json_value is not None:
-                    exec_expression = str(json_value)
-
-            elif func != "DEF" and not args:
-                exec_expression = func + f"({default_value})"
-
-            elif func != "DEF" and args:
-                # construct eval function code
-                func_expression = func + "(mat_cache, "
-                first = True
-                missing_args = False
-                for arg in args:
-                    quote = False
-                    if arg.startswith("$"):
-                        arg = arg[1:]
-                        quote = True
-                    if not first:
-                        func_expression += ", "
-                    first = False
-                    arg_value = jsonutils.get_material_json_var(mat_json, arg)
-                    if quote:
-                        arg_value = f"\"{arg_value}\""
-                    if arg_value is None:
-                        missing_args = True
-                    func_expression += str(arg_value)
-                func_expression += ")"
-                if not missing_args:
-                    exec_expression = func_expression
-
-        exec_code = "parameters." + prop_name + " = " + exec_expression
-        exec(exec_code, None, locals())
-        utils.log_info("Applying: " + exec_code)
-    except:
-        utils.log_error("exec_var_param(): error in expression: " + exec_code)
-        utils.log_error(str(var_def))
+                    value = json_value
 
+            elif function and not args:
+                value = function(value)
 
-def eval_input_param(input_def, mat_cache):
-    try:
-        parameters = mat_cache.parameters
+            elif function and args:
+                arg_values = []
+                for accessor, quote in accessors:
+                    arg_value = accessor(mat_json)
+                    if quote:
+                        arg_value = str(arg_value)
+                    elif arg_value is None:
+                        # missing json var, use default value
+                        return value
+                    arg_values.append(arg_value)
+                value = function(mat_cache, *arg_values)
 
-        input_socket = input_def[0]
-        func = input_def[1]
-        args = input_def[2:]
+        return value
 
-        if func == "" or func == "=":
-            # expression is mat_cache parameter
-            exec_expression = "parameters." + args[0]
+    evaluate.prop_name = prop_name
+    return evaluate
 
-        else:
-            # construct eval function code
-            exec_expression = func + "(mat_cache,"
-            first = True
-            for arg in args:
-                if not first:
-                    exec_expression += ", "
-                first = False
-                exec_expression += "parameters." + arg
-            exec_expression += ")"
 
-        return eval(exec_expression, None, locals())
-    except:
-        utils.log_error("eval_input_param(): error in expression: " + exec_expression)
-        return None
+def get_compiled_param(param_def, start_index):
+    """Returns the compiled callable for the def's expression, compiling it the first time."""
+    key = (id(param_def), start_index)
+    entry = COMPILED_PARAMS.get(key)
+    if entry is None or entry[0] is not param_def:
+        try:
+            if start_index is None:
+                compiled = compile_var_param(param_def)
+            else:
+                compiled = get_compiled_expression(param_def[start_index], param_def[start_index + 1:])
+        except Exception as e:
+            utils.log_error(f"Unable to compile shader parameter: {param_def}", e)
+            compiled = None
+        entry = (param_def, compiled)
+        COMPILED_PARAMS[key] = entry
+    return entry[1]
+
+
+def compile_shader_params(shader_name):
+    """Compiles all the parameter expressions of the shader definition (once),
+       so that any errors in the definition are reported up front.
+    """
+    if shader_name in COMPILED_SHADERS:
+        return
+    COMPILED_SHADERS.add(shader_name)
+    shader_def = params.get_shader_def(shader_name)
+    if shader_def:
+        for input_def in shader_def.get("inputs", []):
+            get_compiled_param(input_def, 1)
+        for input_def in shader_def.get("bsdf", []):
+            get_compiled_param(input_def, 1)
+        for texture_def in shader_def.get("textures", []):
+            if len(texture_def) > 5:
+                get_compiled_param(texture_def, 4)
+        for mapping_def in shader_def.get("mapping", []):
+            get_compiled_param(mapping_def, 2)
+        for var_def in shader_def.get("vars", []):
+            get_compiled_param(var_def, None)
 
 
-def eval_tiling_param(texture_def, mat_cache, start_index = 4):
-    try:
-        parameters = mat_cache.parameters
+def exec_var_param(var_def, mat_cache, mat_json):
+    evaluate = get_compiled_param(var_def, None)
+    if evaluate:
+        try:
+            value = evaluate(mat_cache, mat_json)
+            setattr(mat_cache.parameters, evaluate.prop_name, value)
+            utils.log_info(f"Applying: parameters.{evaluate.prop_name} = {value}")
+        except:
+            utils.log_error(f"exec_var_param(): error evaluating: parameters.{evaluate.prop_name}")
+            utils.log_error(str(var_def))
 
-        func = texture_def[start_index]
-        args = texture_def[start_index + 1:]
 
-        if func == "" or func == "=":
-            # expression is mat_cache parameter
-            exec_expression = "parameters." + args[0]
+def eval_input_param(input_def, mat_cache):
+    function = get_compiled_param(input_def, 1)
+    if function:
+        try:
+            return function(mat_cache, mat_cache.parameters)
+        except:
+            utils.log_error("eval_input_param(): error in expression: " + function.expression)
+    return None
 
-        else:
-            # construct eval function code
-            exec_expression = func + "(mat_cache, "
-            first = True
-            for arg in args:
-                if not first:
-                    exec_expression += ", "
-                first = False
-                exec_expression += "parameters." + arg
-            exec_expression += ")"
 
-        return eval(exec_expression, None, locals())
-    except:
-        utils.log_error("eval_tiling_param(): error in expression: " + exec_expression)
-        return None
+def eval_tiling_param(texture_def, mat_cache, start_index = 4):
+    function = get_compiled_param(texture_def, start_index)
+    if function:
+        try:
+            return function(mat_cache, mat_cache.parameters)
+        except:
+            utils.log_error("eval_tiling_param(): error in expression: " + function.expression)
+    return None
 
 
 def eval_parameters_func(mat_cache, func, args, default = None):
     try:
-        parameters = mat_cache.parameters
-        # construct eval function code
-        if func == "" or func == "=":
-            # expression is mat_cache parameter
-            exec_expression = "parameters." + args[0]
-        else:
-            # construct eval function code
-            exec_expression = func + "(mat_cache, "
-            first = True
-            for arg in args:
-                if not first:
-                    exec_expression += ", "
-                first = False
-                exec_expression += "parameters." + arg
-            exec_expression += ")"
-        return eval(exec_expression, None, locals())
+        function = get_compiled_expression(func, args)
+    except Exception as e:
+        utils.log_error(f"eval_parameters_func(): unable to compile: {func} {args}", e)
+        return default
+    try:
+        return function(mat_cache, mat_cache.parameters)
     except:
-        utils.log_error("eval_parameters_func(): error in expression: " + exec_expression)
+        utils.log_error("eval_parameters_func(): error in expression: " + function.expression)
         return default
 
 
@@ -199,6 +240,7 @@ def fetch_prop_defaults(obj, mat_cache, mat_json):
     vars.block_property_update = True
     shader = params.get_shader_name(mat_cache)
     matrix_group = params.get_shader_def(shader)
+    compile_shader_params(shader)
     if matrix_group and "vars" in matrix_group.keys():
         for var_def in matrix_group["vars"]:
             exec_var_param(var_def, mat_cache, mat_json)
@@ -255,6 +297,7 @@ def set_hair_sss_falloff(obj, mat_cache, mat_json):
 
 def apply_prop_matrix(bsdf_node, group_node, mat_cache, shader_name):
     matrix_group = params.get_shader_def(shader_name)
+    compile_shader_params(shader_name)
 
     if group_node and matrix_group and "inputs" in matrix_group.keys():
         for input_def in matrix_group["inputs"]:
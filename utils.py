@@ -23,6 +23,7 @@ import random
 import re, json
 import traceback
 import math
+import numpy as np
 from mathutils import Vector, Quaternion, Matrix, Euler, Color
 from hashlib import md5
 import bpy
@@ -2321,6 +2322,32 @@ def clear_action(action):
     return False
 
 
+def simplify_curve_keys(frames, values, tolerance):
+    """Douglas-Peucker simplification of a linearly interpolated curve (numpy arrays).
+       Returns a mask of the keys needed to keep the curve within tolerance of the original values."""
+    num_keys = len(values)
+    keep = np.zeros(num_keys, dtype=bool)
+    keep[0] = True
+    keep[-1] = True
+    segments = [(0, num_keys - 1)]
+    while segments:
+        first, last = segments.pop()
+        if last - first < 2:
+            continue
+        span = frames[last] - frames[first]
+        # keys on the same frame are measured against the first key's value
+        t = (frames[first + 1:last] - frames[first]) / span if span else 0.0
+        interpolated = values[first] + t * (values[last] - values[first])
+        error = np.abs(values[first + 1:last] - interpolated)
+        i = int(np.argmax(error))
+        if error[i] > tolerance:
+            split = first + 1 + i
+            keep[split] = True
+            segments.append((first, split))
+            segments.append((split, last))
+    return keep
+
+
 def get_action_channelbags_list(action: bpy.types.Action):
     channels = []
     if action: